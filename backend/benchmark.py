@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the resume-enhancement pipeline in openai_demo.py.
+
+Generates a synthetic corpus of CVs and job descriptions at several sizes
+and runs every enhancement function in demo mode and in API mode, with API
+mode pointed at the local fake_llm_server. Reports p50/p95/p99 latency,
+throughput and peak traced memory for each function as JSON.
+
+Calls are classified from their instrumentation trace as ok, demo or
+fallback (a function that served canned output after an API failure).
+Latency and throughput cover only the calls that ran as the mode intends,
+model replies in API mode and demo output in demo mode, and the others
+are counted separately, so an open circuit breaker cannot pass demo-speed
+fallbacks off as API latency.
+
+Each mode runs in its own subprocess because openai_demo picks demo or API
+mode at import time.
+
+Usage:
+    python benchmark.py --output bench.json
+    python benchmark.py --modes api --sizes large --concurrency 8 --latency-ms 500 --rate-429 0.05
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+FUNCTIONS = ["enhance_resume_summary", "prioritize_skills", "get_resume_pro_tips", "optimize_cv_content"]
+
+# (CV words, job description words, candidate skills) per corpus size
+CORPUS_SIZES = {
+    "small": (150, 120, 8),
+    "medium": (1200, 600, 25),
+    "large": (10000, 3000, 80),
+}
+
+SKILL_WORDS = [
+    "React", "TypeScript", "JavaScript", "Node.js", "Redux", "GraphQL", "REST API", "CSS3", "HTML5",
+    "Jest", "Cypress", "unit testing", "responsive", "Git", "CI/CD", "Agile", "Docker", "Python",
+    "PostgreSQL", "MongoDB", "AWS", "Kubernetes", "Tailwind", "Vue", "Angular", "Express",
+]
+FILLER_WORDS = [
+    "team", "built", "delivered", "product", "customers", "platform", "features", "worked", "across",
+    "company", "growth", "design", "services", "scalable", "quality", "users", "performance", "data",
+    "collaborated", "stakeholders", "improved", "workflow", "release", "mobile", "web", "support",
+]
+ACTION_VERBS = ["Developed", "Implemented", "Designed", "Led", "Improved", "Reduced", "Managed", "Created"]
+BOILERPLATE = (
+    "We are an equal opportunity employer and value diversity. All qualified applicants will receive "
+    "consideration without regard to race, color, religion, sex or disability."
+)
+
+
+def _sentence(rng, words, skill_share=0.2):
+    picked = [rng.choice(SKILL_WORDS) if rng.random() < skill_share else rng.choice(FILLER_WORDS) for _ in range(words)]
+    return " ".join(picked)
+
+
+def generate_cv(rng, words):
+    """Return a synthetic CV with summary, skills, experience and education sections."""
+    lines = ["JANE CANDIDATE", "Software Engineer", "jane@example.com | github.com/jane", ""]
+    lines.append("Skills: " + ", ".join(rng.sample(SKILL_WORDS, 10)))
+    lines.extend(["", "Experience:", ""])
+    written = 20
+    role = 0
+    while written < words:
+        role += 1
+        lines.append(f"Engineer at Company{role} ({2000 + role}-{2001 + role})")
+        for _ in range(rng.randint(3, 6)):
+            bullet = f"• {rng.choice(ACTION_VERBS)} {_sentence(rng, 12)}"
+            lines.append(bullet)
+            written += 13
+        lines.append("")
+    lines.extend(["Education:", "", "BSc Computer Science, University of Somewhere"])
+    return "\n".join(lines)
+
+
+def generate_job(rng, words):
+    """Return a synthetic job posting with requirements and boilerplate paragraphs."""
+    seniority = rng.choice(["Senior", "Junior", ""])
+    paragraphs = [f"{seniority} Frontend Developer".strip()]
+    written = 3
+    while written < words:
+        paragraphs.append(_sentence(rng, 40, skill_share=0.25) + ".")
+        written += 40
+        if rng.random() < 0.15:
+            paragraphs.append(BOILERPLATE)
+            written += 25
+    return "\n\n".join(paragraphs)
+
+
+def generate_corpus(size, seed=7):
+    """Return a dict with cv, job, summary and skills for a named corpus size."""
+    cv_words, job_words, skill_count = CORPUS_SIZES[size]
+    rng = random.Random(f"{seed}:{size}")
+    return {
+        "cv": generate_cv(rng, cv_words),
+        "job": generate_job(rng, job_words),
+        "summary": "Software engineer with experience building web applications.",
+        "skills": [rng.choice(SKILL_WORDS) + ("" if i < len(SKILL_WORDS) else f" {i}") for i in range(skill_count)],
+    }
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def _call(module, function, corpus, variant=None):
+    fn = getattr(module, function)
+    if variant is not None:
+        # A unique posting per call keeps single-flight and the cache from merging requests
+        corpus = dict(corpus, job=f"{corpus['job']}\n\nPosting reference: {variant}")
+    if function == "enhance_resume_summary":
+        return fn(corpus["summary"], corpus["job"])
+    if function == "prioritize_skills":
+        return fn(corpus["skills"], corpus["job"])
+    return fn(corpus["cv"], corpus["job"])
+
+
+def _outcome(trace):
+    """Classify a call from its trace records: fallback, demo or ok."""
+    if any(record["fallback"] for record in trace):
+        return "fallback"
+    if any(record["demo"] for record in trace):
+        return "demo"
+    return "ok"
+
+
+def measure(module, function, corpus, iterations, concurrency, unique=True, mode="api"):
+    """Time iterations calls of one function and trace its peak memory.
+
+    With unique set, every call gets a distinct job description so repeated
+    calls are not served by the response cache or coalesced. Latency
+    percentiles and throughput cover only the calls whose outcome matches
+    the mode: ok in API mode, demo in demo mode.
+    """
+    from instrumentation import request_trace
+
+    # Peak memory from one traced call, kept apart from the timed runs
+    tracemalloc.start()
+    _call(module, function, corpus)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    expected = "demo" if mode == "demo" else "ok"
+    latencies = []
+    outcomes = Counter()
+    lock = threading.Lock()
+
+    def timed(iteration):
+        started = time.perf_counter()
+        try:
+            with request_trace() as trace:
+                _call(module, function, corpus, iteration if unique else None)
+            outcome = _outcome(trace)
+        except Exception:
+            outcome = "error"
+        elapsed = time.perf_counter() - started
+        with lock:
+            outcomes[outcome] += 1
+            if outcome == expected:
+                latencies.append(elapsed)
+
+    wall_started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for iteration in range(iterations):
+            executor.submit(timed, iteration)
+    wall = time.perf_counter() - wall_started
+
+    latencies.sort()
+    to_ms = lambda seconds: round(seconds * 1000, 3) if seconds is not None else None
+    return {
+        "function": function,
+        "iterations": iterations,
+        "concurrency": concurrency,
+        "measured_calls": len(latencies),
+        "p50_ms": to_ms(percentile(latencies, 0.50)),
+        "p95_ms": to_ms(percentile(latencies, 0.95)),
+        "p99_ms": to_ms(percentile(latencies, 0.99)),
+        "mean_ms": to_ms(sum(latencies) / len(latencies)) if latencies else None,
+        "throughput_per_s": round(len(latencies) / wall, 2) if wall else None,
+        "peak_memory_kb": round(peak / 1024, 1),
+        "ok": outcomes["ok"],
+        "demo": outcomes["demo"],
+        "fallback": outcomes["fallback"],
+        "errors": outcomes["error"],
+    }
+
+
+def run_child(args):
+    """Benchmark one mode in this process and print the results as JSON."""
+    results = []
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        import openai_demo
+
+        for size in args.sizes:
+            corpus = generate_corpus(size, args.seed)
+            for function in args.functions:
+                # Warm up imports, compiled patterns and pooled connections
+                _call(openai_demo, function, corpus)
+                result = measure(
+                    openai_demo, function, corpus, args.iterations, args.concurrency, unique=not args.cache, mode=args.child
+                )
+                result.update({"mode": args.child, "size": size})
+                results.append(result)
+    print(json.dumps(results))
+
+
+def run_mode(mode, args, base_url):
+    """Run one mode in a subprocess with the right environment and return its results."""
+    env = dict(os.environ)
+    env["PYTHONUNBUFFERED"] = "1"
+    if mode == "api":
+        env["OPENAI_API_KEY"] = "sk-benchmark"
+        env["OPENAI_BASE_URL"] = base_url
+    else:
+        env.pop("OPENAI_API_KEY", None)
+    if not args.cache:
+        env["RESPONSE_CACHE_TTL"] = "0"
+
+    command = [
+        sys.executable, os.path.abspath(__file__), "--child", mode,
+        "--sizes", ",".join(args.sizes),
+        "--functions", ",".join(args.functions),
+        "--iterations", str(args.iterations),
+        "--concurrency", str(args.concurrency),
+        "--seed", str(args.seed),
+    ] + (["--cache"] if args.cache else [])
+    completed = subprocess.run(command, env=env, capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    if completed.returncode != 0:
+        raise RuntimeError(f"{mode} benchmark failed:\n{completed.stderr}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the resume-enhancement pipeline")
+    parser.add_argument("--modes", default="demo,api", help="comma-separated: demo, api")
+    parser.add_argument("--sizes", default=",".join(CORPUS_SIZES), help="comma-separated corpus sizes")
+    parser.add_argument("--functions", default=",".join(FUNCTIONS), help="comma-separated function names")
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--cache", action="store_true", help="leave the response cache enabled")
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="fake API mean latency")
+    parser.add_argument("--jitter-ms", type=float, default=50.0, help="fake API latency standard deviation")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="share of fake API requests rejected with 429")
+    parser.add_argument("--output", help="write JSON results here instead of stdout")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    args.modes = [mode for mode in args.modes.split(",") if mode]
+    args.sizes = [size for size in args.sizes.split(",") if size]
+    args.functions = [function for function in args.functions.split(",") if function]
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.child:
+        run_child(args)
+        return
+
+    import fake_llm_server
+
+    server = None
+    if "api" in args.modes:
+        server = fake_llm_server.start_server(fake_llm_server.parse_args([
+            "--port", "0",
+            "--latency-ms", str(args.latency_ms),
+            "--jitter-ms", str(args.jitter_ms),
+            "--rate-429", str(args.rate_429),
+            "--retry-after", "0.2",
+        ]))
+
+    try:
+        results = []
+        for mode in args.modes:
+            print(f"Benchmarking {mode} mode...", file=sys.stderr)
+            results.extend(run_mode(mode, args, server.base_url if server else None))
+    finally:
+        if server:
+            server.shutdown()
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "cache": args.cache,
+            "fake_api": {"latency_ms": args.latency_ms, "jitter_ms": args.jitter_ms, "rate_429": args.rate_429},
+            "api_requests": server.request_count if server else 0,
+        },
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+        print(f"Wrote {len(results)} results to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Bulk offline processing of CVs from a JSONL file, with checkpoint and resume.
+
+Each input line is a JSON object with the CV text ("cv"), the job
+description ("job_description"), optionally the candidate's skills
+("skills", a list of names or one comma-separated string) and basic
+summary ("basic_summary"), and an "id" that is copied to the output. The selected enhancement functions run on every record,
+with the CV parsed once per record, and one line per record is written in
+input order:
+
+    {"id": "c-17", "line": 17, "results": {"prioritize_skills": [...], ...}, "fallback": []}
+
+"fallback" names the functions that served fallback output, and records
+that cannot be processed get an "error" instead of "results".
+
+Input is read and output written as streams; at most two records per
+worker are held in memory. Every --checkpoint-every records the output
+is synced to disk and the input and output offsets are saved next to it.
+After a crash or Ctrl-C, running the same command again truncates the
+output to the last checkpoint and continues from the matching input line;
+--restart starts over.
+
+Usage:
+    python bulk.py candidates.jsonl --output results.jsonl --workers 16
+    python bulk.py candidates.jsonl --output results.jsonl --functions prioritize_skills,get_resume_pro_tips
+    python bulk.py candidates.jsonl --output results.jsonl --restart
+"""
+
+import argparse
+import json
+import logging
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from instrumentation import logger, request_trace
+
+FUNCTIONS = ["enhance_resume_summary", "prioritize_skills", "get_resume_pro_tips", "optimize_cv_content"]
+CV_FIELDS = ("cv", "cv_content")
+JOB_FIELDS = ("job_description", "job")
+
+
+def _first(record, fields):
+    for field in fields:
+        if record.get(field):
+            return record[field]
+    return None
+
+
+def _skills(value):
+    """Return a record's skills as a list of names, or None if it has none.
+
+    Raises ValueError unless value is a list of strings or one string of
+    comma, pipe or bullet separated names.
+    """
+    from cv_parser import split_skills
+
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return split_skills(value) or None
+    if isinstance(value, list) and all(isinstance(item, str) for item in value):
+        return [item.strip() for item in value if item.strip()] or None
+    raise ValueError("skills must be a list of strings or a comma-separated string")
+
+
+def read_records(path, offset=0, line_number=0):
+    """Yield (line number, end offset, record) for each non-blank line after offset.
+
+    A line that is not valid JSON is yielded with its ValueError as the record.
+    """
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for raw in f:
+            offset += len(raw)
+            line_number += 1
+            if not raw.strip():
+                continue
+            try:
+                record = json.loads(raw)
+            except ValueError as e:
+                record = e
+            yield line_number, offset, record
+
+
+def process_record(functions, line_number, record):
+    """Run the enhancement functions on one input record and return its output record."""
+    from cv_parser import as_parsed
+
+    if not isinstance(record, dict):
+        return {"line": line_number, "error": f"Invalid record: {record}"}
+    output = {"id": record.get("id"), "line": line_number}
+    cv_content = _first(record, CV_FIELDS)
+    job_description = _first(record, JOB_FIELDS)
+    if not isinstance(cv_content, str) or not isinstance(job_description, str):
+        return dict(output, error="Record needs cv and job_description strings")
+    basic_summary = record.get("basic_summary")
+    if basic_summary is not None and not isinstance(basic_summary, str):
+        return dict(output, error="basic_summary must be a string")
+    try:
+        skills = _skills(record.get("skills"))
+    except ValueError as e:
+        return dict(output, error=str(e))
+
+    try:
+        cv = as_parsed(cv_content)
+        inputs = {
+            "enhance_resume_summary": basic_summary or cv,
+            "prioritize_skills": skills or cv,
+            "get_resume_pro_tips": cv,
+            "optimize_cv_content": cv,
+        }
+        results = {}
+        with request_trace() as trace:
+            for name, function in functions:
+                results[name] = function(inputs[name], job_description)
+    except Exception as e:
+        logger.warning("Error processing line %d: %s", line_number, str(e))
+        return dict(output, error=str(e) or type(e).__name__)
+
+    output["results"] = results
+    output["fallback"] = sorted({entry["function"] for entry in trace if entry["fallback"]})
+    return output
+
+
+class Checkpoint:
+    """Progress of a bulk run: how far the input was read and the output written."""
+
+    def __init__(self, path, input_path, functions):
+        self.path = path
+        self.input = os.path.abspath(input_path)
+        self.functions = list(functions)
+        self.line = 0
+        self.input_offset = 0
+        self.output_offset = 0
+        self.records = 0
+        self.errors = 0
+        self.fallbacks = 0
+
+    def load(self):
+        """Restore saved progress; returns False if there is none."""
+        if not os.path.exists(self.path):
+            return False
+        with open(self.path, encoding="utf-8") as f:
+            state = json.load(f)
+        if state.get("input") != self.input or state.get("functions") != self.functions:
+            raise SystemExit(f"{self.path} belongs to a run with other input or functions; use --restart")
+        for name in ("line", "input_offset", "output_offset", "records", "errors", "fallbacks"):
+            setattr(self, name, state[name])
+        return True
+
+    def save(self, output):
+        """Sync the output file, then atomically record the progress matching it."""
+        output.flush()
+        os.fsync(output.fileno())
+        self.output_offset = output.tell()
+        state = {name: getattr(self, name) for name in (
+            "input", "functions", "line", "input_offset", "output_offset", "records", "errors", "fallbacks"
+        )}
+        temporary = self.path + ".tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(temporary, self.path)
+
+
+def run(input_path, output_path, function_names, workers=8, checkpoint_path=None, checkpoint_every=100,
+        restart=False):
+    """Process input_path into output_path, resuming from the checkpoint if there is one."""
+    import openai_demo
+
+    functions = [(name, getattr(openai_demo, name)) for name in function_names]
+    checkpoint = Checkpoint(checkpoint_path or output_path + ".checkpoint", input_path, function_names)
+    if not restart and checkpoint.load():
+        logger.info("Resuming at input line %d (%d records done)", checkpoint.line + 1, checkpoint.records)
+
+    # Drop output written after the last checkpoint; it is produced again
+    with open(output_path, "ab") as output:
+        output.truncate(checkpoint.output_offset)
+
+    started = time.perf_counter()
+    done_before = checkpoint.records
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bulk")
+    pending = {}
+    finished = {}
+    submitted = written = 0
+    records = read_records(input_path, checkpoint.input_offset, checkpoint.line)
+    exhausted = False
+    try:
+        with open(output_path, "ab") as output:
+            while True:
+                # Keep every worker busy without reading far ahead of the writer
+                while not exhausted and len(pending) + len(finished) < 2 * workers:
+                    item = next(records, None)
+                    if item is None:
+                        exhausted = True
+                        break
+                    line_number, offset, record = item
+                    pending[pool.submit(process_record, functions, line_number, record)] = (submitted, line_number, offset)
+                    submitted += 1
+                if not pending:
+                    break
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    sequence, line_number, offset = pending.pop(future)
+                    finished[sequence] = (line_number, offset, future.result())
+
+                # Write in input order, so one offset pair describes all progress
+                while written in finished:
+                    line_number, offset, result = finished.pop(written)
+                    written += 1
+                    output.write((json.dumps(result, ensure_ascii=False) + "\n").encode("utf-8"))
+                    checkpoint.line = line_number
+                    checkpoint.input_offset = offset
+                    checkpoint.records += 1
+                    checkpoint.errors += "error" in result
+                    checkpoint.fallbacks += bool(result.get("fallback"))
+                    if checkpoint.records % checkpoint_every == 0:
+                        checkpoint.save(output)
+                        elapsed = time.perf_counter() - started
+                        logger.info("%d records done (%.1f/s)", checkpoint.records,
+                                    (checkpoint.records - done_before) / elapsed if elapsed else 0.0)
+            checkpoint.save(output)
+    except KeyboardInterrupt:
+        logger.warning("Interrupted; progress up to input line %d is saved in %s", checkpoint.line, checkpoint.path)
+        for future in pending:
+            future.cancel()
+        pool.shutdown(wait=False)
+        raise SystemExit(130)
+    pool.shutdown()
+
+    elapsed = time.perf_counter() - started
+    return {
+        "records": checkpoint.records,
+        "errors": checkpoint.errors,
+        "fallbacks": checkpoint.fallbacks,
+        "processed_now": checkpoint.records - done_before,
+        "seconds": round(elapsed, 3),
+        "records_per_second": round((checkpoint.records - done_before) / elapsed, 2) if elapsed else 0.0,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the resume-enhancement functions over a JSONL file")
+    parser.add_argument("input", help="JSONL file with cv, job_description and optional skills, basic_summary, id")
+    parser.add_argument("--output", required=True, help="JSONL file for the results")
+    parser.add_argument("--functions", default=",".join(FUNCTIONS), help="comma-separated function names")
+    parser.add_argument("--workers", type=int, default=8, help="records processed in parallel")
+    parser.add_argument("--checkpoint", help="checkpoint file (default: <output>.checkpoint)")
+    parser.add_argument("--checkpoint-every", type=int, default=100, help="records between checkpoints")
+    parser.add_argument("--restart", action="store_true", help="ignore any checkpoint and start over")
+    args = parser.parse_args(argv)
+    args.functions = [function for function in args.functions.split(",") if function]
+    unknown = sorted(set(args.functions) - set(FUNCTIONS))
+    if unknown:
+        parser.error(f"unknown functions: {', '.join(unknown)}")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    # Show progress messages unless LOG_LEVEL says otherwise
+    logging.basicConfig(format="%(asctime)s %(message)s")
+    if not os.environ.get("LOG_LEVEL"):
+        logger.setLevel(logging.INFO)
+
+    summary = run(args.input, args.output, args.functions, max(1, args.workers), args.checkpoint,
+                  max(1, args.checkpoint_every), args.restart)
+    print(json.dumps(summary))
+
+
+if __name__ == "__main__":
+    main()
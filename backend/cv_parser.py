@@ -0,0 +1,308 @@
+"""
+Section-aware CV parser for the Resume Assistant.
+
+parse_cv() walks a CV once, line by line, and returns a ParsedCV: the
+original text plus its sections, bullets and skills list, all recorded as
+character offsets into that text. Headings are recognised with or without
+indentation and with or without a trailing colon ("Skills: React, CSS" is
+a heading with inline content). CVParser does the same incrementally for
+text that arrives in pieces, such as PDF pages, and can scan each piece for
+skill terms and the other signals the tips look at as it goes.
+
+The enhancement functions in openai_demo accept a ParsedCV wherever they
+take CV text, so a request parses the CV once however many functions it
+calls. Derived values (skill terms, analysis flags) are cached on the
+object, and edits are applied as splices at recorded offsets rather than
+with str.replace over the whole document.
+"""
+
+import re
+
+from skill_matcher import get_default_matcher
+
+# Heading words for each section kind; a heading is one of these, optionally
+# followed by a few words, then a colon or the end of the line
+SECTION_HEADINGS = {
+    "summary": ["professional summary", "summary", "professional profile", "profile", "career objective",
+                "objective", "about me"],
+    "skills": ["technical skills", "core competencies", "key skills", "skills"],
+    "experience": ["professional experience", "work experience", "employment history", "work history",
+                   "experience"],
+    "education": ["education"],
+    "projects": ["projects"],
+    "awards": ["awards", "certifications", "achievements"],
+}
+
+_HEADING_KIND = {heading: kind for kind, headings in SECTION_HEADINGS.items() for heading in headings}
+
+HEADING_PATTERN = re.compile(
+    r'[ \t]*(?P<heading>' + '|'.join(sorted(map(re.escape, _HEADING_KIND), key=len, reverse=True)) + r')\b'
+    r'(?:[^:\n]{0,30}:(?P<inline>[^\n]*)|[ \t]*$)',
+    re.IGNORECASE
+)
+BULLET_PATTERN = re.compile(r'[ \t]*(?P<marker>[•▪◦·*\-–]|\d{1,2}[.)])[ \t]+')
+SKILL_ITEM_PATTERN = re.compile(r'[^,;|•·\n]+')
+SKILL_ITEM_STRIP = " \t-*▪◦"
+
+# Signals the pro tips look for anywhere in a CV
+SUMMARY_PATTERN = re.compile(r'(summary|profile|objective)', re.IGNORECASE)
+METRICS_PATTERN = re.compile(r'\b(\d+%|\d+ percent|increased|decreased|improved|reduced|saved|generated)\b', re.IGNORECASE)
+ACTION_VERBS_PATTERN = re.compile(r'\b(developed|implemented|created|designed|managed|led|coordinated|analyzed)\b', re.IGNORECASE)
+
+
+class CVSection:
+    """One section of a CV as offsets into ParsedCV.text.
+
+    start is the start of the heading line (or 0 for the untitled header
+    section), body_start is where the content begins (after the heading's
+    colon for inline content) and end is where the next section starts.
+    bullets holds (start, end) spans of bullet lines without indentation.
+    """
+
+    __slots__ = ("kind", "title", "start", "body_start", "end", "bullets")
+
+    def __init__(self, kind, title, start, body_start):
+        self.kind = kind
+        self.title = title
+        self.start = start
+        self.body_start = body_start
+        self.end = body_start
+        self.bullets = []
+
+    def __repr__(self):
+        return f"CVSection({self.kind!r}, {self.start}-{self.end}, {len(self.bullets)} bullets)"
+
+
+class ParsedCV:
+    """A CV parsed once: text, sections, skills and a cache of derived values."""
+
+    __slots__ = ("text", "sections", "skills", "skill_spans", "derived")
+
+    def __init__(self, text, sections, skills, skill_spans):
+        self.text = text
+        self.sections = sections
+        self.skills = skills
+        self.skill_spans = skill_spans
+        self.derived = {}
+
+    def __repr__(self):
+        return f"ParsedCV({len(self.text)} chars, {[section.kind for section in self.sections]})"
+
+    def section(self, kind):
+        """Return the first section of a kind, or None."""
+        for section in self.sections:
+            if section.kind == kind:
+                return section
+        return None
+
+    def has_section(self, kind):
+        return self.section(kind) is not None
+
+    def body(self, section):
+        """Return a section's content without its heading, stripped."""
+        return self.text[section.body_start:section.end].strip() if section is not None else ""
+
+    def bullets(self, kind=None):
+        """Return bullet line texts, optionally only from sections of one kind."""
+        return [
+            self.text[start:end]
+            for section in self.sections if kind is None or section.kind == kind
+            for start, end in section.bullets
+        ]
+
+    def splice_chunks(self, edits, start=0, end=None):
+        """Yield text[start:end] with edits applied, in order, without copying the whole document.
+
+        edits is an iterable of (start, end, replacement); ranges must not
+        overlap and edits outside [start, end) are ignored (an insertion at
+        the very end of the text counts as inside). Edits at the same offset
+        are applied in the order given.
+        """
+        end = len(self.text) if end is None else end
+        position = start
+        for edit_start, edit_end, replacement in sorted(edits, key=lambda edit: (edit[0], edit[1])):
+            if edit_start < start or edit_start > end or (edit_start == end and end != len(self.text)):
+                continue
+            if edit_start < position:
+                raise ValueError(f"Overlapping CV edit at offset {edit_start}")
+            if edit_start > position:
+                yield self.text[position:edit_start]
+            if replacement:
+                yield replacement
+            position = edit_end
+        if position < end:
+            yield self.text[position:end]
+
+    def splice(self, edits, start=0, end=None):
+        """Return text[start:end] with edits applied (see splice_chunks)."""
+        return "".join(self.splice_chunks(edits, start, end))
+
+    def as_dict(self):
+        """Return the parse as plain JSON data, for storing with a session.
+
+        The cached analysis is included; other derived values are not.
+        """
+        state = {
+            "text": self.text,
+            "sections": [
+                [section.kind, section.title, section.start, section.body_start, section.end, section.bullets]
+                for section in self.sections
+            ],
+            "skills": self.skills,
+            "skill_spans": self.skill_spans,
+        }
+        analysis = self.derived.get("analysis")
+        if analysis is not None:
+            state["analysis"] = dict(analysis, terms=sorted(analysis["terms"]))
+        return state
+
+    @classmethod
+    def from_dict(cls, state):
+        """Rebuild a ParsedCV from as_dict() output without parsing the text again."""
+        sections = []
+        for kind, title, start, body_start, end, bullets in state["sections"]:
+            section = CVSection(kind, title, start, body_start)
+            section.end = end
+            section.bullets = [tuple(span) for span in bullets]
+            sections.append(section)
+        parsed = cls(state["text"], sections, state["skills"], [tuple(span) for span in state["skill_spans"]])
+        if "analysis" in state:
+            parsed.derived["analysis"] = dict(state["analysis"], terms=set(state["analysis"]["terms"]))
+        return parsed
+
+
+def _skill_spans(text, start, end):
+    """Return (name, start, end) for each comma, pipe or bullet separated skill in text[start:end]."""
+    spans = []
+    for match in SKILL_ITEM_PATTERN.finditer(text, start, end):
+        item = match.group()
+        stripped = item.strip(SKILL_ITEM_STRIP)
+        if not stripped:
+            continue
+        item_start = match.start() + len(item) - len(item.lstrip(SKILL_ITEM_STRIP))
+        spans.append((stripped, item_start, item_start + len(stripped)))
+    return spans
+
+
+def split_skills(text):
+    """Split a comma, pipe or bullet separated skills list into skill names."""
+    return [name for name, _, _ in _skill_spans(text, 0, len(text))]
+
+
+def analyze_text(text):
+    """Return the skill terms and tip signals (summary, metrics, action verbs) found in text."""
+    return {
+        "terms": get_default_matcher().terms_in(text),
+        "has_summary": bool(SUMMARY_PATTERN.search(text)),
+        "has_metrics": bool(METRICS_PATTERN.search(text)),
+        "has_action_verbs": bool(ACTION_VERBS_PATTERN.search(text))
+    }
+
+
+def merge_analyses(analyses):
+    """Combine analyze_text results for parts of one CV into the result for the whole."""
+    analyses = list(analyses)
+    return {
+        "terms": set().union(*(analysis["terms"] for analysis in analyses)),
+        "has_summary": any(analysis["has_summary"] for analysis in analyses),
+        "has_metrics": any(analysis["has_metrics"] for analysis in analyses),
+        "has_action_verbs": any(analysis["has_action_verbs"] for analysis in analyses)
+    }
+
+
+class CVParser:
+    """Incremental CV parser: feed() text in pieces, then close() for the ParsedCV.
+
+    Only complete lines are parsed, so pieces may split lines anywhere. With
+    analyze set, every batch of complete lines is also run through
+    analyze_text and the merged result is cached on the ParsedCV.
+    """
+
+    def __init__(self, analyze=False):
+        self.analyze = analyze
+        self._parts = []
+        self._length = 0
+        self._pending = ""
+        self._sections = [CVSection("header", "", 0, 0)]
+        self._analyses = []
+
+    def feed(self, text):
+        if not text:
+            return
+        self._parts.append(text)
+        chunk = self._pending + text
+        base = self._length - len(self._pending)
+        self._length += len(text)
+
+        position = 0
+        while True:
+            line_end = chunk.find("\n", position)
+            if line_end == -1:
+                break
+            self._parse_line(chunk, position, line_end, base)
+            position = line_end + 1
+
+        if self.analyze and position:
+            self._analyses.append(analyze_text(chunk[:position]))
+        self._pending = chunk[position:]
+
+    def _parse_line(self, chunk, position, line_end, base):
+        sections = self._sections
+        bullet = BULLET_PATTERN.match(chunk, position, line_end)
+        heading = None if bullet else HEADING_PATTERN.match(chunk, position, line_end)
+        if heading:
+            sections[-1].end = base + position
+            body_start = heading.start("inline") if heading.group("inline") is not None else line_end
+            sections.append(CVSection(
+                _HEADING_KIND[heading.group("heading").lower()], heading.group("heading"), base + position, base + body_start
+            ))
+        elif bullet:
+            bullet_end = line_end
+            while bullet_end > position and chunk[bullet_end - 1] in " \t\r":
+                bullet_end -= 1
+            sections[-1].bullets.append((base + bullet.start("marker"), base + bullet_end))
+
+    def close(self):
+        """Parse the final line and return the ParsedCV."""
+        if self._pending:
+            self._parse_line(self._pending, 0, len(self._pending), self._length - len(self._pending))
+            if self.analyze:
+                self._analyses.append(analyze_text(self._pending))
+            self._pending = ""
+
+        text = "".join(self._parts)
+        sections = self._sections
+        sections[-1].end = len(text)
+
+        # An empty untitled header (the CV starts with a heading) is not kept
+        if sections[0].end == 0 and len(sections) > 1:
+            sections.pop(0)
+
+        skills, skill_spans = [], []
+        skills_section = next((section for section in sections if section.kind == "skills"), None)
+        if skills_section is not None:
+            for name, start, end in _skill_spans(text, skills_section.body_start, skills_section.end):
+                skills.append(name)
+                skill_spans.append((start, end))
+
+        parsed = ParsedCV(text, sections, skills, skill_spans)
+        if self.analyze:
+            parsed.derived["analysis"] = merge_analyses(self._analyses)
+        return parsed
+
+
+def parse_cv(text):
+    """Parse CV text into a ParsedCV in a single pass over its lines."""
+    parser = CVParser()
+    parser.feed(text)
+    return parser.close()
+
+
+def as_parsed(cv):
+    """Return cv unchanged if it is already a ParsedCV, otherwise parse it."""
+    return cv if isinstance(cv, ParsedCV) else parse_cv(cv or "")
+
+
+def cv_text(cv):
+    """Return the text of a CV given as a string or a ParsedCV."""
+    return cv.text if isinstance(cv, ParsedCV) else cv
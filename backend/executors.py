@@ -0,0 +1,156 @@
+"""
+Execution backends for CPU-bound analysis and I/O-bound LLM calls.
+
+Demo-mode analysis (regex scans, CV parsing and rewriting, relevance
+scoring) holds the GIL, so on a threaded gunicorn worker one large CV would
+stall every other request on that worker. Work on inputs above
+CPU_OFFLOAD_MIN_CHARS is sent to a warm process pool instead; smaller inputs
+run inline, where pickling would cost more than it saves. Blocking LLM calls
+run on a shared, bounded thread pool, with each task in a copy of the
+caller's context so instrumentation follows it.
+
+The process pool is started lazily in each gunicorn worker (never in the
+master before a fork) with the forkserver start method, and its processes
+import the analysis modules and build the skill matcher when they start.
+
+Configuration (environment):
+    CPU_POOL_SIZE            analysis processes per worker; 0 runs everything inline
+    CPU_OFFLOAD_MIN_CHARS    input size from which analysis is offloaded
+    IO_POOL_SIZE             threads for blocking LLM calls
+"""
+
+import asyncio
+import contextvars
+import functools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from instrumentation import logger
+
+_DONE = object()
+
+_cpu_pool = None
+_io_pool = None
+_lock = threading.Lock()
+
+
+def cpu_pool_size():
+    value = os.environ.get("CPU_POOL_SIZE")
+    if value not in (None, ""):
+        return max(0, int(value))
+    return max(1, (os.cpu_count() or 2) // 2)
+
+
+def _offload_min_chars():
+    return int(os.environ.get("CPU_OFFLOAD_MIN_CHARS", "20000"))
+
+
+def _warm_worker():
+    """Process pool initializer: load what analysis needs once per process."""
+    from response_cache import env_flag
+    from skill_matcher import get_default_matcher
+    import cv_parser  # noqa: F401
+    import relevance_scoring  # noqa: F401
+    get_default_matcher()
+    # semantic_matching pulls in numpy; leave it out unless the feature is on
+    if env_flag("SEMANTIC_MATCHING"):
+        from semantic_matching import get_semantic_matcher
+        get_semantic_matcher()
+
+
+def _noop():
+    return os.getpid()
+
+
+def get_cpu_pool():
+    """Return the shared analysis process pool, or None if CPU_POOL_SIZE is 0."""
+    global _cpu_pool
+    if _cpu_pool is None:
+        size = cpu_pool_size()
+        if size == 0:
+            return None
+        with _lock:
+            if _cpu_pool is None:
+                method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+                _cpu_pool = ProcessPoolExecutor(
+                    max_workers=size,
+                    mp_context=multiprocessing.get_context(method),
+                    initializer=_warm_worker
+                )
+    return _cpu_pool
+
+
+def warm_cpu_pool():
+    """Start every pool process now rather than on the first large request."""
+    pool = get_cpu_pool()
+    if pool is not None:
+        pids = {future.result() for future in [pool.submit(_noop) for _ in range(cpu_pool_size())]}
+        logger.info("Analysis process pool ready with %d processes", len(pids))
+    return pool
+
+
+def get_io_pool():
+    """Return the shared thread pool for blocking LLM calls."""
+    global _io_pool
+    if _io_pool is None:
+        with _lock:
+            if _io_pool is None:
+                _io_pool = ThreadPoolExecutor(
+                    max_workers=int(os.environ.get("IO_POOL_SIZE", "16")),
+                    thread_name_prefix="llm-io"
+                )
+    return _io_pool
+
+
+def should_offload(size):
+    """True if analysis of an input of this many characters goes to the process pool."""
+    return size >= _offload_min_chars() and get_cpu_pool() is not None
+
+
+def run_cpu(fn, *args, size=0):
+    """Run fn(*args), in the process pool when the input size warrants it.
+
+    fn and its arguments must be picklable (module-level functions, plain
+    data or ParsedCV). size is the input length in characters.
+    """
+    if not should_offload(size):
+        return fn(*args)
+    return get_cpu_pool().submit(fn, *args).result()
+
+
+async def run_cpu_async(fn, *args, size=0):
+    """Async run_cpu: large inputs go to the process pool without blocking the event loop."""
+    if not should_offload(size):
+        return fn(*args)
+    return await asyncio.get_running_loop().run_in_executor(get_cpu_pool(), functools.partial(fn, *args))
+
+
+def submit_io(fn, *args):
+    """Submit a blocking call to the I/O pool in a copy of the current context."""
+    return get_io_pool().submit(contextvars.copy_context().run, fn, *args)
+
+
+def as_completed_io(fn, items, max_in_flight):
+    """Run fn(item) for each item on the I/O pool, yielding (item, future) as each finishes.
+
+    At most max_in_flight calls of this batch are queued or running at once,
+    so one large batch cannot take over the shared pool.
+    """
+    items = iter(items)
+    pending = {}
+
+    def fill():
+        while len(pending) < max(1, max_in_flight):
+            item = next(items, _DONE)
+            if item is _DONE:
+                return
+            pending[submit_io(fn, item)] = item
+
+    fill()
+    while pending:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            yield pending.pop(future), future
+        fill()
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the OpenAI chat-completions API, for benchmarks and load tests.
+
+Serves POST /v1/chat/completions with canned replies shaped like the real
+API (including usage and streaming SSE chunks), after a configurable
+latency, and answers a configurable share of requests with 429 and a
+Retry-After header.
+
+Prompt caching is emulated the way the API reports it: once a prompt of at
+least CACHE_MIN_TOKENS tokens has been seen, a later prompt that starts
+with the same tokens reports the shared part, in CACHE_BLOCK_TOKENS steps,
+as usage.prompt_tokens_details.cached_tokens.
+
+Point the backend at it with OPENAI_BASE_URL=http://127.0.0.1:<port>/v1 and
+any non-placeholder OPENAI_API_KEY.
+
+Usage:
+    python fake_llm_server.py --port 8089 --latency-ms 400 --jitter-ms 100 --rate-429 0.05
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+TEXT_REPLY = """1. Add the job's key technologies to your skills section
+2. Quantify achievements with concrete metrics
+3. Lead each bullet point with a strong action verb
+4. Move the most relevant experience to the top
+5. Keep the resume to two pages"""
+
+
+# Rough tokens: up to four word characters, or one punctuation mark
+TOKEN_PATTERN = re.compile(r"\w{1,4}|[^\w\s]")
+
+CACHE_MIN_TOKENS = 1024
+CACHE_BLOCK_TOKENS = 128
+
+JOB_PATTERN = re.compile(r"\[Job (\d+)\]")
+SKILLS_PATTERN = re.compile(r"Candidate Skills: (\[.*?\])\n")
+
+
+def _reply_for(request):
+    """Return a plausible reply body for the request's prompt and response format."""
+    if (request.get("response_format") or {}).get("type") == "json_object":
+        prompt = (request.get("messages") or [{}])[-1].get("content") or ""
+        skills = SKILLS_PATTERN.search(prompt)
+        return json.dumps({
+            "skills": [
+                {"name": name, "priority": ("high", "medium", "low")[index % 3]}
+                for index, name in enumerate(json.loads(skills.group(1)) if skills else ["React", "CSS"])
+            ],
+            "jobs": [
+                {"index": int(index), "summary": "Engineer with experience matching this role.", "tips": TEXT_REPLY.split("\n")[:3]}
+                for index in JOB_PATTERN.findall(prompt)
+            ],
+        })
+    return TEXT_REPLY
+
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        request = json.loads(self.rfile.read(length) or b"{}")
+        config = self.server.config
+        self.server.record_request()
+
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "Not found", "type": "invalid_request_error"}})
+            return
+
+        time.sleep(max(0.0, random.gauss(config.latency_ms, config.jitter_ms)) / 1000.0)
+
+        if random.random() < config.rate_429:
+            self._send_json(
+                429,
+                {"error": {"message": "Rate limit reached (fake server)", "type": "rate_limit_error"}},
+                headers={"Retry-After": str(config.retry_after)}
+            )
+            return
+
+        content = _reply_for(request)
+        tokens = [token for m in request.get("messages", []) for token in TOKEN_PATTERN.findall(m.get("content") or "")]
+        prompt_tokens = len(tokens)
+        cached_tokens = self.server.cached_tokens(tokens)
+        completion_tokens = len(content.split())
+        completion_id = "chatcmpl-" + uuid.uuid4().hex[:24]
+        model = request.get("model", "gpt-3.5-turbo")
+
+        if request.get("stream"):
+            self._stream(completion_id, model, content)
+            return
+
+        self._send_json(200, {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+                "prompt_tokens_details": {"cached_tokens": cached_tokens},
+            },
+        })
+
+    def _stream(self, completion_id, model, content):
+        """Send content as server-sent event chunks, one word at a time."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        for word in content.split(" "):
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": word + " "}, "finish_reason": None}],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            time.sleep(self.server.config.stream_interval_ms / 1000.0)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.close_connection = True
+
+
+class FakeLLMServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, config):
+        super().__init__(address, FakeLLMHandler)
+        self.config = config
+        self.request_count = 0
+        self._count_lock = threading.Lock()
+        self._prompt_prefixes = set()
+
+    def record_request(self):
+        with self._count_lock:
+            self.request_count += 1
+
+    def cached_tokens(self, tokens):
+        """Return how many leading tokens an earlier prompt shared, remembering this prompt's prefixes."""
+        cached = 0
+        digest = hashlib.sha256()
+        prefixes = []
+        for count, token in enumerate(tokens, 1):
+            digest.update(token.encode("utf-8") + b"\0")
+            if count >= CACHE_MIN_TOKENS and (count - CACHE_MIN_TOKENS) % CACHE_BLOCK_TOKENS == 0:
+                prefixes.append((count, digest.hexdigest()))
+        with self._count_lock:
+            for count, prefix in prefixes:
+                if prefix in self._prompt_prefixes:
+                    cached = count
+                self._prompt_prefixes.add(prefix)
+        return cached
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Fake OpenAI chat-completions server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089, help="0 picks a free port")
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="mean response latency")
+    parser.add_argument("--jitter-ms", type=float, default=50.0, help="latency standard deviation")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="share of requests answered with 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds on 429")
+    parser.add_argument("--stream-interval-ms", type=float, default=5.0, help="delay between stream chunks")
+    return parser.parse_args(argv)
+
+
+def start_server(config):
+    """Start a FakeLLMServer on a background thread and return it."""
+    server = FakeLLMServer((config.host, config.port), config)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    server = FakeLLMServer((args.host, args.port), args)
+    print(f"Fake OpenAI API listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,31 @@
+"""
+gunicorn settings for the backend (read automatically from the working directory).
+
+With GUNICORN_PRELOAD (the default), the app and heavy dependencies are
+loaded once in the master and shared by the forked workers; each worker then
+opens its own OpenAI and Redis connections and starts its analysis process
+pool after the fork.
+
+Threaded workers let one worker serve several requests at once: LLM calls
+wait on the network and large analyses run in the process pool (see
+executors.py), so neither holds the GIL for long.
+"""
+
+import os
+
+from response_cache import env_flag
+
+preload_app = env_flag("GUNICORN_PRELOAD", True)
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+threads = int(os.environ.get("GUNICORN_THREADS", "4"))
+
+
+def when_ready(server):
+    if preload_app:
+        from warmup import warm_up
+        warm_up(open_connections=False)
+
+
+def post_fork(server, worker):
+    from warmup import warm_up
+    warm_up(preload_models=not preload_app)
@@ -0,0 +1,114 @@
+"""
+Session state for incremental re-optimization in the interactive editor.
+
+When a user edits one bullet or tweaks the job text, most of the CV is the
+same as in their previous request. Each session remembers the results
+computed for the sections of the last version it saw, keyed by a
+fingerprint of everything that determines a section's result (its text,
+the job description, the mode and model). A new version is diffed against
+that state: sections with a known fingerprint reuse their stored result
+and only changed or new sections are recomputed. Results of sections that
+no longer exist are dropped, so a session's state stays the size of one CV.
+
+State is kept with the rest of the session in the session store
+(session_store.py), in Redis when enabled and otherwise in process.
+"""
+
+import hashlib
+import threading
+from collections import namedtuple
+
+from session_store import get_session_store
+
+SectionDiff = namedtuple("SectionDiff", ["reused", "recomputed", "removed"])
+
+
+def normalize_text(text):
+    """Collapse whitespace and case so cosmetic edits do not invalidate results."""
+    return " ".join((text or "").lower().split())
+
+
+def fingerprint(*parts):
+    """Return a short stable hash of the given string parts."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()[:32]
+
+
+class SessionState:
+    """Results of one session's last request, keyed by section fingerprint."""
+
+    __slots__ = ("sections", "previous", "extras")
+
+    def __init__(self, sections=None, extras=None):
+        self.previous = sections or {}
+        self.sections = {}
+        self.extras = extras or {}
+
+    def resolve(self, keys, compute):
+        """Return a result for every key, computing only keys not seen last time.
+
+        compute receives the list of missing keys (in order, without
+        duplicates) and returns their results in the same order. The state
+        afterwards holds exactly the results for keys.
+        """
+        missing = []
+        for key in keys:
+            if key not in self.previous and key not in missing:
+                missing.append(key)
+
+        computed = dict(zip(missing, compute(missing))) if missing else {}
+        results = []
+        for key in keys:
+            result = computed[key] if key in computed else self.previous[key]
+            self.sections[key] = result
+            results.append(result)
+
+        diff = SectionDiff(
+            reused=sum(1 for key in keys if key not in computed),
+            recomputed=len(computed),
+            removed=sum(1 for key in self.previous if key not in self.sections)
+        )
+        return results, diff
+
+    def as_dict(self):
+        return {"sections": self.sections, "extras": self.extras}
+
+    @classmethod
+    def from_dict(cls, state):
+        return cls(state.get("sections"), state.get("extras"))
+
+
+class IncrementalStore:
+    """Per-session state in a SessionStore, namespaced by the function that produced it."""
+
+    def __init__(self, sessions):
+        self._sessions = sessions
+
+    def load(self, session_id, namespace):
+        """Return the session's state for namespace (empty if none)."""
+        data = self._sessions.get(session_id, "incremental:" + namespace)
+        return SessionState.from_dict(data) if data is not None else SessionState()
+
+    def save(self, session_id, namespace, state):
+        self._sessions.set(session_id, "incremental:" + namespace, state.as_dict())
+
+    def clear(self, session_id, namespaces):
+        """Forget a session's incremental state, e.g. when the user starts over with a new CV."""
+        self._sessions.delete(session_id, ["incremental:" + namespace for namespace in namespaces])
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_incremental_store():
+    """Return the shared IncrementalStore, on the shared session store."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = IncrementalStore(get_session_store())
+    return _store
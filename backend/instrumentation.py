@@ -0,0 +1,367 @@
+"""
+Hot-path instrumentation for the resume-enhancement functions.
+
+Every instrumented call produces a CallRecord with:
+    wall time, time spent waiting on the model, prompt and completion
+    tokens (and how many prompt tokens the provider served from its prompt
+    cache), retries, cache hit or miss, the model tier each request was
+    routed to, and whether demo output or a fallback was served.
+
+Records feed Prometheus-style counters and histograms (render_metrics()
+returns the text exposition format for a /metrics route). Inside a
+request_trace() block, the records are also collected as a per-request
+trace.
+
+The package logger ("resume_assistant") replaces the old print() calls.
+Messages use lazy %-formatting, so they cost almost nothing when the level
+is disabled. Set LOG_LEVEL to change the level and METRICS_ENABLED=false to
+turn the instrumentation off entirely.
+"""
+
+import asyncio
+import contextvars
+import functools
+import inspect
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+
+logger = logging.getLogger("resume_assistant")
+
+# Histogram buckets in seconds, from a cache hit to a long CV rewrite
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_current_call = contextvars.ContextVar("resume_assistant_call", default=None)
+_current_trace = contextvars.ContextVar("resume_assistant_trace", default=None)
+
+
+def configure_logging():
+    """Set the package logger level from LOG_LEVEL (call again after loading .env)."""
+    logger.setLevel(os.environ.get("LOG_LEVEL", "WARNING").strip().upper() or "WARNING")
+
+
+def metrics_enabled():
+    return os.environ.get("METRICS_ENABLED", "true").strip().lower() not in ("0", "false", "no", "off")
+
+
+configure_logging()
+
+
+class Counter:
+    """Monotonic counter with label values."""
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(label, "") for label in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, dict(zip(self.labels, key)), value) for key, value in self._values.items()]
+
+
+class Gauge:
+    """Settable value with label values."""
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def set(self, value, **labels):
+        key = tuple(labels.get(label, "") for label in self.labels)
+        with self._lock:
+            self._values[key] = value
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, dict(zip(self.labels, key)), value) for key, value in self._values.items()]
+
+
+class Histogram:
+    """Cumulative-bucket histogram with label values."""
+
+    def __init__(self, name, help_text, labels=(), buckets=DURATION_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(label, "") for label in self.labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def samples(self):
+        samples = []
+        with self._lock:
+            for key, (counts, total, count) in self._series.items():
+                labels = dict(zip(self.labels, key))
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += bucket_count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    samples.append((self.name + "_bucket", dict(labels, le=le), cumulative))
+                samples.append((self.name + "_sum", labels, total))
+                samples.append((self.name + "_count", labels, count))
+        return samples
+
+
+CALLS = Counter("resume_calls_total", "Resume function calls by outcome (ok, demo, fallback)", ("function", "outcome"))
+CALL_DURATION = Histogram("resume_call_duration_seconds", "Wall time of resume function calls", ("function",))
+MODEL_WAIT = Histogram("resume_model_wait_seconds", "Time spent waiting on the OpenAI API", ("function",))
+PROMPT_TOKENS = Counter("resume_prompt_tokens_total", "Prompt tokens reported by the API", ("function",))
+CACHED_PROMPT_TOKENS = Counter("resume_cached_prompt_tokens_total",
+                               "Prompt tokens the API reports as served from its prompt cache", ("function",))
+COMPLETION_TOKENS = Counter("resume_completion_tokens_total", "Completion tokens reported by the API", ("function",))
+RETRIES = Counter("resume_llm_retries_total", "OpenAI request retries", ("function",))
+CACHE_REQUESTS = Counter("resume_cache_requests_total", "Response cache lookups", ("function", "result"))
+SECTIONS = Counter("resume_incremental_sections_total", "CV sections reused or recomputed by incremental calls",
+                   ("function", "result"))
+STARTUP_SECONDS = Gauge("resume_startup_seconds", "Time spent in each warm-up step at startup", ("step",))
+ROUTES = Counter("resume_route_decisions_total", "Requests routed to each model tier (local, small, large, or default with routing off)",
+                 ("function", "tier"))
+STRUCTURED_REPLIES = Counter("resume_structured_replies_total",
+                             "JSON replies by how they were accepted (valid, repaired, reasked, partial, failed)",
+                             ("function", "result"))
+
+METRICS = [CALLS, CALL_DURATION, MODEL_WAIT, PROMPT_TOKENS, CACHED_PROMPT_TOKENS, COMPLETION_TOKENS, RETRIES,
+           CACHE_REQUESTS, SECTIONS, STARTUP_SECONDS, ROUTES, STRUCTURED_REPLIES]
+
+
+class CallRecord:
+    """Measurements for one call of an instrumented function."""
+
+    __slots__ = ("function", "started", "wall_time", "model_wait", "prompt_tokens", "cached_tokens",
+                 "completion_tokens", "retries", "cache", "routes", "demo", "fallback")
+
+    def __init__(self, function):
+        self.function = function
+        self.started = time.perf_counter()
+        self.wall_time = 0.0
+        self.model_wait = 0.0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+        self.completion_tokens = 0
+        self.retries = 0
+        self.cache = None
+        self.routes = []
+        self.demo = False
+        self.fallback = False
+
+    @property
+    def outcome(self):
+        return "fallback" if self.fallback else "demo" if self.demo else "ok"
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__ if name != "started"}
+
+
+def _finish(record):
+    record.wall_time = time.perf_counter() - record.started
+
+    CALLS.inc(function=record.function, outcome=record.outcome)
+    CALL_DURATION.observe(record.wall_time, function=record.function)
+    if record.model_wait:
+        MODEL_WAIT.observe(record.model_wait, function=record.function)
+
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.append(record.as_dict())
+
+
+def instrumented(function_name):
+    """Decorator recording a CallRecord for each call of a function, coroutine or generator."""
+    def decorate(fn):
+        if not metrics_enabled():
+            return fn
+
+        if inspect.isgeneratorfunction(fn):
+            @functools.wraps(fn)
+            def generator_wrapper(*args, **kwargs):
+                record = CallRecord(function_name)
+                generator = fn(*args, **kwargs)
+                try:
+                    # The caller may resume us from anywhere, so the record is
+                    # made current only while the wrapped generator runs
+                    while True:
+                        token = _current_call.set(record)
+                        try:
+                            chunk = next(generator)
+                        except StopIteration:
+                            return
+                        finally:
+                            _current_call.reset(token)
+                        yield chunk
+                finally:
+                    generator.close()
+                    _finish(record)
+            return generator_wrapper
+
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                record = CallRecord(function_name)
+                token = _current_call.set(record)
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    _current_call.reset(token)
+                    _finish(record)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            record = CallRecord(function_name)
+            token = _current_call.set(record)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _current_call.reset(token)
+                _finish(record)
+        return wrapper
+
+    return decorate
+
+
+def current_call():
+    """The CallRecord of the instrumented call in progress, or None."""
+    return _current_call.get()
+
+
+def record_cache(hit):
+    record = _current_call.get()
+    if record is not None:
+        record.cache = "hit" if hit else "miss"
+        CACHE_REQUESTS.inc(function=record.function, result=record.cache)
+
+
+def record_sections(reused, recomputed):
+    """Count sections an incremental call reused from the session and recomputed."""
+    record = _current_call.get()
+    if record is not None:
+        SECTIONS.inc(reused, function=record.function, result="reused")
+        SECTIONS.inc(recomputed, function=record.function, result="recomputed")
+
+
+def record_route(function_name, tier, model, reason):
+    """Count and log a routing decision, and add it to the current call's record."""
+    logger.debug("Routed %s to %s tier (%s): %s", function_name, tier, model or "no model", reason)
+    record = _current_call.get()
+    if record is not None:
+        record.routes.append(f"{tier}:{model}" if model else tier)
+        ROUTES.inc(function=function_name, tier=tier)
+
+
+def record_structured(result):
+    """Count how a structured reply was accepted: valid, repaired, reasked, partial or failed."""
+    record = _current_call.get()
+    if record is not None:
+        STRUCTURED_REPLIES.inc(function=record.function, result=result)
+
+
+def record_retry():
+    record = _current_call.get()
+    if record is not None:
+        record.retries += 1
+        RETRIES.inc(function=record.function)
+
+
+def _cached_tokens(usage):
+    """Return usage.prompt_tokens_details.cached_tokens, or 0 if the API did not report it."""
+    # SDK versions that predate the field keep it as a plain dict
+    details = getattr(usage, "prompt_tokens_details", None)
+    if isinstance(details, dict):
+        return details.get("cached_tokens") or 0
+    return getattr(details, "cached_tokens", 0) or 0
+
+
+def record_model_call(seconds, response=None):
+    """Add API wait time and, if the response carries usage, its token counts."""
+    record = _current_call.get()
+    if record is None:
+        return
+    record.model_wait += seconds
+    usage = getattr(response, "usage", None)
+    if usage is not None:
+        prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+        cached_tokens = _cached_tokens(usage)
+        completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+        record.prompt_tokens += prompt_tokens
+        record.cached_tokens += cached_tokens
+        record.completion_tokens += completion_tokens
+        PROMPT_TOKENS.inc(prompt_tokens, function=record.function)
+        CACHED_PROMPT_TOKENS.inc(cached_tokens, function=record.function)
+        COMPLETION_TOKENS.inc(completion_tokens, function=record.function)
+
+
+def mark_demo():
+    """Note that the current call served demo-mode output."""
+    record = _current_call.get()
+    if record is not None:
+        record.demo = True
+
+
+def mark_fallback():
+    """Note that the current call failed and served its fallback output."""
+    record = _current_call.get()
+    if record is not None:
+        record.fallback = True
+
+
+class request_trace:
+    """Context manager collecting every CallRecord made inside it as a list of dicts.
+
+    Traces nest: on exit, the records also go to the enclosing trace.
+    """
+
+    def __enter__(self):
+        self.records = []
+        self._token = _current_trace.set(self.records)
+        return self.records
+
+    def __exit__(self, *exc_info):
+        _current_trace.reset(self._token)
+        outer = _current_trace.get()
+        if outer is not None:
+            outer.extend(self.records)
+        return False
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    escaped = (f'{key}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+               for key, value in labels.items())
+    return "{" + ",".join(escaped) + "}"
+
+
+def render_metrics():
+    """Return all metrics in the Prometheus text exposition format."""
+    lines = []
+    for metric in METRICS:
+        kind = "histogram" if isinstance(metric, Histogram) else "gauge" if isinstance(metric, Gauge) else "counter"
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {kind}")
+        for name, labels, value in metric.samples():
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+    return "\n".join(lines) + "\n"
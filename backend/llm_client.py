@@ -0,0 +1,411 @@
+"""
+Shared OpenAI client layer for the Resume Assistant.
+
+Wraps the sync and async OpenAI clients with:
+    - a tuned, shared httpx connection pool (keep-alive across calls; one
+      async pool per event loop)
+    - token-bucket rate limiting on requests/min and tokens/min
+    - jittered exponential backoff for 429, 5xx, timeouts and connection errors
+      (honouring Retry-After when the API sends it)
+    - a per-call deadline covering every attempt
+    - a circuit breaker that reports the provider as degraded after repeated
+      failures, so callers can switch to demo mode until it recovers
+
+Configuration (environment):
+    LLM_MAX_CONNECTIONS, LLM_MAX_KEEPALIVE_CONNECTIONS
+    LLM_REQUESTS_PER_MINUTE, LLM_TOKENS_PER_MINUTE
+    LLM_MAX_RETRIES, LLM_BACKOFF_BASE, LLM_BACKOFF_MAX
+    LLM_CALL_DEADLINE (seconds)
+    LLM_BREAKER_THRESHOLD (consecutive failures), LLM_BREAKER_COOLDOWN (seconds)
+"""
+
+import asyncio
+import os
+import random
+import threading
+import time
+import weakref
+
+from instrumentation import logger, record_model_call, record_retry
+from prompt_builder import count_tokens
+
+RETRYABLE_STATUS_CODES = {408, 409, 429}
+DEFAULT_COMPLETION_TOKENS = 500
+
+
+class RateLimitTimeout(Exception):
+    """Raised when the rate limiter cannot grant capacity before the call deadline."""
+
+
+class CircuitOpenError(Exception):
+    """Raised when the circuit breaker is open and calls are being short-circuited."""
+
+
+def _env_number(name, default, cast=float):
+    value = os.environ.get(name)
+    return cast(value) if value not in (None, "") else default
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at rate_per_minute."""
+
+    def __init__(self, rate_per_minute, capacity=None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or rate_per_minute
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount):
+        """Take amount now (possibly going into debt) and return the seconds to wait."""
+        amount = min(amount, self.capacity)
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= amount
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def refund(self, amount):
+        """Give back capacity reserved for a request that never reached the API."""
+        amount = min(amount, self.capacity)
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + amount)
+
+
+# CircuitBreaker.allow() result for the one call let through to test recovery
+TRIAL = "trial"
+
+
+class CircuitBreaker:
+    """Opens after threshold consecutive failures; allows one trial call after cooldown."""
+
+    def __init__(self, threshold=5, cooldown=30.0):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        """True while calls should be short-circuited."""
+        with self._lock:
+            if self._opened_at is None:
+                return False
+            return self._trial_in_flight or time.monotonic() - self._opened_at < self.cooldown
+
+    def allow(self):
+        """Return whether a call may go ahead: True while closed, TRIAL for the half-open trial call."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._trial_in_flight or time.monotonic() - self._opened_at < self.cooldown:
+                return False
+            self._trial_in_flight = True
+            return TRIAL
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def release_trial(self):
+        """End the trial call without a verdict on the provider's health; the next call is the new trial."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._opened_at is not None or self._failures >= self.threshold:
+                if self._opened_at is None:
+                    logger.warning("OpenAI circuit breaker opened after %d consecutive failures", self._failures)
+                self._opened_at = time.monotonic()
+
+
+def _status_code(error):
+    return getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+
+
+def is_retryable(error):
+    """True for rate limits, server errors, timeouts and dropped connections."""
+    status = _status_code(error)
+    if status is not None:
+        return status in RETRYABLE_STATUS_CODES or status >= 500
+    if isinstance(error, (TimeoutError, asyncio.TimeoutError, ConnectionError)):
+        return True
+    return type(error).__name__ in ("APITimeoutError", "APIConnectionError")
+
+
+def never_sent(error):
+    """True for errors raised before the request reached the provider (connection failures).
+
+    Timeouts and HTTP errors are not: the provider may have used, or is
+    counting against, the request's budget.
+    """
+    if _status_code(error) is not None:
+        return False
+    if isinstance(error, (TimeoutError, asyncio.TimeoutError)) or type(error).__name__ == "APITimeoutError":
+        return False
+    return isinstance(error, ConnectionError) or type(error).__name__ in ("APIConnectionError", "ConnectError")
+
+
+def _retry_after(error):
+    """Seconds requested by a Retry-After header, if present."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class LLMClient:
+    """Pooled, rate-limited, retrying front end for chat completions."""
+
+    def __init__(self, api_key):
+        self.api_key = api_key
+        self.max_connections = _env_number("LLM_MAX_CONNECTIONS", 20, int)
+        self.max_keepalive = _env_number("LLM_MAX_KEEPALIVE_CONNECTIONS", 10, int)
+        self.max_retries = _env_number("LLM_MAX_RETRIES", 4, int)
+        self.backoff_base = _env_number("LLM_BACKOFF_BASE", 0.5)
+        self.backoff_max = _env_number("LLM_BACKOFF_MAX", 20.0)
+        self.deadline = _env_number("LLM_CALL_DEADLINE", 60.0)
+
+        self.request_bucket = TokenBucket(_env_number("LLM_REQUESTS_PER_MINUTE", 3500, int))
+        self.token_bucket = TokenBucket(_env_number("LLM_TOKENS_PER_MINUTE", 90000, int))
+        self.breaker = CircuitBreaker(
+            threshold=_env_number("LLM_BREAKER_THRESHOLD", 5, int),
+            cooldown=_env_number("LLM_BREAKER_COOLDOWN", 30.0)
+        )
+
+        self._client = None
+        # httpx async connections belong to the event loop that opened them
+        self._async_clients = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    # Client construction
+
+    def _limits(self):
+        import httpx
+        return httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_keepalive)
+
+    @property
+    def client(self):
+        """The shared sync OpenAI client (SDK retries off; this class retries)."""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    import httpx
+                    from openai import OpenAI
+                    self._client = OpenAI(
+                        api_key=self.api_key,
+                        max_retries=0,
+                        http_client=httpx.Client(limits=self._limits(), timeout=self.deadline)
+                    )
+        return self._client
+
+    @property
+    def async_client(self):
+        """The running event loop's AsyncOpenAI client, on its own pooled httpx.AsyncClient.
+
+        Each loop gets its own client, so repeated asyncio.run() calls never
+        reuse a connection opened on a loop that has since closed.
+        """
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            with self._lock:
+                client = self._async_clients.get(loop)
+                if client is None:
+                    import httpx
+                    from openai import AsyncOpenAI
+                    client = self._async_clients[loop] = AsyncOpenAI(
+                        api_key=self.api_key,
+                        max_retries=0,
+                        http_client=httpx.AsyncClient(limits=self._limits(), timeout=self.deadline)
+                    )
+        return client
+
+    @property
+    def degraded(self):
+        """True while the circuit breaker is open."""
+        return self.breaker.is_open
+
+    # Shared helpers
+
+    def _estimated_tokens(self, params):
+        prompt_tokens = sum(count_tokens(message.get("content") or "") + 4 for message in params.get("messages", []))
+        return prompt_tokens + (params.get("max_tokens") or DEFAULT_COMPLETION_TOKENS)
+
+    def _rate_limit_wait(self, params, deadline):
+        """Reserve rate-limit capacity for one attempt; return (seconds to wait, tokens reserved)."""
+        tokens = self._estimated_tokens(params)
+        wait = max(self.request_bucket.reserve(1), self.token_bucket.reserve(tokens))
+        if time.monotonic() + wait > deadline:
+            self._refund(tokens)
+            raise RateLimitTimeout(f"Rate limit wait of {wait:.1f}s exceeds the call deadline")
+        return wait, tokens
+
+    def _refund(self, tokens):
+        """Return one attempt's request and token reservations (None if nothing was reserved)."""
+        if tokens is not None:
+            self.request_bucket.refund(1)
+            self.token_bucket.refund(tokens)
+
+    def _backoff(self, attempt, error, deadline):
+        """Return the delay before the next attempt, or None to give up."""
+        if attempt >= self.max_retries or not is_retryable(error):
+            return None
+        delay = _retry_after(error)
+        if delay is None:
+            # Full jitter keeps a burst of failed callers from retrying in lockstep
+            delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        if time.monotonic() + delay >= deadline:
+            return None
+        return delay
+
+    def _request_options(self, params, deadline):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError("OpenAI call deadline exceeded")
+        return dict(params, timeout=remaining)
+
+    def _record_failure(self, error, trial):
+        # Client errors such as a bad request say nothing about the provider's health
+        if is_retryable(error):
+            self.breaker.record_failure()
+        else:
+            self._record_no_verdict(trial)
+
+    def _record_no_verdict(self, trial):
+        if trial:
+            self.breaker.release_trial()
+
+    def _watch_stream(self, stream, trial):
+        """Yield a stream's chunks, recording the breaker outcome once it is consumed."""
+        try:
+            for chunk in stream:
+                yield chunk
+        except GeneratorExit:
+            # Abandoned by the caller
+            self._record_no_verdict(trial)
+            raise
+        except Exception as e:
+            self._record_failure(e, trial)
+            raise
+        self.breaker.record_success()
+
+    async def _watch_stream_async(self, stream, trial):
+        """Async counterpart of _watch_stream()."""
+        try:
+            async for chunk in stream:
+                yield chunk
+        except (GeneratorExit, asyncio.CancelledError):
+            self._record_no_verdict(trial)
+            raise
+        except Exception as e:
+            self._record_failure(e, trial)
+            raise
+        self.breaker.record_success()
+
+    # Public API
+
+    def create(self, deadline=None, **params):
+        """Run chat.completions.create with rate limiting, retries and the breaker."""
+        admitted = self.breaker.allow()
+        if not admitted:
+            raise CircuitOpenError("OpenAI is degraded; circuit breaker is open")
+        trial = admitted == TRIAL
+
+        deadline = time.monotonic() + (deadline or self.deadline)
+        attempt = 0
+        while True:
+            reserved = None
+            sent = False
+            try:
+                wait, reserved = self._rate_limit_wait(params, deadline)
+                if wait:
+                    time.sleep(wait)
+                options = self._request_options(params, deadline)
+                sent = True
+                started = time.perf_counter()
+                try:
+                    response = self.client.chat.completions.create(**options)
+                except Exception:
+                    record_model_call(time.perf_counter() - started)
+                    raise
+                record_model_call(time.perf_counter() - started, response)
+                if params.get("stream"):
+                    # The outcome is known only once the stream has been read to the end
+                    return self._watch_stream(response, trial)
+                self.breaker.record_success()
+                return response
+            except Exception as e:
+                # Only a request that never reached the provider gives its capacity back;
+                # 429s, server errors and timeouts keep theirs so the limiter stays tight
+                if not sent or never_sent(e):
+                    self._refund(reserved)
+                delay = self._backoff(attempt, e, deadline)
+                if delay is None:
+                    self._record_failure(e, trial)
+                    raise
+                attempt += 1
+                record_retry()
+                time.sleep(delay)
+
+    async def acreate(self, deadline=None, **params):
+        """Async counterpart of create()."""
+        admitted = self.breaker.allow()
+        if not admitted:
+            raise CircuitOpenError("OpenAI is degraded; circuit breaker is open")
+        trial = admitted == TRIAL
+
+        deadline = time.monotonic() + (deadline or self.deadline)
+        attempt = 0
+        while True:
+            reserved = None
+            sent = False
+            try:
+                wait, reserved = self._rate_limit_wait(params, deadline)
+                if wait:
+                    await asyncio.sleep(wait)
+                options = self._request_options(params, deadline)
+                sent = True
+                started = time.perf_counter()
+                try:
+                    response = await self.async_client.chat.completions.create(**options)
+                except Exception:
+                    record_model_call(time.perf_counter() - started)
+                    raise
+                record_model_call(time.perf_counter() - started, response)
+                if params.get("stream"):
+                    # The outcome is known only once the stream has been read to the end
+                    return self._watch_stream_async(response, trial)
+                self.breaker.record_success()
+                return response
+            except asyncio.CancelledError:
+                if not sent:
+                    self._refund(reserved)
+                self._record_no_verdict(trial)
+                raise
+            except Exception as e:
+                # Only a request that never reached the provider gives its capacity back;
+                # 429s, server errors and timeouts keep theirs so the limiter stays tight
+                if not sent or never_sent(e):
+                    self._refund(reserved)
+                delay = self._backoff(attempt, e, deadline)
+                if delay is None:
+                    self._record_failure(e, trial)
+                    raise
+                attempt += 1
+                record_retry()
+                try:
+                    await asyncio.sleep(delay)
+                except asyncio.CancelledError:
+                    self._record_no_verdict(trial)
+                    raise
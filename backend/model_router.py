@@ -0,0 +1,98 @@
+"""
+Model routing: send each request to the cheapest tier that can handle it.
+
+    local   the keyword engine and relevance scores; no API call
+    small   a small, fast model for short or structured work (summaries,
+            tips, skill priorities, batch tailoring, single CV sections)
+    large   a large model, only for rewriting a whole CV
+
+Functions ask the router for a Route (tier, model, reason) and call the
+model it names. Every decision is logged at DEBUG, counted in
+resume_route_decisions_total and added to the call's trace record.
+
+With routing disabled, every call goes to one model, as before routing
+existed: OPENAI_MODEL, or the small model if that is not set.
+
+Configuration (environment):
+    ROUTER_ENABLED            false skips the local tier and sends every call to one model
+    OPENAI_MODEL              the model used for every call while routing is disabled
+    ROUTER_SMALL_MODEL        model for the small tier
+    ROUTER_LARGE_MODEL        model for the large tier
+    ROUTER_LARGE_MIN_TOKENS   CV rewrites of a CV and job description with fewer tokens than this use the small tier
+    ROUTER_LOCAL_HIGH_SCORE   skill relevance from which a skill is high priority without a model
+"""
+
+import os
+import threading
+from collections import namedtuple
+
+from instrumentation import record_route
+from response_cache import env_flag
+
+DEFAULT_SMALL_MODEL = "gpt-4o-mini"
+DEFAULT_LARGE_MODEL = "gpt-4o"
+
+Route = namedtuple("Route", ["tier", "model", "reason"])
+
+
+class ModelRouter:
+    """Chooses a tier and model per request from configurable thresholds."""
+
+    def __init__(self, small_model=DEFAULT_SMALL_MODEL, large_model=DEFAULT_LARGE_MODEL, large_min_tokens=400,
+                 local_high_score=1.0, enabled=True, default_model=None):
+        self.small_model = small_model
+        self.large_model = large_model
+        self.default_model = default_model or small_model
+        self.large_min_tokens = large_min_tokens
+        self.local_high_score = local_high_score
+        self.enabled = enabled
+
+    @property
+    def signature(self):
+        """A string that changes whenever routing could pick different models."""
+        if not self.enabled:
+            return f"{self.default_model}/disabled"
+        return f"{self.small_model}/{self.large_model}/{self.large_min_tokens}"
+
+    def route(self, function_name, tier, reason):
+        """Record a decision for tier and return its Route."""
+        if not self.enabled:
+            tier, reason = "default", "routing disabled"
+        model = {"small": self.small_model, "large": self.large_model, "default": self.default_model}.get(tier)
+        record_route(function_name, tier, model, reason)
+        return Route(tier, model, reason)
+
+    def task(self, function_name, reason="short task"):
+        """Route short or structured work to the small tier."""
+        return self.route(function_name, "small", reason)
+
+    def rewrite(self, function_name, input_tokens):
+        """Route a whole-CV rewrite: the large tier unless its CV and job description are short.
+
+        input_tokens counts the variable inputs only, so the fixed
+        instructions and examples in the prompt do not move the threshold.
+        """
+        if input_tokens >= self.large_min_tokens:
+            return self.route(function_name, "large", f"CV rewrite of {input_tokens} input tokens")
+        return self.route(function_name, "small", f"short CV rewrite of {input_tokens} input tokens")
+
+
+_router = None
+_router_lock = threading.Lock()
+
+
+def get_router():
+    """Return the shared ModelRouter, configured from the environment on first use."""
+    global _router
+    if _router is None:
+        with _router_lock:
+            if _router is None:
+                _router = ModelRouter(
+                    small_model=os.environ.get("ROUTER_SMALL_MODEL", DEFAULT_SMALL_MODEL),
+                    large_model=os.environ.get("ROUTER_LARGE_MODEL", DEFAULT_LARGE_MODEL),
+                    large_min_tokens=int(os.environ.get("ROUTER_LARGE_MIN_TOKENS", "400")),
+                    local_high_score=float(os.environ.get("ROUTER_LOCAL_HIGH_SCORE", "1.0")),
+                    enabled=env_flag("ROUTER_ENABLED", True),
+                    default_model=os.environ.get("OPENAI_MODEL")
+                )
+    return _router
@@ -7,6 +7,23 @@ This script demonstrates how to use the OpenAI API to enhance resume generation:
 3. Enhancing job descriptions
 4. Providing pro tips for resume improvement
 
+Each function also has an async variant built on AsyncOpenAI, and
+enhance_all() runs all four concurrently. optimize_cv_content_stream()
+yields the optimized CV as it is generated, and tailor_cv_for_jobs()
+scores and tailors one CV against many job descriptions. The *_incremental
+variants reuse per-section results from the session's previous request,
+and start_session()/session_result() keep a session's parsed CV, job
+keywords and results in the session store for later steps of the flow.
+
+In API mode, model_router picks the model for every call: skills the
+keyword engine can prioritize confidently skip the API, short work goes to
+a small model and only whole-CV rewrites go to the large one.
+
+Functions that take CV text also accept a ParsedCV (see cv_parser), so a
+request can parse the CV once and pass it to every function.
+enhance_resume_summary then uses the CV's summary section and
+prioritize_skills its skills list.
+
 The script will run in demo mode if no valid OpenAI API key is provided.
 """
 
@@ -14,11 +31,30 @@ import os
 import sys
 import json
 import re
+import asyncio
+import logging
+
+from prompt_builder import PROMPT_BUDGETS, PromptTemplate, count_tokens, fit_inputs, fit_text
+from cv_parser import ParsedCV, analyze_text, as_parsed, cv_text, merge_analyses
+from executors import as_completed_io, run_cpu, run_cpu_async, should_offload, submit_io
+from incremental import fingerprint, get_incremental_store, normalize_text
+from model_router import get_router
+from instrumentation import (
+    configure_logging, instrumented, logger, mark_demo, mark_fallback, record_cache, record_sections, record_structured,
+    request_trace
+)
+from response_cache import env_flag, get_response_cache, make_cache_key
+from session_store import SessionExpired, get_session_store
+from single_flight import get_single_flight
+from skill_matcher import get_default_matcher
+from skill_taxonomy import normalize_key
+from structured_output import Field, RecordSchema, read_records
 
 # Load environment variables
 try:
     from dotenv import load_dotenv
     load_dotenv()
+    configure_logging()
 except ImportError:
     print("Error: python-dotenv not installed. Run 'pip install python-dotenv'")
     sys.exit(1)
@@ -27,6 +63,12 @@ except ImportError:
 OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY')
 USE_DEMO_MODE = not OPENAI_API_KEY or OPENAI_API_KEY in ('your_openai_api_key_here', 'your-openai-api-key-here')
 
+# Skills, synonyms, priority weights and the summary keywords come from the
+# skill taxonomy; every lookup goes through the shared skill matcher
+PRIORITY_LEVELS = ["low", "medium", "high"]
+PRO_TIPS_CATEGORIES = ["frameworks", "markup", "data", "testing", "responsive", "process"]
+CV_OPTIMIZE_CATEGORIES = ["frameworks", "data", "markup", "responsive", "testing", "process"]
+
 # HR Bot system instructions
 HR_BOT_SYSTEM_INSTRUCTIONS = """You are HR Bot, an intelligent AI-powered assistant embedded within our resume optimization platform. Your role is to help job seekers maximize their opportunities by:
 
@@ -42,414 +84,1462 @@ You are integrated with our updated components—including JobList, CVPreview, a
 Ensure that your responses are clear, professional, and customized to the user's context. If a request is ambiguous, ask clarifying questions before proceeding. Use your full AI capabilities to generate content that is insightful, precise, and useful."""
 
 if USE_DEMO_MODE:
-    print("Notice: Using DEMO MODE because no valid OpenAI API key was found in .env file")
-    print("To use actual OpenAI API, add your API key to the .env file: OPENAI_API_KEY=your-actual-key")
+    logger.warning("Notice: Using DEMO MODE because no valid OpenAI API key was found in .env file")
+    logger.warning("To use actual OpenAI API, add your API key to the .env file: OPENAI_API_KEY=your-actual-key")
 else:
-    # Import OpenAI
-    try:
-        import openai
-        from openai import OpenAI
-        client = OpenAI(api_key=OPENAI_API_KEY)
-    except ImportError:
+    # The OpenAI SDK (and httpx/pydantic) is imported by LLMClient on the first
+    # call; only check here that it is installed
+    from importlib.util import find_spec
+    if find_spec("openai") is None:
         print("Error: OpenAI package not installed. Run 'pip install openai'")
         sys.exit(1)
+    from llm_client import LLMClient
+    client = LLMClient(api_key=OPENAI_API_KEY)
+
+# Completion parameters for each OpenAI-backed function
+SUMMARY_PARAMS = {"max_tokens": 150, "temperature": 0.7}
+SKILLS_PARAMS = {"temperature": 0.3, "response_format": {"type": "json_object"}}
+PRO_TIPS_PARAMS = {"max_tokens": 400, "temperature": 0.6}
+OPTIMIZE_CV_PARAMS = {"max_tokens": 1500, "temperature": 0.4}
+# Longest section rewritten in one call: its reply (up to 2 * tokens + 100) must fit max_tokens
+SECTION_CHUNK_TOKENS = (OPTIMIZE_CV_PARAMS["max_tokens"] - 100) // 2
+
+# Limits for enhance_all
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_CALL_TIMEOUT = 30.0
+
+# Limits for tailor_cv_for_jobs: jobs are packed into as few prompts as fit
+BATCH_PROMPT_TOKEN_BUDGET = 6000
+BATCH_OUTPUT_TOKENS_PER_JOB = 250
+BATCH_MAX_OUTPUT_TOKENS = 4000
+BATCH_TEMPERATURE = 0.6
+
+FALLBACK_PRO_TIPS = [
+    "Tailor your resume to match the specific job description",
+    "Quantify your achievements with specific metrics",
+    "Use industry-relevant keywords throughout your resume",
+    "Focus on your most relevant skills and experience",
+    "Ensure your resume is free of errors and professionally formatted"
+]
+
+def _use_demo_mode():
+    """True without an API key, or while the OpenAI circuit breaker is open."""
+    return USE_DEMO_MODE or client.degraded
+
+def _text_size(*values):
+    """Total characters of the text inputs, used to decide whether to offload analysis."""
+    return sum(len(cv_text(value) or "") for value in values if isinstance(value, (str, ParsedCV)))
+
+def _semantic_matcher():
+    """Return the semantic matcher if SEMANTIC_MATCHING is on, else None (numpy loads only when on)."""
+    if not env_flag("SEMANTIC_MATCHING"):
+        return None
+    from semantic_matching import get_semantic_matcher
+    return get_semantic_matcher()
+
+def _present_in_cv(skills, cv_terms, cv=None):
+    """Return, per skill, whether the CV has it.
+
+    A skill is present if it is one of the CV's terms or, with semantic
+    matching on, if the CV's skills list names a variant of it ("React 18"
+    for "React").
+    """
+    present = [skill.lower() in cv_terms for skill in skills]
+    semantic = _semantic_matcher()
+    if semantic is not None and cv is not None and not all(present):
+        absent = [skill for skill, found in zip(skills, present) if not found]
+        covered = iter(semantic.covered(absent, as_parsed(cv).skills))
+        present = [found or next(covered) for found in present]
+    return present
+
+def _semantic_skill_matches(semantic, candidate_skills, job_description):
+    """Return (vocabulary skill or None, similarity to the job) lists for the skills; empty matches without semantic."""
+    if semantic is None:
+        return [None] * len(candidate_skills), [0.0] * len(candidate_skills)
+    similarities = [similarity for _, similarity in semantic.match_job(candidate_skills, job_description)]
+    return semantic.canonical(candidate_skills), similarities
+
+def _chat_messages(prompt):
+    """Return the HR Bot system message followed by the user prompt."""
+    return [
+        {"role": "system", "content": HR_BOT_SYSTEM_INSTRUCTIONS},
+        {"role": "user", "content": prompt}
+    ]
+
+def _chat_completion(function_name, prompt, model, cacheable=None, **params):
+    """Send the HR Bot system message plus prompt, returning the reply text.
+
+    Replies are served from the response cache when the same function, model,
+    messages and sampling parameters were seen before, and identical calls
+    already in flight share one API request. Replies that cacheable (if
+    given) rejects, such as incomplete structured output, are returned but
+    not cached.
+    """
+    messages = _chat_messages(prompt)
+    cache = get_response_cache()
+    key = make_cache_key(function_name, model, messages, **params)
+    
+    cached = cache.get(key)
+    record_cache(cached is not None)
+    if cached is not None:
+        return cached
+    
+    def call():
+        response = client.create(model=model, messages=messages, **params)
+        content = response.choices[0].message.content
+        if cacheable is None or cacheable(content):
+            cache.set(key, content)
+        return content
+    
+    return get_single_flight().do(key, call, lookup=lambda: cache.get(key))
+
+def _chat_completion_stream(function_name, prompt, model, **params):
+    """Yield the reply text in chunks as the model generates it.
+
+    Shares cache entries with _chat_completion: a cached reply is yielded
+    whole, and a completed stream is stored for later calls.
+    """
+    messages = _chat_messages(prompt)
+    cache = get_response_cache()
+    key = make_cache_key(function_name, model, messages, **params)
+    
+    cached = cache.get(key)
+    record_cache(cached is not None)
+    if cached is not None:
+        yield cached
+        return
+    
+    stream = client.create(model=model, messages=messages, stream=True, **params)
+    parts = []
+    for chunk in stream:
+        if not chunk.choices:
+            continue
+        content = chunk.choices[0].delta.content
+        if content:
+            parts.append(content)
+            yield content
+    cache.set(key, "".join(parts))
+
+def _fit_prompt_inputs(function_name, **inputs):
+    """Trim prompt inputs to the function's token budget and report the savings."""
+    fitted, report = fit_inputs(function_name, **inputs)
+    if report.saved_tokens:
+        logger.info("Prompt inputs for %s: %d tokens, saved %d (%d paragraphs dropped)",
+                    function_name, report.tokens, report.saved_tokens, report.dropped_paragraphs)
+    return fitted
+
+async def _chat_completion_async(function_name, prompt, model, timeout=None, cacheable=None, **params):
+    """Async counterpart of _chat_completion; timeout bounds the API call in seconds."""
+    messages = _chat_messages(prompt)
+    cache = get_response_cache()
+    key = make_cache_key(function_name, model, messages, **params)
+    
+    cached = cache.get(key)
+    record_cache(cached is not None)
+    if cached is not None:
+        return cached
+    
+    async def call():
+        response = await client.acreate(deadline=timeout, model=model, messages=messages, **params)
+        content = response.choices[0].message.content
+        if cacheable is None or cacheable(content):
+            cache.set(key, content)
+        return content
+    
+    return await asyncio.wait_for(get_single_flight().do_async(key, call), timeout)
+
+# Resume summary
+
+def _demo_enhance_resume_summary(basic_summary, job_description, job_terms=None):
+    """Build a simulated enhanced summary from key terms in the job description."""
+    # Create a simulated enhanced summary based on key terms in the job description
+    if job_terms is None:
+        job_terms = get_default_matcher().terms_in(job_description)
+    matched_keywords = get_default_matcher().taxonomy.tagged("summary", job_terms)
+    
+    if "Senior" in job_description or "Sr" in job_description:
+        experience_level = "senior-level"
+    elif "Junior" in job_description or "Jr" in job_description:
+        experience_level = "junior-level"
+    else:
+        experience_level = "mid-level"
+        
+    if matched_keywords:
+        keyword_phrase = ", ".join(matched_keywords[:3])
+        return f"Accomplished {experience_level} software developer with 5+ years of experience specializing in {keyword_phrase}. Proven track record of building responsive, user-friendly web applications with a focus on code quality and performance optimization."
+    else:
+        return f"Versatile {experience_level} developer with extensive experience in web development and a passion for creating intuitive, high-performance applications. Combines strong technical skills with collaborative problem-solving to deliver outstanding user experiences."
 
+def _basic_summary(summary):
+    """Return summary text, taking a ParsedCV's summary section if given one."""
+    if isinstance(summary, ParsedCV):
+        return summary.body(summary.section("summary"))
+    return summary
+
+SUMMARY_PROMPT = PromptTemplate(
+    "Create a professional and tailored resume summary from the basic summary and job description given.",
+    """
+    Create a professional summary that:
+    1. Is 2-3 sentences long
+    2. Highlights relevant skills and experience
+    3. Is tailored to the specific job description
+    4. Uses professional, confident language
+    5. Avoids clichés and generic statements
+
+    Return ONLY the enhanced summary text with no additional commentary.
+    """,
+    [("basic_summary", "Basic Summary"), ("job_description", "Job Description")]
+)
+
+def _enhance_resume_summary_prompt(basic_summary, job_description):
+    """Build the user prompt for enhance_resume_summary."""
+    fitted = _fit_prompt_inputs("enhance_resume_summary", basic_summary=basic_summary, job_description=job_description)
+    return SUMMARY_PROMPT.render(**fitted)
+
+@instrumented("enhance_resume_summary")
 def enhance_resume_summary(basic_summary, job_description):
     """Generate an enhanced professional summary for a resume based on a job description."""
+    basic_summary = _basic_summary(basic_summary)
     try:
-        print(f"Enhancing resume summary for job...")
+        logger.info("Enhancing resume summary for job...")
         
-        if USE_DEMO_MODE:
-            print("DEMO MODE: Generating simulated response...")
-            
-            # Create a simulated enhanced summary based on key terms in the job description
-            keywords = ["React", "TypeScript", "CSS", "responsive", "Redux", "GraphQL", "testing"]
-            matched_keywords = [kw for kw in keywords if kw.lower() in job_description.lower()]
-            
-            if "Senior" in job_description or "Sr" in job_description:
-                experience_level = "senior-level"
-            elif "Junior" in job_description or "Jr" in job_description:
-                experience_level = "junior-level"
-            else:
-                experience_level = "mid-level"
-                
-            if matched_keywords:
-                keyword_phrase = ", ".join(matched_keywords[:3])
-                return f"Accomplished {experience_level} software developer with 5+ years of experience specializing in {keyword_phrase}. Proven track record of building responsive, user-friendly web applications with a focus on code quality and performance optimization."
-            else:
-                return f"Versatile {experience_level} developer with extensive experience in web development and a passion for creating intuitive, high-performance applications. Combines strong technical skills with collaborative problem-solving to deliver outstanding user experiences."
+        if _use_demo_mode():
+            mark_demo()
+            logger.debug("DEMO MODE: Generating simulated response...")
+            return run_cpu(_demo_enhance_resume_summary, basic_summary, job_description, size=_text_size(basic_summary, job_description))
         
         # If not in demo mode, use actual OpenAI API
-        prompt = f"""
-        Create a professional and tailored resume summary based on the following information:
-
-        Basic Summary: {basic_summary}
-        
-        Job Description: {job_description}
-        
-        Create a professional summary that:
-        1. Is 2-3 sentences long
-        2. Highlights relevant skills and experience
-        3. Is tailored to the specific job description
-        4. Uses professional, confident language
-        5. Avoids clichés and generic statements
-        
-        Return ONLY the enhanced summary text with no additional commentary.
-        """
-        
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": HR_BOT_SYSTEM_INSTRUCTIONS},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=150,
-            temperature=0.7
-        )
-        
-        enhanced_summary = response.choices[0].message.content.strip()
+        prompt = _enhance_resume_summary_prompt(basic_summary, job_description)
+        route = get_router().task("enhance_resume_summary")
+        enhanced_summary = _chat_completion("enhance_resume_summary", prompt, route.model, **SUMMARY_PARAMS).strip()
         return enhanced_summary
         
     except Exception as e:
-        print(f"Error enhancing resume summary: {str(e)}")
+        logger.warning("Error enhancing resume summary: %s", str(e))
+        mark_fallback()
         return basic_summary
 
-def prioritize_skills(candidate_skills, job_description):
-    """Prioritize and enhance skills based on job description."""
+@instrumented("enhance_resume_summary")
+async def enhance_resume_summary_async(basic_summary, job_description, timeout=None):
+    """Async version of enhance_resume_summary."""
+    basic_summary = _basic_summary(basic_summary)
     try:
-        print(f"Prioritizing {len(candidate_skills)} skills based on job description...")
+        if _use_demo_mode():
+            mark_demo()
+            return await run_cpu_async(_demo_enhance_resume_summary, basic_summary, job_description, size=_text_size(basic_summary, job_description))
         
-        if USE_DEMO_MODE:
-            print("DEMO MODE: Generating simulated response...")
-            
-            # Create simulated prioritized skills
-            high_priority_terms = ["React", "TypeScript", "Redux", "responsive", "testing"]
-            medium_priority_terms = ["JavaScript", "CSS", "HTML", "REST", "Git"]
-            
-            prioritized = []
-            for skill in candidate_skills:
-                skill_name = skill
-                
-                # Determine priority based on presence in the job description and key terms
-                job_desc_lower = job_description.lower()
-                skill_lower = skill.lower()
-                
-                # First check if the skill itself is mentioned in the job description (direct match)
-                if skill_lower in job_desc_lower:
-                    # Direct mention in job description is high priority
-                    priority = "high"
-                # Then check if it matches any high priority terms
-                elif any(term.lower() in skill_lower for term in high_priority_terms):
-                    # Check if the term is also in the job description
-                    if any(term.lower() in job_desc_lower for term in high_priority_terms if term.lower() in skill_lower):
-                        priority = "high"
-                    else:
-                        priority = "medium"
-                # Then check for medium priority matches
-                elif any(term.lower() in skill_lower for term in medium_priority_terms):
-                    # Check if the term is also in the job description
-                    if any(term.lower() in job_desc_lower for term in medium_priority_terms if term.lower() in skill_lower):
-                        priority = "medium"
-                    else:
-                        priority = "low"
-                else:
-                    priority = "low"
-                    
-                prioritized.append({"name": skill_name, "priority": priority})
-                
-            return prioritized
-            
-        # If not in demo mode, use actual OpenAI API
-        skills_json = json.dumps(candidate_skills)
+        prompt = _enhance_resume_summary_prompt(basic_summary, job_description)
+        route = get_router().task("enhance_resume_summary")
+        enhanced_summary = await _chat_completion_async(
+            "enhance_resume_summary", prompt, route.model, timeout=timeout, **SUMMARY_PARAMS
+        )
+        return enhanced_summary.strip()
         
-        prompt = f"""
-        Analyze this job description and prioritize the candidate's skills:
+    except Exception as e:
+        logger.warning("Error enhancing resume summary: %s", str(e) or type(e).__name__)
+        mark_fallback()
+        return basic_summary
+
+# Skill prioritization
 
-        Job Description: {job_description}
+def _demo_prioritize_skills(candidate_skills, job_description):
+    """Assign simulated priorities from the skill taxonomy."""
+    # Scan the job description once; each skill name is a short scan of its own
+    matcher = get_default_matcher()
+    priority_keys = matcher.taxonomy.priority_keys
+    job_desc_lower = job_description.lower()
+    job_terms = matcher.terms_in(job_description)
+    
+    # Numeric relevance for every skill from one sparse matrix product
+    # (numpy/scipy load on first use rather than at import)
+    from relevance_scoring import SkillScorer, priority_buckets
+    scores = SkillScorer(candidate_skills).score([job_description])[:, 0]
+    buckets = priority_buckets(scores)
+    
+    # Semantic matching reads variants the keyword scan misses ("React 18", "unit tests")
+    semantic = _semantic_matcher()
+    canonical, similarities = _semantic_skill_matches(semantic, candidate_skills, job_description)
+    
+    prioritized = []
+    for skill, score, bucket, known, similarity in zip(candidate_skills, scores, buckets, canonical, similarities):
+        skill_name = skill
+        skill_lower = skill.lower()
+        skill_terms = matcher.terms_in(skill) or (matcher.terms_in(known) if known else set())
+        high_terms = skill_terms & priority_keys["high"]
+        medium_terms = skill_terms & priority_keys["medium"]
         
-        Candidate Skills: {skills_json}
+        # First check if the skill itself is mentioned in the job description (direct match)
+        if skill_lower in job_desc_lower:
+            # Direct mention in job description is high priority
+            priority = "high"
+        # Then check if it matches any high priority terms that are also in the job description
+        elif high_terms:
+            priority = "high" if high_terms & job_terms else "medium"
+        # Then check for medium priority matches
+        elif medium_terms:
+            priority = "medium" if medium_terms & job_terms else "low"
+        else:
+            priority = "low"
         
-        For each skill, determine:
-        1. Relevance to the job (high, medium, low)
-        2. How to phrase it professionally
+        # A strong token-level match can still raise the priority
+        if PRIORITY_LEVELS.index(bucket) > PRIORITY_LEVELS.index(priority):
+            priority = str(bucket)
         
-        Return a JSON array of skills with each skill having:
-        - name: The skill name (possibly rephrased)
-        - priority: "high", "medium", or "low" based on relevance
+        # So can a close semantic match with a phrase of the job description
+        if semantic is not None:
+            if similarity >= semantic.match_threshold:
+                priority = "high"
+            elif similarity >= semantic.related_threshold and priority == "low":
+                priority = "medium"
+            
+        prioritized.append({"name": skill_name, "priority": priority, "score": round(float(score), 4)})
+        
+    return prioritized
+
+def _triage_skills(candidate_skills, job_description, high_score):
+    """Prioritize the skills the keyword engine can call with confidence; return (local, remaining).
+
+    A skill named verbatim in the job description, or whose words all count
+    toward a relevance of at least high_score, is high priority. A known
+    skill none of whose words appear, from a category the job does not
+    mention at all, is low priority. Every other skill needs a model.
+    """
+    if not candidate_skills:
+        return [], []
+    from relevance_scoring import SkillScorer
+    matcher = get_default_matcher()
+    job_desc_lower = job_description.lower()
+    job_categories = {hit.category for hit in matcher.find_all(job_description)}
+    scores = SkillScorer(candidate_skills).score([job_description])[:, 0]
+    semantic = _semantic_matcher()
+    canonical, similarities = _semantic_skill_matches(semantic, candidate_skills, job_description)
+    
+    local, remaining = [], []
+    for skill, score, known, similarity in zip(candidate_skills, scores, canonical, similarities):
+        named = re.search(r'(?<![\w+#])' + re.escape(skill.lower()) + r'(?![\w+#])', job_desc_lower)
+        if named or score >= high_score or (semantic is not None and similarity >= semantic.match_threshold):
+            local.append({"name": skill, "priority": "high"})
+            continue
+        categories = {hit.category for hit in matcher.find_all(known or skill)}
+        unrelated = semantic is None or similarity < semantic.related_threshold
+        if score == 0 and unrelated and categories and not categories & job_categories:
+            local.append({"name": skill, "priority": "low"})
+        else:
+            remaining.append(skill)
+    return local, remaining
+
+def _route_skills(candidate_skills, job_description):
+    """Split skills between the local tier and a model; return (local, remaining, route or None)."""
+    router = get_router()
+    if router.enabled:
+        local, remaining = _triage_skills(candidate_skills, job_description, router.local_high_score)
+    else:
+        local, remaining = [], list(candidate_skills)
+    if not remaining:
+        router.route("prioritize_skills", "local", f"keywords decided all {len(local)} skills")
+        return local, remaining, None
+    reason = f"{len(remaining)} of {len(candidate_skills)} skills need a model"
+    return local, remaining, router.task("prioritize_skills", reason)
+
+SKILLS_PROMPT = PromptTemplate(
+    "Analyze the job description given and prioritize the candidate's skills.",
+    """
+    For each skill, determine its relevance to the job (high, medium, low).
+
+    Return a JSON object with a "skills" array holding every candidate
+    skill exactly once, each with:
+    - name: The skill name exactly as given
+    - priority: "high", "medium", or "low" based on relevance
+
+    Format: {"skills": [{"name": "skill name", "priority": "high|medium|low"}, ...]}
+    """,
+    [("job_description", "Job Description"), ("candidate_skills", "Candidate Skills")]
+)
+
+def _prioritize_skills_prompt(candidate_skills, job_description):
+    """Build the user prompt for prioritize_skills."""
+    job_description = _fit_prompt_inputs("prioritize_skills", job_description=job_description)["job_description"]
+    return SKILLS_PROMPT.render(job_description=job_description, candidate_skills=json.dumps(candidate_skills))
+
+SKILLS_SCHEMA = RecordSchema("skills", [
+    Field("name", aliases=("skill",)),
+    Field("priority", choices=PRIORITY_LEVELS, aliases=("relevance",))
+])
+
+def _skill_key(name, taxonomy):
+    """Return what two skill names must share to be the same skill: a taxonomy id or the normalized name."""
+    skill = taxonomy.skill_id(name)
+    return skill if skill is not None else normalize_key(name)
+
+def _parse_prioritized_skills(candidate_skills, result):
+    """Validate the model's reply; return (prioritized, unresolved, repaired).
+
+    Malformed JSON is repaired locally. Each reply entry accounts for at
+    most one candidate skill, with the same normalized name or a synonym
+    from the taxonomy ("ReactJS" for "React"); unresolved lists the
+    candidates without an entry. Entries for skills that were not asked for
+    are dropped. Raises ValueError if nothing can be read from the reply.
+    """
+    reply = read_records(SKILLS_SCHEMA, result)
+    taxonomy = get_default_matcher().taxonomy
+    entries = {}
+    for position, record in enumerate(reply.records):
+        entries.setdefault(_skill_key(record["name"], taxonomy), []).append((position, record))
+    
+    matched = []
+    unresolved = []
+    for skill in candidate_skills:
+        candidates = entries.get(_skill_key(skill, taxonomy))
+        if candidates:
+            matched.append(candidates.pop(0))
+        else:
+            unresolved.append(skill)
+    # Keep the reply's order, which the model may have used to rank the skills
+    matched.sort(key=lambda entry: entry[0])
+    return [record for _, record in matched], unresolved, reply.repaired
+
+def _skills_reply_complete(candidate_skills, result):
+    try:
+        return not _parse_prioritized_skills(candidate_skills, result)[1]
+    except ValueError:
+        return False
+
+def _read_prioritized_skills(candidate_skills, result):
+    """_parse_prioritized_skills, treating an unreadable reply as resolving nothing."""
+    try:
+        return _parse_prioritized_skills(candidate_skills, result)
+    except ValueError as e:
+        logger.warning("Unreadable prioritize_skills reply: %s", str(e))
+        return [], list(candidate_skills), False
+
+def _finish_prioritized_skills(candidate_skills, prioritized, unresolved, outcome):
+    """Give skills still unresolved after the re-ask the fallback priority and record the outcome."""
+    if unresolved:
+        outcome = "failed" if len(unresolved) == len(candidate_skills) else "partial"
+        if outcome == "failed":
+            mark_fallback()
+        prioritized = prioritized + _fallback_skills(unresolved)
+    record_structured(outcome)
+    return prioritized
+
+def _candidate_skills(skills):
+    """Return a skill list, taking a ParsedCV's skills section if given one."""
+    return skills.skills if isinstance(skills, ParsedCV) else skills
+
+def _fallback_skills(candidate_skills):
+    """Return original skills with medium priority."""
+    return [{"name": skill, "priority": "medium"} for skill in candidate_skills]
+
+@instrumented("prioritize_skills")
+def prioritize_skills(candidate_skills, job_description):
+    """Prioritize and enhance skills based on job description."""
+    candidate_skills = _candidate_skills(candidate_skills)
+    try:
+        logger.info("Prioritizing %d skills based on job description...", len(candidate_skills))
         
-        Format: [{{"name": "skill name", "priority": "high|medium|low"}}, ...]
-        """
+        if _use_demo_mode():
+            mark_demo()
+            logger.debug("DEMO MODE: Generating simulated response...")
+            return run_cpu(_demo_prioritize_skills, candidate_skills, job_description, size=_text_size(job_description))
+            
+        # Skills the keyword engine can decide never reach the API
+        local, skills, route = _route_skills(candidate_skills, job_description)
+        if route is None:
+            return local
         
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": HR_BOT_SYSTEM_INSTRUCTIONS},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.3,
-            response_format={"type": "json_object"}
+        prompt = _prioritize_skills_prompt(skills, job_description)
+        result = _chat_completion(
+            "prioritize_skills", prompt, route.model, cacheable=lambda reply: _skills_reply_complete(skills, reply),
+            **SKILLS_PARAMS
         )
-        
-        result = response.choices[0].message.content.strip()
-        prioritized_skills = json.loads(result)
-        return prioritized_skills.get("skills", [])
+        prioritized, unresolved, repaired = _read_prioritized_skills(skills, result)
+        outcome = "repaired" if repaired else "valid"
+        if unresolved:
+            # Keep what the paid reply got right and ask again for the rest only
+            logger.info("Re-asking for %d of %d skills", len(unresolved), len(skills))
+            outcome = "reasked"
+            try:
+                prompt = _prioritize_skills_prompt(unresolved, job_description)
+                result = _chat_completion(
+                    "prioritize_skills", prompt, route.model,
+                    cacheable=lambda reply: _skills_reply_complete(unresolved, reply), **SKILLS_PARAMS
+                )
+                more, unresolved, _ = _read_prioritized_skills(unresolved, result)
+                prioritized = prioritized + more
+            except Exception as e:
+                logger.warning("Error re-asking for skill priorities: %s", str(e))
+        return local + _finish_prioritized_skills(skills, prioritized, unresolved, outcome)
         
     except Exception as e:
-        print(f"Error prioritizing skills: {str(e)}")
+        logger.warning("Error prioritizing skills: %s", str(e))
+        mark_fallback()
         # Return original skills with medium priority as fallback
-        return [{"name": skill, "priority": "medium"} for skill in candidate_skills]
+        return _fallback_skills(candidate_skills)
+
+@instrumented("prioritize_skills")
+async def prioritize_skills_async(candidate_skills, job_description, timeout=None):
+    """Async version of prioritize_skills."""
+    candidate_skills = _candidate_skills(candidate_skills)
+    try:
+        if _use_demo_mode():
+            mark_demo()
+            return await run_cpu_async(_demo_prioritize_skills, candidate_skills, job_description, size=_text_size(job_description))
+        
+        local, skills, route = _route_skills(candidate_skills, job_description)
+        if route is None:
+            return local
+        
+        prompt = _prioritize_skills_prompt(skills, job_description)
+        result = await _chat_completion_async(
+            "prioritize_skills", prompt, route.model, timeout=timeout,
+            cacheable=lambda reply: _skills_reply_complete(skills, reply), **SKILLS_PARAMS
+        )
+        prioritized, unresolved, repaired = _read_prioritized_skills(skills, result)
+        outcome = "repaired" if repaired else "valid"
+        if unresolved:
+            outcome = "reasked"
+            try:
+                prompt = _prioritize_skills_prompt(unresolved, job_description)
+                result = await _chat_completion_async(
+                    "prioritize_skills", prompt, route.model, timeout=timeout,
+                    cacheable=lambda reply: _skills_reply_complete(unresolved, reply), **SKILLS_PARAMS
+                )
+                more, unresolved, _ = _read_prioritized_skills(unresolved, result)
+                prioritized = prioritized + more
+            except Exception as e:
+                logger.warning("Error re-asking for skill priorities: %s", str(e) or type(e).__name__)
+        return local + _finish_prioritized_skills(skills, prioritized, unresolved, outcome)
+        
+    except Exception as e:
+        logger.warning("Error prioritizing skills: %s", str(e) or type(e).__name__)
+        mark_fallback()
+        return _fallback_skills(candidate_skills)
+
+# Pro tips
+
+def _analyze_cv(cv_content):
+    """Scan a CV once for everything the demo-mode tips look at.
 
+    For a ParsedCV the result is cached on the object, so every function
+    and job in a request shares one scan.
+    """
+    if isinstance(cv_content, ParsedCV):
+        analysis = cv_content.derived.get("analysis")
+        if analysis is None:
+            analysis = cv_content.derived["analysis"] = analyze_text(cv_content.text)
+        return analysis
+    
+    return analyze_text(cv_content)
+
+def _demo_resume_pro_tips(cv_content, job_description, cv_analysis=None, job_skills=None):
+    """Build personalized tips from skill gaps between the CV and job description.
+
+    cv_analysis (from _analyze_cv) and job_skills can be passed in to reuse
+    scans done for other jobs or functions.
+    """
+    # Analyze CV and job description for personalized tips
+    if cv_analysis is None:
+        cv_analysis = _analyze_cv(cv_content)
+    
+    # Extract key skills mentioned in job description
+    if job_skills is None:
+        job_skills = get_default_matcher().unique_skills(job_description, PRO_TIPS_CATEGORIES)
+    
+    # Check missing key skills
+    present = _present_in_cv(job_skills, cv_analysis["terms"], cv_content)
+    cv_has_skills = [skill for skill, found in zip(job_skills, present) if found]
+    
+    missing_skills = [skill for skill in job_skills if skill not in cv_has_skills]
+    
+    # Create personalized tips
+    tips = []
+    
+    # Tip 1: Add a professional summary if missing
+    if not cv_analysis["has_summary"]:
+        tips.append(f"Add a professional summary at the top of your resume highlighting your expertise in {', '.join(job_skills[:3]) if job_skills else 'frontend development'}")
+    
+    # Tip 2: Address missing key skills
+    if missing_skills:
+        tips.append(f"Add experience with {', '.join(missing_skills[:3])} to your skills section as these are specifically mentioned in the job description")
+    
+    # Tip 3: Quantify achievements
+    if not cv_analysis["has_metrics"]:
+        tips.append("Quantify your achievements with metrics (e.g., 'Improved application performance by 30%' instead of 'Improved application performance')")
+    
+    # Tip 4: Use action verbs
+    if not cv_analysis["has_action_verbs"]:
+        tips.append("Start your experience bullet points with strong action verbs like 'Developed', 'Implemented', or 'Designed'")
+    
+    # Tip 5: ATS optimization
+    tips.append(f"Ensure your resume includes these key keywords from the job description: {', '.join(job_skills[:5]) if job_skills else 'web development, frontend, JavaScript'}")
+    
+    # Add general tips if we have fewer than 5 specific ones
+    general_tips = [
+        "Keep your resume to 1-2 pages maximum for optimal readability",
+        "Tailor your resume for each job application to highlight relevant experience",
+        "Use a clean, professional design with consistent formatting",
+        "Include a GitHub link or portfolio showcasing your projects",
+        "Remove outdated skills or irrelevant experience"
+    ]
+    
+    while len(tips) < 5:
+        tips.append(general_tips[len(tips) - 1])
+    
+    return tips[:5]
+
+# Few-shot examples are part of the static prompt prefix; keep them stable
+EXAMPLE_CV = """
+    Jane Doe
+    Frontend Developer
+
+    Skills: JavaScript, HTML, CSS, jQuery, Git
+
+    Experience
+    Web Developer, Acme Retail (2019-2023)
+    - Worked on the company website
+    - Responsible for fixing bugs in the checkout page
+    - Helped migrate some pages to a new design
+
+    Education
+    BSc Computer Science, State University (2019)
+"""
+
+EXAMPLE_JOB_DESCRIPTION = """
+    Frontend Engineer (React). You will build accessible, responsive interfaces
+    in React and TypeScript, manage state with Redux, write unit tests with Jest
+    and ship through a CI/CD pipeline in an Agile team.
+"""
+
+PRO_TIPS_PROMPT = PromptTemplate(
+    "Review the CV content and job description given to provide professional tips for resume improvement.",
+    """
+    Generate 5 specific, actionable tips to improve the resume for this job. Focus on:
+    1. Keyword optimization for ATS systems
+    2. Content structure and formatting
+    3. Skills highlighting and prioritization
+    4. Experience presentation
+    5. Overall impact and readability
+
+    Return ONLY a numbered list of 5 tips without additional commentary.
+    """,
+    [("cv_content", "CV Content"), ("job_description", "Job Description")],
+    examples=[
+        ("Example CV Content", EXAMPLE_CV),
+        ("Example Job Description", EXAMPLE_JOB_DESCRIPTION),
+        ("Example Tips", """
+            1. Add React, TypeScript, Redux and Jest to your skills section if you have used them, since the ATS will screen for them.
+            2. Open with a two-sentence Professional Summary that names frontend development and responsive, accessible UI.
+            3. List your strongest job-relevant skills first and move jQuery to the end of the list.
+            4. Rewrite "Worked on the company website" as an achievement, e.g. "Rebuilt the checkout page, cutting load time by 30%".
+            5. Start every bullet with an action verb such as Built, Led or Migrated, and keep each to one line.
+        """),
+    ]
+)
+
+def _resume_pro_tips_prompt(cv_content, job_description):
+    """Build the user prompt for get_resume_pro_tips."""
+    fitted = _fit_prompt_inputs("get_resume_pro_tips", cv_content=cv_text(cv_content), job_description=job_description)
+    return PRO_TIPS_PROMPT.render(**fitted)
+
+def _parse_pro_tips(result):
+    """Clean up and format the model's numbered tips consistently."""
+    formatted_tips = []
+    for tip in result.strip().split('\n'):
+        # Remove numbers, asterisks, dashes, etc. at the beginning of the tip
+        cleaned_tip = re.sub(r'^[\d\.\)\-\*\s]+', '', tip).strip()
+        if cleaned_tip:
+            formatted_tips.append(cleaned_tip)
+            
+    return formatted_tips[:5]  # Return maximum 5 tips
+
+@instrumented("get_resume_pro_tips")
 def get_resume_pro_tips(cv_content, job_description):
     """Generate professional tips for improving a resume based on job description."""
     try:
-        print("Generating pro tips for resume improvement...")
+        logger.info("Generating pro tips for resume improvement...")
         
-        if USE_DEMO_MODE:
-            print("DEMO MODE: Generating simulated pro tips...")
-            
-            # Analyze CV and job description for personalized tips
-            
-            # Extract key skills mentioned in job description
-            job_skills = []
-            skill_patterns = [
-                r'\b(React|Angular|Vue|TypeScript|JavaScript|Node\.js)\b',
-                r'\b(HTML5|CSS3|SCSS|LESS|Tailwind|Bootstrap)\b',
-                r'\b(Redux|GraphQL|REST API|Axios|Fetch)\b',
-                r'\b(testing|Jest|Cypress|Selenium|unit testing)\b',
-                r'\b(responsive|mobile-first|cross-browser)\b',
-                r'\b(Git|CI/CD|Agile|Scrum|DevOps)\b'
-            ]
-            
-            for pattern in skill_patterns:
-                matches = re.finditer(pattern, job_description, re.IGNORECASE)
-                for match in matches:
-                    skill = match.group(1)
-                    if skill and skill.lower() not in [s.lower() for s in job_skills]:
-                        job_skills.append(skill)
-            
-            # Check missing key skills
-            cv_has_skills = []
-            for skill in job_skills:
-                if re.search(r'\b' + re.escape(skill) + r'\b', cv_content, re.IGNORECASE):
-                    cv_has_skills.append(skill)
-            
-            missing_skills = [skill for skill in job_skills if skill not in cv_has_skills]
-            
-            # Create personalized tips
-            tips = []
-            
-            # Tip 1: Add a professional summary if missing
-            if not re.search(r'(summary|profile|objective)', cv_content, re.IGNORECASE):
-                tips.append(f"Add a professional summary at the top of your resume highlighting your expertise in {', '.join(job_skills[:3]) if job_skills else 'frontend development'}")
-            
-            # Tip 2: Address missing key skills
-            if missing_skills:
-                tips.append(f"Add experience with {', '.join(missing_skills[:3])} to your skills section as these are specifically mentioned in the job description")
-            
-            # Tip 3: Quantify achievements
-            if not re.search(r'\b(\d+%|\d+ percent|increased|decreased|improved|reduced|saved|generated)\b', cv_content, re.IGNORECASE):
-                tips.append("Quantify your achievements with metrics (e.g., 'Improved application performance by 30%' instead of 'Improved application performance')")
-            
-            # Tip 4: Use action verbs
-            if not re.search(r'\b(developed|implemented|created|designed|managed|led|coordinated|analyzed)\b', cv_content, re.IGNORECASE):
-                tips.append("Start your experience bullet points with strong action verbs like 'Developed', 'Implemented', or 'Designed'")
-            
-            # Tip 5: ATS optimization
-            tips.append(f"Ensure your resume includes these key keywords from the job description: {', '.join(job_skills[:5]) if job_skills else 'web development, frontend, JavaScript'}")
-            
-            # Add general tips if we have fewer than 5 specific ones
-            general_tips = [
-                "Keep your resume to 1-2 pages maximum for optimal readability",
-                "Tailor your resume for each job application to highlight relevant experience",
-                "Use a clean, professional design with consistent formatting",
-                "Include a GitHub link or portfolio showcasing your projects",
-                "Remove outdated skills or irrelevant experience"
-            ]
-            
-            while len(tips) < 5:
-                tips.append(general_tips[len(tips) - 1])
-            
-            return tips[:5]
+        if _use_demo_mode():
+            mark_demo()
+            logger.debug("DEMO MODE: Generating simulated pro tips...")
+            return run_cpu(_demo_resume_pro_tips, cv_content, job_description, size=_text_size(cv_content, job_description))
         
         # If not in demo mode, use actual OpenAI API
-        prompt = f"""
-        Review this CV content and job description to provide professional tips for resume improvement:
-
-        CV Content:
-        {cv_content}
-        
-        Job Description:
-        {job_description}
-        
-        Generate 5 specific, actionable tips to improve the resume for this job. Focus on:
-        1. Keyword optimization for ATS systems
-        2. Content structure and formatting
-        3. Skills highlighting and prioritization
-        4. Experience presentation
-        5. Overall impact and readability
-        
-        Return ONLY a numbered list of 5 tips without additional commentary.
-        """
-        
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": HR_BOT_SYSTEM_INSTRUCTIONS},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=400,
-            temperature=0.6
-        )
-        
-        result = response.choices[0].message.content.strip().split('\n')
-        # Clean up and format the tips consistently
-        formatted_tips = []
-        for tip in result:
-            # Remove numbers, asterisks, dashes, etc. at the beginning of the tip
-            cleaned_tip = re.sub(r'^[\d\.\)\-\*\s]+', '', tip).strip()
-            if cleaned_tip:
-                formatted_tips.append(cleaned_tip)
-                
-        return formatted_tips[:5]  # Return maximum 5 tips
+        prompt = _resume_pro_tips_prompt(cv_content, job_description)
+        route = get_router().task("get_resume_pro_tips")
+        result = _chat_completion("get_resume_pro_tips", prompt, route.model, **PRO_TIPS_PARAMS)
+        return _parse_pro_tips(result)
         
     except Exception as e:
-        print(f"Error generating resume pro tips: {str(e)}")
+        logger.warning("Error generating resume pro tips: %s", str(e))
+        mark_fallback()
         # Return generic tips as fallback
-        return [
-            "Tailor your resume to match the specific job description",
-            "Quantify your achievements with specific metrics",
-            "Use industry-relevant keywords throughout your resume",
-            "Focus on your most relevant skills and experience",
-            "Ensure your resume is free of errors and professionally formatted"
-        ]
+        return list(FALLBACK_PRO_TIPS)
 
+@instrumented("get_resume_pro_tips")
+async def get_resume_pro_tips_async(cv_content, job_description, timeout=None):
+    """Async version of get_resume_pro_tips."""
+    try:
+        if _use_demo_mode():
+            mark_demo()
+            return await run_cpu_async(_demo_resume_pro_tips, cv_content, job_description, size=_text_size(cv_content, job_description))
+        
+        prompt = _resume_pro_tips_prompt(cv_content, job_description)
+        route = get_router().task("get_resume_pro_tips")
+        result = await _chat_completion_async("get_resume_pro_tips", prompt, route.model, timeout=timeout, **PRO_TIPS_PARAMS)
+        return _parse_pro_tips(result)
+        
+    except Exception as e:
+        logger.warning("Error generating resume pro tips: %s", str(e) or type(e).__name__)
+        mark_fallback()
+        return list(FALLBACK_PRO_TIPS)
+
+# CV optimization
+
+EXPERIENCE_ACHIEVEMENTS = [
+    "• Developed responsive user interfaces using {techs}, resulting in improved user engagement and 20% faster page load times",
+    "• Collaborated with backend developers to integrate RESTful APIs, ensuring seamless data flow and optimal application performance",
+    "• Implemented automated testing practices to enhance code quality and reduce bugs in production"
+]
+
+def _demo_professional_summary(cv, job_description, job_techs):
+    """Return a summary paragraph to prepend, or "" if the CV already has one."""
+    if cv.has_section("summary"):
+        return ""
+    
+    # Check if it's a senior role
+    is_senior = "senior" in job_description.lower() or "sr." in job_description.lower()
+    
+    if is_senior:
+        return f"Professional Summary: Senior Software Developer with extensive experience in {', '.join(job_techs[:3]) if job_techs else 'web development'}. Proven track record of building scalable, efficient applications and leading development teams to deliver high-quality products.\n\n"
+    else:
+        return f"Professional Summary: Dedicated Software Developer specializing in {', '.join(job_techs[:3]) if job_techs else 'web development'} with a passion for creating responsive, user-friendly applications. Committed to writing clean, maintainable code and staying current with industry best practices.\n\n"
+
+def _line_indent(text, offset):
+    """Return the leading whitespace of the line containing offset."""
+    line_start = text.rfind("\n", 0, offset) + 1
+    line = text[line_start:offset]
+    return line[:len(line) - len(line.lstrip())]
+
+def _demo_cv_edits(cv, job_techs):
+    """Return (start, end, replacement) splices tailoring a ParsedCV to the job's technologies."""
+    edits = []
+    if not job_techs:
+        return edits
+    
+    # Job-specific achievements after the last line of the experience section
+    experience = cv.section("experience")
+    if experience is not None:
+        if experience.bullets:
+            anchor = experience.bullets[-1][1]
+        else:
+            anchor = experience.body_start + len(cv.text[experience.body_start:experience.end].rstrip())
+        indent = _line_indent(cv.text, anchor)
+        tech_mentions = ', '.join(job_techs[:3])
+        achievements = "".join("\n" + indent + line.format(techs=tech_mentions) for line in EXPERIENCE_ACHIEVEMENTS)
+        edits.append((anchor, anchor, achievements))
+    
+    # Job technologies missing from the skills list, after its last entry
+    if cv.skill_spans:
+        listed = cv.text[cv.skill_spans[0][0]:cv.skill_spans[-1][1]].lower()
+        missing_techs = [tech for tech in job_techs if tech.lower() not in listed]
+        semantic = _semantic_matcher()
+        if semantic is not None and missing_techs:
+            covered = semantic.covered(missing_techs, cv.skills)
+            missing_techs = [tech for tech, found in zip(missing_techs, covered) if not found]
+        if missing_techs:
+            skills_end = cv.skill_spans[-1][1]
+            edits.append((skills_end, skills_end, ", " + ", ".join(missing_techs)))
+    
+    return edits
+
+def _demo_optimize_cv_chunks(cv_content, job_description):
+    """Yield the locally rewritten CV in chunks.
+
+    The CV is parsed once (or reused if already parsed) and the rewrite is a
+    handful of splices at section offsets, so unchanged text is yielded as
+    slices of the original.
+    """
+    cv = as_parsed(cv_content)
+    
+    # Extract key technologies from job description
+    job_techs = get_default_matcher().unique_skills(job_description, CV_OPTIMIZE_CATEGORIES)
+    
+    # Add professional summary at the beginning if none exists
+    summary = _demo_professional_summary(cv, job_description, job_techs)
+    if summary:
+        yield summary
+    
+    yield from cv.splice_chunks(_demo_cv_edits(cv, job_techs))
+
+def _demo_optimize_cv_content(cv_content, job_description):
+    """Rewrite the CV locally using technologies found in the job description."""
+    return "".join(_demo_optimize_cv_chunks(cv_content, job_description))
+
+OPTIMIZE_CV_PROMPT = PromptTemplate(
+    "Optimize the CV content given for the job description given.",
+    """
+    Please:
+    1. Reorder sections if needed (Professional Summary first, followed by Skills, Experience, Education)
+    2. Add a tailored Professional Summary if none exists
+    3. Highlight relevant skills and experience
+    4. Add any important skills mentioned in the job description that are missing
+    5. Ensure bullet points begin with strong action verbs
+    6. Quantify achievements where possible
+
+    Return the complete optimized CV content.
+    """,
+    [("cv_content", "CV Content"), ("job_description", "Job Description")],
+    examples=[
+        ("Example CV Content", EXAMPLE_CV),
+        ("Example Job Description", EXAMPLE_JOB_DESCRIPTION),
+        ("Example Optimized CV Content", """
+            Jane Doe
+            Frontend Developer
+
+            Professional Summary: Frontend developer with 4 years of experience building responsive,
+            accessible web interfaces in JavaScript, HTML and CSS. Ships reliable checkout and
+            redesign work in small, collaborative teams.
+
+            Skills: JavaScript, HTML, CSS, Git, jQuery
+
+            Experience
+            Web Developer, Acme Retail (2019-2023)
+            - Maintained the company website, serving 50,000 monthly visitors
+            - Fixed checkout page defects, reducing abandoned orders by 15%
+            - Migrated 20 pages to the new responsive design system
+
+            Education
+            BSc Computer Science, State University (2019)
+        """),
+    ]
+)
+
+def _optimize_cv_content_request(function_name, cv_content, job_description):
+    """Build the user prompt for optimize_cv_content and route it; return (prompt, route).
+
+    The route depends on the size of the CV and job description only, not
+    on the fixed instructions and examples around them. The prompt asks for
+    the complete CV back, so a CV that would lose paragraphs to its token
+    budget gets (None, None): rewrite it with _optimize_cv_sections() instead.
+    """
+    cv_content = cv_text(cv_content)
+    if fit_text(cv_content, PROMPT_BUDGETS["optimize_cv_content"]["cv_content"], drop_boilerplate=False)[3]:
+        logger.info("CV is over the %s prompt budget; rewriting it section by section", function_name)
+        return None, None
+    fitted = _fit_prompt_inputs("optimize_cv_content", cv_content=cv_content, job_description=job_description)
+    input_tokens = count_tokens(fitted["cv_content"]) + count_tokens(fitted["job_description"])
+    return OPTIMIZE_CV_PROMPT.render(**fitted), get_router().rewrite(function_name, input_tokens)
+
+@instrumented("optimize_cv_content")
 def optimize_cv_content(cv_content, job_description):
     """Optimize CV content based on job description."""
     try:
-        print("Optimizing CV content for the job...")
+        logger.info("Optimizing CV content for the job...")
         
-        if USE_DEMO_MODE:
-            print("DEMO MODE: Generating simulated optimized CV...")
-            
-            # Extract key technologies from job description
-            tech_patterns = [
-                r'\b(React|Angular|Vue|TypeScript|JavaScript|Node\.js)\b',
-                r'\b(Redux|GraphQL|REST API|Axios|Fetch)\b',
-                r'\b(HTML5|CSS3|SCSS|LESS|Tailwind|Bootstrap)\b',
-                r'\b(responsive|mobile-first|cross-browser)\b',
-                r'\b(unit testing|Jest|Cypress|Selenium|TDD)\b',
-                r'\b(Git|CI/CD|Agile|Scrum|DevOps)\b'
-            ]
-            
-            job_techs = []
-            for pattern in tech_patterns:
-                matches = re.finditer(pattern, job_description, re.IGNORECASE)
-                for match in matches:
-                    tech = match.group(1)
-                    if tech and tech.lower() not in [t.lower() for t in job_techs]:
-                        job_techs.append(tech)
-            
-            # Check if we need to enhance the experience section
-            lines = cv_content.split('\n')
-            enhanced_cv = []
-            in_experience = False
-            experience_enhanced = False
-            experience_section = []
-            
-            # Split CV into sections and enhance experience section
-            for line in lines:
-                if re.match(r'^experience|^work experience|^professional experience', line, re.IGNORECASE):
-                    in_experience = True
-                    enhanced_cv.append(line)
-                elif in_experience and re.match(r'^education|^skills|^projects|^awards', line, re.IGNORECASE):
-                    in_experience = False
-                    
-                    # Add job-specific achievements if not already enhanced
-                    if not experience_enhanced and job_techs:
-                        enhanced_cv.append("")  # Empty line
-                        tech_mentions = ', '.join(job_techs[:3])
-                        enhanced_cv.append(f"• Developed responsive user interfaces using {tech_mentions}, resulting in improved user engagement and 20% faster page load times")
-                        enhanced_cv.append(f"• Collaborated with backend developers to integrate RESTful APIs, ensuring seamless data flow and optimal application performance")
-                        enhanced_cv.append(f"• Implemented automated testing practices to enhance code quality and reduce bugs in production")
-                        experience_enhanced = True
-                    
-                    enhanced_cv.append(line)
-                else:
-                    enhanced_cv.append(line)
-            
-            # Check for skills section and enhance if needed
-            enhanced_content = '\n'.join(enhanced_cv)
-            
-            # Add missing skills if skills section exists
-            skills_match = re.search(r'(?:skills|technical skills|core competencies)(?:.*?):(.*?)(?:^[a-z]+:|\Z)', enhanced_content, re.IGNORECASE | re.DOTALL | re.MULTILINE)
-            if skills_match:
-                skills_section = skills_match.group(1).strip()
-                missing_techs = []
-                
-                for tech in job_techs:
-                    if tech.lower() not in skills_section.lower():
-                        missing_techs.append(tech)
-                
-                if missing_techs:
-                    enhanced_content = enhanced_content.replace(
-                        skills_section, 
-                        skills_section + ", " + ", ".join(missing_techs)
-                    )
-            
-            # Add professional summary at the beginning if none exists
-            if not re.search(r'(summary|profile|objective):', enhanced_content, re.IGNORECASE):
-                # Check if it's a senior role
-                is_senior = "senior" in job_description.lower() or "sr." in job_description.lower()
-                
-                if is_senior:
-                    summary = f"Professional Summary: Senior Software Developer with extensive experience in {', '.join(job_techs[:3]) if job_techs else 'web development'}. Proven track record of building scalable, efficient applications and leading development teams to deliver high-quality products.\n\n"
-                else:
-                    summary = f"Professional Summary: Dedicated Software Developer specializing in {', '.join(job_techs[:3]) if job_techs else 'web development'} with a passion for creating responsive, user-friendly applications. Committed to writing clean, maintainable code and staying current with industry best practices.\n\n"
-                
-                enhanced_content = summary + enhanced_content
-            
-            return enhanced_content
+        if _use_demo_mode():
+            mark_demo()
+            logger.debug("DEMO MODE: Generating simulated optimized CV...")
+            return run_cpu(_demo_optimize_cv_content, cv_content, job_description, size=_text_size(cv_content, job_description))
         
         # If not in demo mode, use actual OpenAI API
-        prompt = f"""
-        Optimize this CV content for the following job description:
-
-        CV Content:
-        {cv_content}
-        
-        Job Description:
-        {job_description}
-        
-        Please:
-        1. Reorder sections if needed (Professional Summary first, followed by Skills, Experience, Education)
-        2. Add a tailored Professional Summary if none exists
-        3. Highlight relevant skills and experience
-        4. Add any important skills mentioned in the job description that are missing
-        5. Ensure bullet points begin with strong action verbs
-        6. Quantify achievements where possible
-        
-        Return the complete optimized CV content.
-        """
-        
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": HR_BOT_SYSTEM_INSTRUCTIONS},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=1500,
-            temperature=0.4
+        prompt, route = _optimize_cv_content_request("optimize_cv_content", cv_content, job_description)
+        if prompt is None:
+            return "".join(future.result() for future in _optimize_cv_sections(cv_content, job_description)).strip()
+        optimized_cv = _chat_completion("optimize_cv_content", prompt, route.model, **OPTIMIZE_CV_PARAMS).strip()
+        return optimized_cv
+        
+    except Exception as e:
+        logger.warning("Error optimizing CV content: %s", str(e))
+        mark_fallback()
+        return cv_text(cv_content)
+
+@instrumented("optimize_cv_content_stream")
+def optimize_cv_content_stream(cv_content, job_description):
+    """Yield the optimized CV in chunks as they are generated.
+
+    Joined together, the chunks match what optimize_cv_content returns (up
+    to trailing whitespace), so callers can forward them as server-sent
+    events. If the call fails before any output, the original CV is yielded.
+    """
+    started = False
+    try:
+        logger.info("Streaming optimized CV content for the job...")
+        
+        if _use_demo_mode():
+            mark_demo()
+            size = _text_size(cv_content, job_description)
+            if should_offload(size):
+                chunks = [run_cpu(_demo_optimize_cv_content, cv_content, job_description, size=size)]
+            else:
+                chunks = _demo_optimize_cv_chunks(cv_content, job_description)
+        else:
+            prompt, route = _optimize_cv_content_request("optimize_cv_content_stream", cv_content, job_description)
+            if prompt is None:
+                # Each section is yielded as soon as it and the ones before it are done
+                chunks = (future.result() for future in _optimize_cv_sections(cv_content, job_description))
+            else:
+                chunks = _chat_completion_stream("optimize_cv_content", prompt, route.model, **OPTIMIZE_CV_PARAMS)
+        
+        for chunk in chunks:
+            # Drop leading whitespace the way the non-streaming path strips it
+            if not started:
+                chunk = chunk.lstrip()
+                if not chunk:
+                    continue
+                started = True
+            yield chunk
+        
+    except Exception as e:
+        logger.warning("Error streaming optimized CV content: %s", str(e))
+        mark_fallback()
+        if not started:
+            yield cv_text(cv_content)
+
+@instrumented("optimize_cv_content")
+async def optimize_cv_content_async(cv_content, job_description, timeout=None):
+    """Async version of optimize_cv_content."""
+    try:
+        if _use_demo_mode():
+            mark_demo()
+            return await run_cpu_async(_demo_optimize_cv_content, cv_content, job_description, size=_text_size(cv_content, job_description))
+        
+        prompt, route = _optimize_cv_content_request("optimize_cv_content", cv_content, job_description)
+        if prompt is None:
+            futures = _optimize_cv_sections(cv_content, job_description)
+            parts = await asyncio.wait_for(asyncio.gather(*map(asyncio.wrap_future, futures)), timeout)
+            return "".join(parts).strip()
+        optimized_cv = await _chat_completion_async(
+            "optimize_cv_content", prompt, route.model, timeout=timeout, **OPTIMIZE_CV_PARAMS
         )
+        return optimized_cv.strip()
         
-        optimized_cv = response.choices[0].message.content.strip()
-        return optimized_cv
+    except Exception as e:
+        logger.warning("Error optimizing CV content: %s", str(e) or type(e).__name__)
+        mark_fallback()
+        return cv_text(cv_content)
+
+async def enhance_all(cv_content, candidate_skills, basic_summary, job_description,
+                      max_concurrency=DEFAULT_MAX_CONCURRENCY, timeout=DEFAULT_CALL_TIMEOUT):
+    """Run summary, skills, tips and CV optimization concurrently.
+
+    At most max_concurrency calls are in flight at once and each call is
+    bounded by timeout seconds; a call that fails or times out returns its
+    usual fallback. Returns a dict keyed by summary, skills, pro_tips and
+    optimized_cv.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    cv = await run_cpu_async(as_parsed, cv_content, size=_text_size(cv_content))
+    
+    async def limited(coroutine):
+        async with semaphore:
+            return await coroutine
+    
+    summary, skills, pro_tips, optimized_cv = await asyncio.gather(
+        limited(enhance_resume_summary_async(basic_summary, job_description, timeout=timeout)),
+        limited(prioritize_skills_async(candidate_skills, job_description, timeout=timeout)),
+        limited(get_resume_pro_tips_async(cv, job_description, timeout=timeout)),
+        limited(optimize_cv_content_async(cv, job_description, timeout=timeout))
+    )
+    return {
+        "summary": summary,
+        "skills": skills,
+        "pro_tips": pro_tips,
+        "optimized_cv": optimized_cv
+    }
+
+# Batch tailoring
+
+def _match_score(job_skills, cv_terms, cv=None):
+    """Return (score, matched, missing) for a job's skills against the CV terms (see _present_in_cv)."""
+    present = _present_in_cv(job_skills, cv_terms, cv)
+    matched = [skill for skill, found in zip(job_skills, present) if found]
+    missing = [skill for skill, found in zip(job_skills, present) if not found]
+    score = round(len(matched) / len(job_skills), 2) if job_skills else 0.0
+    return score, matched, missing
+
+def _group_jobs_for_prompts(cv_content, job_descriptions):
+    """Pack job indexes into groups whose prompts fit the batch token budget."""
+    base_tokens = count_tokens(HR_BOT_SYSTEM_INSTRUCTIONS) + count_tokens(cv_content) + 200
+    max_jobs = max(1, BATCH_MAX_OUTPUT_TOKENS // BATCH_OUTPUT_TOKENS_PER_JOB)
+    
+    groups = []
+    current = []
+    current_tokens = base_tokens
+    for index, job_description in enumerate(job_descriptions):
+        job_tokens = count_tokens(job_description) + 10
+        if current and (current_tokens + job_tokens > BATCH_PROMPT_TOKEN_BUDGET or len(current) >= max_jobs):
+            groups.append(current)
+            current = []
+            current_tokens = base_tokens
+        current.append(index)
+        current_tokens += job_tokens
+    if current:
+        groups.append(current)
+    return groups
+
+TAILOR_PROMPT = PromptTemplate(
+    "Tailor the candidate's resume to each of the job descriptions given.",
+    """
+    For every job, write:
+    1. summary: a 2-3 sentence professional summary tailored to that job
+    2. tips: 3 specific, actionable tips to improve the resume for that job
+
+    Return a JSON object: {"jobs": [{"index": <job number>, "summary": "...", "tips": ["...", "...", "..."]}, ...]}
+    """,
+    [("basic_summary", "Basic Summary"), ("cv_content", "CV Content"), ("job_blocks", "Job Descriptions")]
+)
+
+def _tailor_batch_prompt(cv_content, basic_summary, jobs):
+    """Build one prompt covering several (index, job_description) pairs."""
+    job_blocks = "\n\n".join(f"[Job {index}]\n{job_description.strip()}" for index, job_description in jobs)
+    return TAILOR_PROMPT.render(basic_summary=basic_summary, cv_content=cv_content, job_blocks=job_blocks)
+
+TAILOR_SCHEMA = RecordSchema("jobs", [
+    Field("index", kind=int, aliases=("job",)),
+    Field("summary"),
+    Field("tips", kind=list, aliases=("pro_tips",))
+])
+
+def _parse_tailored(jobs, result):
+    """Return ({job index: {"summary", "pro_tips"}}, repaired) for the batch's jobs the reply fully answers."""
+    reply = read_records(TAILOR_SCHEMA, result)
+    expected = {index for index, _ in jobs}
+    tailored = {
+        record["index"]: {"summary": record["summary"], "pro_tips": record["tips"]}
+        for record in reply.records if record["index"] in expected
+    }
+    return tailored, reply.repaired
+
+def _tailor_reply_complete(jobs, result):
+    try:
+        return len(_parse_tailored(jobs, result)[0]) == len(jobs)
+    except ValueError:
+        return False
+
+def _tailor_batch(cv_content, basic_summary, jobs, reask=True):
+    """Run one batched completion and return {job index: {"summary", "pro_tips"}}.
+
+    Malformed JSON is repaired locally. Jobs the reply leaves out or answers
+    incompletely are asked for once more, in a prompt of their own.
+    """
+    prompt = _tailor_batch_prompt(cv_content, basic_summary, jobs)
+    route = get_router().task("tailor_cv_for_jobs", f"batch of {len(jobs)} jobs")
+    result = _chat_completion(
+        "tailor_cv_for_jobs",
+        prompt,
+        route.model,
+        cacheable=lambda reply: _tailor_reply_complete(jobs, reply),
+        max_tokens=min(BATCH_MAX_OUTPUT_TOKENS, BATCH_OUTPUT_TOKENS_PER_JOB * len(jobs)),
+        temperature=BATCH_TEMPERATURE,
+        response_format={"type": "json_object"}
+    )
+    
+    try:
+        tailored, repaired = _parse_tailored(jobs, result)
+    except ValueError as e:
+        logger.warning("Unreadable tailor_cv_for_jobs reply: %s", str(e))
+        tailored, repaired = {}, False
+    missing = [(index, job_description) for index, job_description in jobs if index not in tailored]
+    if not reask:
+        return tailored
+    
+    outcome = "repaired" if repaired else "valid"
+    if missing:
+        logger.info("Re-asking for %d of %d jobs in batch", len(missing), len(jobs))
+        try:
+            tailored.update(_tailor_batch(cv_content, basic_summary, missing, reask=False))
+        except Exception as e:
+            logger.warning("Error re-asking for tailored jobs: %s", str(e))
+        unresolved = sum(1 for index, _ in missing if index not in tailored)
+        outcome = "reasked" if not unresolved else "failed" if unresolved == len(jobs) else "partial"
+    record_structured(outcome)
+    return tailored
+
+@instrumented("tailor_cv_for_jobs")
+def tailor_cv_for_jobs(cv_content, job_descriptions, basic_summary="", max_workers=DEFAULT_MAX_CONCURRENCY):
+    """Score and tailor one CV against many job descriptions, yielding results as jobs finish.
+
+    The CV is analyzed once and every job's keywords come from a single scan
+    over all job descriptions. In API mode, jobs are packed into as few
+    prompts as the token budget allows and run in parallel. Each yielded
+    dict has index, match_score, matched_skills, missing_skills, summary
+    and pro_tips; results are not necessarily in input order.
+    """
+    job_descriptions = list(job_descriptions)
+    logger.info("Tailoring CV for %d job descriptions...", len(job_descriptions))
+    
+    matcher = get_default_matcher()
+    cv = as_parsed(cv_content)
+    cv_analysis = _analyze_cv(cv)
+    job_hits = matcher.find_all_many(job_descriptions)
+    
+    def scored(index):
+        job_skills = matcher.unique_skills(job_descriptions[index], PRO_TIPS_CATEGORIES, hits=job_hits[index])
+        score, matched, missing = _match_score(job_skills, cv_analysis["terms"], cv)
+        return job_skills, {
+            "index": index,
+            "match_score": score,
+            "matched_skills": matched,
+            "missing_skills": missing
+        }
+    
+    if _use_demo_mode():
+        mark_demo()
+        for index, job_description in enumerate(job_descriptions):
+            job_skills, result = scored(index)
+            job_terms = matcher.terms_from_hits(job_hits[index])
+            result["summary"] = _demo_enhance_resume_summary(basic_summary, job_description, job_terms=job_terms)
+            result["pro_tips"] = _demo_resume_pro_tips(cv, job_description, cv_analysis=cv_analysis, job_skills=job_skills)
+            yield result
+        return
+    
+    # Compact the CV and every posting once, then pack the compacted texts
+    budgets = PROMPT_BUDGETS["tailor_cv_for_jobs"]
+    cv_content = fit_text(cv.text, budgets["cv_content"], drop_boilerplate=False)[0]
+    prompt_jobs = [fit_text(job_description, budgets["job_description"])[0] for job_description in job_descriptions]
+    
+    groups = _group_jobs_for_prompts(cv_content, prompt_jobs)
+    
+    def run_batch(group):
+        return _tailor_batch(cv_content, basic_summary, [(index, prompt_jobs[index]) for index in group])
+    
+    # Batches run on the shared I/O pool, at most max_workers of them at a time
+    for group, future in as_completed_io(run_batch, groups, max_workers):
+        try:
+            tailored = future.result()
+        except Exception as e:
+            logger.warning("Error tailoring CV for job batch: %s", str(e))
+            mark_fallback()
+            tailored = {}
+        
+        for index in group:
+            _, result = scored(index)
+            entry = tailored.get(index) or {}
+            result["summary"] = entry.get("summary") or basic_summary
+            result["pro_tips"] = entry.get("pro_tips") or list(FALLBACK_PRO_TIPS)
+            yield result
+
+# Incremental re-optimization
+
+INCREMENTAL_NAMESPACES = ("optimize_cv_content", "get_resume_pro_tips")
+
+SECTION_PROMPT = PromptTemplate(
+    "Optimize the CV section given for the job description given.",
+    """
+    Please:
+    1. Keep the section heading and layout
+    2. Highlight relevant skills and experience
+    3. Add any important skills mentioned in the job description that are missing, if this is the skills section
+    4. Ensure bullet points begin with strong action verbs
+    5. Quantify achievements where possible
+
+    Return ONLY the optimized section.
+    """,
+    [("kind", "Section Type"), ("cv_section", "CV Section"), ("job_description", "Job Description")]
+)
+
+SUMMARY_SECTION_PROMPT = PromptTemplate(
+    "Write a Professional Summary for the candidate, tailored to the job description given.",
+    'Return ONLY one line starting with "Professional Summary: ", 2-3 sentences long.',
+    [("skills", "Candidate Skills"), ("job_description", "Job Description")]
+)
+
+def _optimize_section_prompt(kind, section_text, job_description):
+    """Build the user prompt for rewriting one CV section."""
+    fitted = _fit_prompt_inputs("optimize_cv_section", cv_section=section_text, job_description=job_description)
+    return SECTION_PROMPT.render(kind=kind, **fitted)
+
+def _summary_section_prompt(cv, job_description):
+    """Build the user prompt for a Professional Summary when the CV has none."""
+    job_description = _fit_prompt_inputs("enhance_resume_summary", job_description=job_description)["job_description"]
+    return SUMMARY_SECTION_PROMPT.render(skills=", ".join(cv.skills) or "not listed", job_description=job_description)
+
+def _section_chunks(body, max_tokens):
+    """Split a section body into runs of whole lines of at most max_tokens each."""
+    chunks, lines, used = [], [], 0
+    for line in body.split("\n"):
+        tokens = count_tokens(line) + 1
+        if lines and used + tokens > max_tokens:
+            chunks.append("\n".join(lines))
+            lines, used = [], 0
+        lines.append(line)
+        used += tokens
+    chunks.append("\n".join(lines))
+    return chunks
+
+def _optimize_section(kind, section_text, job_description):
+    """Rewrite one CV section with the model, keeping its surrounding whitespace.
+
+    A section too long for its rewrite to fit the completion is rewritten
+    in runs of whole lines, so nothing is cut from the reply.
+    """
+    body = section_text.strip()
+    if not body or kind == "header":
+        return section_text
+    
+    chunks = _section_chunks(body, SECTION_CHUNK_TOKENS)
+    if len(chunks) > 1:
+        optimized = "\n".join(_optimize_section(kind, chunk, job_description) for chunk in chunks)
+    else:
+        max_tokens = min(OPTIMIZE_CV_PARAMS["max_tokens"], 2 * count_tokens(body) + 100)
+        prompt = _optimize_section_prompt(kind, body, job_description)
+        route = get_router().task("optimize_cv_section", f"single {kind} section")
+        optimized = _chat_completion(
+            "optimize_cv_section", prompt, route.model, **dict(OPTIMIZE_CV_PARAMS, max_tokens=max_tokens)
+        ).strip()
+    
+    leading = section_text[:len(section_text) - len(section_text.lstrip())]
+    trailing = section_text[len(section_text.rstrip()):]
+    return leading + (optimized or body) + trailing
+
+def _optimize_summary_section(cv, job_description):
+    """Generate a Professional Summary section for a CV that has none ("" if it has one)."""
+    if cv.has_section("summary"):
+        return ""
+    prompt = _summary_section_prompt(cv, job_description)
+    route = get_router().task("optimize_cv_summary")
+    return _chat_completion("optimize_cv_summary", prompt, route.model, **SUMMARY_PARAMS).strip() + "\n\n"
+
+def _optimize_cv_sections(cv_content, job_description):
+    """Rewrite a CV section by section on the I/O pool; return the futures in document order.
+
+    Used for CVs too long for one optimize_cv_content prompt, so no section
+    is dropped from the result. A Professional Summary comes first when the
+    CV has none, and a section whose call fails is kept unchanged.
+    """
+    cv = as_parsed(cv_content)
+    
+    def run(section):
+        try:
+            if section is None:
+                return _optimize_summary_section(cv, job_description)
+            return _optimize_section(section.kind, cv.text[section.start:section.end], job_description)
+        except Exception as e:
+            logger.warning("Error optimizing CV %s section: %s", section.kind if section else "summary", str(e))
+            return "" if section is None else cv.text[section.start:section.end]
+    
+    return [submit_io(run, section) for section in [None] + list(cv.sections)]
+
+@instrumented("optimize_cv_content_incremental")
+def optimize_cv_content_incremental(session_id, cv_content, job_description):
+    """Optimize CV content, recomputing only sections changed since the session's last call.
+
+    The CV is split into its sections (plus a generated Professional
+    Summary when it has none). Each section's result is keyed by its text,
+    the job description (ignoring case and whitespace) and the mode, and
+    results from the session's previous call are reused for unchanged
+    keys. In API mode each changed section is rewritten on its own, with a
+    completion sized to the section, and changed sections run in parallel.
+    Sections are not reordered across the document.
+    """
+    try:
+        logger.info("Optimizing CV content incrementally for session %s...", session_id)
+        cv = as_parsed(cv_content)
+        demo = _use_demo_mode()
+        if demo:
+            mark_demo()
+        mode = "demo" if demo else get_router().signature
+        job_key = normalize_text(job_description)
+        
+        # Every unit of work, keyed by everything that determines its result
+        units = {}
+        summary_key = fingerprint("summary", mode, cv.has_section("summary"), ", ".join(cv.skills), job_key)
+        units[summary_key] = ("summary", None)
+        keys = [summary_key]
+        seen_kinds = set()
+        for section in cv.sections:
+            section_text = cv.text[section.start:section.end]
+            key = fingerprint("section", mode, section.kind, section.kind in seen_kinds, section_text, job_key)
+            seen_kinds.add(section.kind)
+            units[key] = (section.kind, section)
+            keys.append(key)
+        
+        failed = set()
+        
+        def compute(missing):
+            if demo:
+                job_techs = get_default_matcher().unique_skills(job_description, CV_OPTIMIZE_CATEGORIES)
+                edits = _demo_cv_edits(cv, job_techs)
+                return [
+                    _demo_professional_summary(cv, job_description, job_techs) if section is None
+                    else cv.splice(edits, section.start, section.end)
+                    for _, section in (units[key] for key in missing)
+                ]
+            
+            def run(key):
+                kind, section = units[key]
+                try:
+                    if section is None:
+                        return _optimize_summary_section(cv, job_description)
+                    return _optimize_section(kind, cv.text[section.start:section.end], job_description)
+                except Exception as e:
+                    # Serve the section unchanged and retry it on the next call
+                    logger.warning("Error optimizing CV %s section: %s", kind, str(e))
+                    failed.add(key)
+                    return "" if section is None else cv.text[section.start:section.end]
+            
+            if len(missing) == 1:
+                return [run(missing[0])]
+            return [future.result() for future in [submit_io(run, key) for key in missing]]
+        
+        store = get_incremental_store()
+        state = store.load(session_id, "optimize_cv_content")
+        results, diff = state.resolve(keys, compute)
+        for key in failed:
+            state.sections.pop(key, None)
+        store.save(session_id, "optimize_cv_content", state)
+        
+        record_sections(diff.reused, diff.recomputed)
+        logger.info("Incremental optimize for session %s: %d sections reused, %d recomputed",
+                    session_id, diff.reused, diff.recomputed)
+        return "".join(results)
         
     except Exception as e:
-        print(f"Error optimizing CV content: {str(e)}")
-        return cv_content
+        logger.warning("Error optimizing CV content incrementally: %s", str(e))
+        mark_fallback()
+        return cv_text(cv_content)
+
+@instrumented("get_resume_pro_tips_incremental")
+def get_resume_pro_tips_incremental(session_id, cv_content, job_description):
+    """Generate pro tips, rescanning only sections changed since the session's last call.
+
+    The per-section analysis (skill terms, summary, metrics and action
+    verbs) is cached by section text and merged. Demo tips are rebuilt from
+    the merged analysis; in API mode the model is called again whenever a
+    section's text or the job description changed, and an unchanged CV
+    reuses the previous tips.
+    """
+    try:
+        logger.info("Generating pro tips incrementally for session %s...", session_id)
+        cv = as_parsed(cv_content)
+        demo = _use_demo_mode()
+        if demo:
+            mark_demo()
+        
+        texts = {}
+        keys = []
+        for section in cv.sections:
+            section_text = cv.text[section.start:section.end]
+            key = fingerprint("analysis", section_text)
+            texts[key] = section_text
+            keys.append(key)
+        
+        def compute(missing):
+            analyses = []
+            for key in missing:
+                analysis = _analyze_cv(texts[key])
+                analyses.append(dict(analysis, terms=sorted(analysis["terms"])))
+            return analyses
+        
+        store = get_incremental_store()
+        state = store.load(session_id, "get_resume_pro_tips")
+        analyses, diff = state.resolve(keys, compute)
+        record_sections(diff.reused, diff.recomputed)
+        
+        merged = merge_analyses(analyses)
+        cv.derived["analysis"] = merged
+        
+        if demo:
+            tips = _demo_resume_pro_tips(cv, job_description)
+        else:
+            # The section fingerprints cover every edit, including rewording
+            tips_key = fingerprint(get_router().signature, normalize_text(job_description), *keys)
+            previous = state.extras.get("tips")
+            if previous and previous[0] == tips_key:
+                tips = previous[1]
+            else:
+                prompt = _resume_pro_tips_prompt(cv, job_description)
+                route = get_router().task("get_resume_pro_tips")
+                tips = _parse_pro_tips(_chat_completion("get_resume_pro_tips", prompt, route.model, **PRO_TIPS_PARAMS))
+                state.extras["tips"] = [tips_key, tips]
+        
+        store.save(session_id, "get_resume_pro_tips", state)
+        return tips
+        
+    except Exception as e:
+        logger.warning("Error generating resume pro tips incrementally: %s", str(e))
+        mark_fallback()
+        return list(FALLBACK_PRO_TIPS)
+
+def reset_incremental_session(session_id):
+    """Forget a session's incremental state, e.g. when the user uploads a new CV."""
+    get_incremental_store().clear(session_id, INCREMENTAL_NAMESPACES)
+
+# Sessions
+
+SESSION_FUNCTIONS = {
+    "enhance_resume_summary": enhance_resume_summary,
+    "prioritize_skills": prioritize_skills,
+    "get_resume_pro_tips": get_resume_pro_tips,
+    "optimize_cv_content": optimize_cv_content,
+}
+
+def start_session(session_id, cv_content, job_description):
+    """Parse and analyze a CV and extract the job's keywords once, storing both with the session.
+
+    Returns the job match: the job's skills, match_score, matched_skills
+    and missing_skills. Later steps call session_result() with only the
+    session id. Starting the session again with a different CV or job
+    makes results stored for the previous ones stale.
+    """
+    cv = run_cpu(as_parsed, cv_content, size=_text_size(cv_content))
+    cv_analysis = _analyze_cv(cv)
+    job_skills = get_default_matcher().unique_skills(job_description, PRO_TIPS_CATEGORIES)
+    score, matched, missing = _match_score(job_skills, cv_analysis["terms"], cv)
+    job = {
+        "description": job_description,
+        "skills": job_skills,
+        "match_score": score,
+        "matched_skills": matched,
+        "missing_skills": missing
+    }
+    version = fingerprint("demo" if USE_DEMO_MODE else get_router().signature, cv.text, normalize_text(job_description))
+    get_session_store().set_many(session_id, {"cv": cv.as_dict(), "job": job, "version": version})
+    return job
+
+def get_session(session_id):
+    """Return the session's (ParsedCV, job) as stored by start_session()."""
+    values = get_session_store().get_many(session_id, ["cv", "job"])
+    if "cv" not in values:
+        raise SessionExpired(session_id)
+    return ParsedCV.from_dict(values["cv"]), values["job"]
+
+def session_result(session_id, function_name):
+    """Return a SESSION_FUNCTIONS result for the session's CV and job, computing it once.
+
+    A stored result costs one small read. Otherwise the stored CV is loaded
+    (already parsed and analyzed) and the result is computed and stored.
+    Output the call's instrumentation marks as a fallback, or as demo
+    output while an API key is set, is returned but not stored, so the next
+    call tries again.
+    """
+    store = get_session_store()
+    field = "result:" + function_name
+    values = store.get_many(session_id, ["version", field])
+    if "version" not in values:
+        raise SessionExpired(session_id)
+    stored = values.get(field)
+    if stored is not None and stored[0] == values["version"]:
+        return stored[1]
+    
+    cv, job = get_session(session_id)
+    with request_trace() as records:
+        result = SESSION_FUNCTIONS[function_name](cv, job["description"])
+    if not any(record["fallback"] or (record["demo"] and not USE_DEMO_MODE) for record in records):
+        store.set(session_id, field, [values["version"], result])
+    return result
+
+def end_session(session_id):
+    """Delete everything stored for a session."""
+    get_session_store().delete(session_id)
 
 # Demo usage
 if __name__ == "__main__":
+    # Show progress messages when run as a script
+    logging.basicConfig(format="%(message)s")
+    if not os.environ.get("LOG_LEVEL"):
+        logger.setLevel(logging.INFO)
+    
     # Sample data
     sample_summary = "Software developer with experience in web development."
     sample_skills = ["JavaScript", "React", "HTML", "CSS", "Node.js", "Express", "MongoDB", "Python", "Redux"]
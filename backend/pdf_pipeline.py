@@ -0,0 +1,203 @@
+"""
+Streaming PDF ingestion and generation for the Resume Assistant.
+
+Input: an uploaded CV PDF is memory-mapped rather than read into one
+buffer, and its pages are extracted one at a time with PyPDF2. Each page's
+text goes straight into an incremental CVParser, which also scans it for
+skill terms, so the result is a ParsedCV ready for every function in
+openai_demo. PyPDF2's object cache is cleared after each page, so memory
+does not grow with the page count, and extraction stops once the text
+limit is reached. Bullet glyphs that extract as control or private-use
+characters (reportlab's own "•", Word's Symbol-font bullets) are turned
+back into "•" so the parser still sees list items.
+
+Output: render_cv_pdf() draws CV text to a reportlab PDF line by line as
+chunks arrive, e.g. straight from optimize_cv_content_stream(), so drawing
+overlaps generation. reportlab keeps the finished pages in memory and
+writes the file when the document is saved, so output memory grows with
+the page count. render_session_pdf() renders the optimized CV stored with
+a session.
+
+Configuration (environment):
+    MAX_UPLOAD_SIZE       largest accepted PDF in bytes (default 16 MB)
+    PDF_MAX_TEXT_CHARS    extracted text kept at most (default 200000)
+"""
+
+import mmap
+import os
+import re
+
+from cv_parser import BULLET_PATTERN, HEADING_PATTERN, CVParser
+from instrumentation import logger
+
+DEFAULT_MAX_UPLOAD_SIZE = 16 * 1024 * 1024
+DEFAULT_MAX_TEXT_CHARS = 200000
+
+# Layout of rendered CVs, in points
+PAGE_MARGIN = 54
+BODY_FONT = ("Helvetica", 10, 13)
+HEADING_FONT = ("Helvetica-Bold", 12, 18)
+BULLET_INDENT = 12
+
+# Line-leading bullet glyphs as PDF text extraction returns them: DEL for
+# reportlab's standard-font bullet, private-use Symbol/Wingdings bullets
+# from Word, and the filled shapes
+EXTRACTED_BULLET_PATTERN = re.compile("^([ \t]*)[\x7f\uf0b7\uf0a7\uf06e\u25a0\u25cf](?=[ \t])", re.MULTILINE)
+
+
+class PDFIngestError(ValueError):
+    """Raised when an uploaded file cannot be read as a CV PDF."""
+
+
+class UploadTooLarge(PDFIngestError):
+    """Raised when an upload exceeds MAX_UPLOAD_SIZE."""
+
+
+def normalize_bullets(text):
+    """Replace bullet glyphs mangled by PDF text extraction with "•"."""
+    return EXTRACTED_BULLET_PATTERN.sub("\\1•", text)
+
+
+def _max_upload_size():
+    return int(os.environ.get("MAX_UPLOAD_SIZE", str(DEFAULT_MAX_UPLOAD_SIZE)))
+
+
+def iter_pdf_pages(source, max_size=None):
+    """Yield the text of each page of a PDF, one page at a time.
+
+    source is a path or a binary file object with a fileno() (such as a
+    saved upload); the file is memory-mapped, not read into memory.
+    """
+    from PyPDF2 import PdfReader
+    from PyPDF2.errors import PdfReadError
+
+    max_size = _max_upload_size() if max_size is None else max_size
+    owned = isinstance(source, (str, bytes, os.PathLike))
+    handle = open(source, "rb") if owned else source
+    try:
+        size = os.fstat(handle.fileno()).st_size
+        if size > max_size:
+            raise UploadTooLarge(f"PDF is {size} bytes; the limit is {max_size}")
+        if size == 0:
+            raise PDFIngestError("PDF is empty")
+
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            try:
+                reader = PdfReader(mapped)
+                page_count = len(reader.pages)
+            except PdfReadError as e:
+                raise PDFIngestError(f"Could not read PDF: {str(e)}") from e
+
+            for index in range(page_count):
+                try:
+                    text = reader.pages[index].extract_text() or ""
+                except PdfReadError as e:
+                    logger.warning("Skipping unreadable PDF page %d: %s", index + 1, e)
+                    text = ""
+                # Drop parsed objects (content streams, fonts) of pages already read
+                reader.resolved_objects.clear()
+                yield normalize_bullets(text)
+    finally:
+        if owned:
+            handle.close()
+
+
+def ingest_pdf(source, max_size=None, max_chars=None):
+    """Read a CV PDF page by page into a ParsedCV with its analysis precomputed."""
+    max_chars = int(os.environ.get("PDF_MAX_TEXT_CHARS", str(DEFAULT_MAX_TEXT_CHARS))) if max_chars is None else max_chars
+    parser = CVParser(analyze=True)
+    total = 0
+    pages = 0
+    for text in iter_pdf_pages(source, max_size):
+        pages += 1
+        if total + len(text) > max_chars:
+            parser.feed(text[:max_chars - total])
+            logger.warning("PDF text truncated to %d characters after page %d", max_chars, pages)
+            break
+        parser.feed(text + "\n")
+        total += len(text) + 1
+    cv = parser.close()
+    logger.info("Ingested %d PDF pages (%d characters)", pages, len(cv.text))
+    return cv
+
+
+class _PageWriter:
+    """Draws CV lines onto a reportlab canvas, starting new pages as needed."""
+
+    def __init__(self, pdf, page_size):
+        self.pdf = pdf
+        self.width, self.height = page_size
+        self.pages = 1
+        self.y = self.height - PAGE_MARGIN
+
+    def _advance(self, leading):
+        if self.y - leading < PAGE_MARGIN:
+            self.pdf.showPage()
+            self.pages += 1
+            self.y = self.height - PAGE_MARGIN
+        self.y -= leading
+
+    def draw(self, line):
+        from reportlab.lib.utils import simpleSplit
+
+        text = line.strip()
+        if not text:
+            self._advance(BODY_FONT[2] / 2)
+            return
+
+        font, size, leading = HEADING_FONT if HEADING_PATTERN.match(text) else BODY_FONT
+        indent = BULLET_INDENT if BULLET_PATTERN.match(text) else 0
+        usable = self.width - 2 * PAGE_MARGIN - indent
+        for part in simpleSplit(text, font, size, usable) or [""]:
+            self._advance(leading)
+            self.pdf.setFont(font, size)
+            self.pdf.drawString(PAGE_MARGIN + indent, self.y, part)
+
+
+def render_cv_pdf(chunks, output, title="Resume"):
+    """Render CV text chunks to a PDF as they arrive and return the page count.
+
+    output is a path or a binary file object. Each complete line is drawn
+    as soon as its chunk arrives; the PDF itself is written when the last
+    chunk has been drawn.
+    """
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+
+    pdf = canvas.Canvas(output, pagesize=letter)
+    pdf.setTitle(title)
+    writer = _PageWriter(pdf, letter)
+
+    pending = ""
+    for chunk in chunks:
+        lines = (pending + chunk).split("\n")
+        pending = lines.pop()
+        for line in lines:
+            writer.draw(line)
+    if pending:
+        writer.draw(pending)
+
+    pdf.save()
+    return writer.pages
+
+
+def optimize_pdf(source, job_description, output):
+    """Read a CV PDF, optimize it for the job and render the result as it is generated.
+
+    Returns (parsed_cv, page_count); the ParsedCV can be passed on to the
+    other enhancement functions without re-reading the PDF.
+    """
+    from openai_demo import optimize_cv_content_stream
+
+    cv = ingest_pdf(source)
+    return cv, render_cv_pdf(optimize_cv_content_stream(cv, job_description), output)
+
+
+def render_session_pdf(session_id, output, title="Resume"):
+    """Render a session's optimized CV, reusing the stored result when there is one.
+
+    Returns the page count; raises SessionExpired if the session has no CV.
+    """
+    from openai_demo import session_result
+
+    return render_cv_pdf([session_result(session_id, "optimize_cv_content")], output, title)
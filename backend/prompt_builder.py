@@ -0,0 +1,228 @@
+"""
+Token-budget-aware prompt inputs for the OpenAI-backed resume functions.
+
+Before a CV or job description goes into a prompt it is split into
+paragraphs. Exact duplicates and job-board boilerplate (equal opportunity
+statements, benefits blurbs, "apply now" footers) are dropped. If the text
+is still over the function's token budget, the paragraphs with the lowest
+keyword score against the job are dropped. The paragraphs that remain keep
+their original order.
+
+Tokens are counted with tiktoken when it is installed and estimated
+locally otherwise. Each fit returns a PromptReport with the token savings.
+
+PromptTemplate lays out the user prompt itself. With PROMPT_LAYOUT=prefix
+(the default) the task, instructions and examples come first, in the same
+bytes on every call, and the CV and job text come last, so consecutive
+calls share a long prefix that the provider's prompt cache can reuse.
+PROMPT_LAYOUT=inline keeps the inputs between the task and the
+instructions.
+"""
+
+import os
+import re
+import textwrap
+from collections import namedtuple
+
+from skill_matcher import get_default_matcher
+
+# Per-function token budgets for each variable prompt input
+PROMPT_BUDGETS = {
+    "enhance_resume_summary": {"basic_summary": 300, "job_description": 900},
+    "prioritize_skills": {"job_description": 1200},
+    "get_resume_pro_tips": {"cv_content": 1800, "job_description": 900},
+    "optimize_cv_content": {"cv_content": 3000, "job_description": 900},
+    "optimize_cv_section": {"cv_section": 3000, "job_description": 900},
+    "tailor_cv_for_jobs": {"cv_content": 1800, "job_description": 600},
+}
+
+BOILERPLATE_PATTERNS = [
+    r'equal (?:employment )?opportunity',
+    r'without regard to (?:race|color|religion|sex|gender|age|disability)',
+    r'reasonable accommodations?',
+    r'\b(?:we offer|our benefits|perks|benefits include|what we offer)\b',
+    r'\b(?:apply now|how to apply|click (?:here|apply)|submit your (?:application|resume|cv))\b',
+    r'\b(?:privacy (?:policy|notice)|cookies?|terms of use|all rights reserved)\b',
+    r'\b(?:about us|about the company|who we are|follow us on)\b',
+    r'\b(?:recruitment agencies|unsolicited resumes)\b',
+]
+BOILERPLATE_PATTERN = re.compile('|'.join(BOILERPLATE_PATTERNS), re.IGNORECASE)
+
+# Rough tokenizer used when tiktoken is not installed: words, numbers and
+# individual punctuation marks each count as roughly one token
+ESTIMATE_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+PROMPT_LAYOUTS = ("prefix", "inline")
+
+# Ends the static part of a prefix-layout prompt
+INPUTS_SEPARATOR = "\n\n---\n\n"
+
+PromptReport = namedtuple("PromptReport", ["function", "original_tokens", "tokens", "saved_tokens", "dropped_paragraphs"])
+
+_encoding = None
+
+
+def count_tokens(text, model="gpt-3.5-turbo"):
+    """Count tokens in text, exactly with tiktoken if available, otherwise estimated."""
+    global _encoding
+    if not text:
+        return 0
+    if _encoding is None:
+        try:
+            import tiktoken
+            _encoding = tiktoken.encoding_for_model(model)
+        except Exception:
+            _encoding = False
+    if _encoding:
+        return len(_encoding.encode(text))
+
+    # Long words split into several tokens; ~4 characters per token
+    return sum(len(piece) // 4 + 1 for piece in ESTIMATE_PATTERN.findall(text))
+
+
+def split_paragraphs(text):
+    """Split text into paragraphs on blank lines, trimming surrounding whitespace."""
+    return [paragraph.strip() for paragraph in re.split(r'\n\s*\n', text) if paragraph.strip()]
+
+
+def _normalized(paragraph):
+    return re.sub(r'\s+', ' ', paragraph).strip().lower()
+
+
+def _truncate_to_tokens(text, max_tokens):
+    """Cut text to roughly max_tokens, ending on a whole line when possible."""
+    if max_tokens <= 0:
+        return ""
+    lines = text.split('\n')
+    kept = []
+    used = 0
+    for line in lines:
+        line_tokens = count_tokens(line) + 1
+        if used + line_tokens > max_tokens:
+            break
+        kept.append(line)
+        used += line_tokens
+    if kept:
+        return '\n'.join(kept)
+    # A single over-long line: fall back to a character cut
+    return text[:max_tokens * 4]
+
+
+def fit_text(text, max_tokens, keywords=None, drop_boilerplate=True):
+    """Compact text to fit max_tokens.
+
+    Returns (fitted_text, original_tokens, fitted_tokens, dropped_paragraphs).
+    Paragraphs are scored by how many of the keywords (lowercased skill
+    terms) they mention; the first paragraph, usually a title or contact
+    block, is always preferred.
+    """
+    text = text or ""
+    original_tokens = count_tokens(text)
+    paragraphs = split_paragraphs(text)
+
+    seen = set()
+    candidates = []
+    for index, paragraph in enumerate(paragraphs):
+        key = _normalized(paragraph)
+        if key in seen:
+            continue
+        seen.add(key)
+        if drop_boilerplate and index > 0 and BOILERPLATE_PATTERN.search(paragraph):
+            continue
+        candidates.append((index, paragraph, count_tokens(paragraph)))
+
+    total = sum(tokens for _, _, tokens in candidates) + 2 * max(len(candidates) - 1, 0)
+    if total > max_tokens:
+        matcher = get_default_matcher()
+        keywords = keywords or set()
+
+        def relevance(candidate):
+            index, paragraph, tokens = candidate
+            score = len(matcher.terms_in(paragraph) & keywords) if keywords else len(matcher.terms_in(paragraph))
+            return (index == 0, score, -index)
+
+        kept = []
+        used = 0
+        for candidate in sorted(candidates, key=relevance, reverse=True):
+            cost = candidate[2] + 2
+            if used + cost <= max_tokens:
+                kept.append(candidate)
+                used += cost
+        if not kept and candidates:
+            index, paragraph, _ = candidates[0]
+            kept = [(index, _truncate_to_tokens(paragraph, max_tokens), 0)]
+        candidates = sorted(kept)
+
+    fitted = '\n\n'.join(paragraph for _, paragraph, _ in candidates)
+    return fitted, original_tokens, count_tokens(fitted), len(paragraphs) - len(candidates)
+
+
+def fit_inputs(function_name, **inputs):
+    """Fit each prompt input to the function's budget.
+
+    Returns (fitted_inputs, PromptReport). CV paragraphs are ranked by the
+    skill terms they share with the job description.
+    """
+    budgets = PROMPT_BUDGETS.get(function_name, {})
+    job_description = inputs.get("job_description") or ""
+    keywords = get_default_matcher().terms_in(job_description)
+
+    fitted = {}
+    original_total = fitted_total = dropped_total = 0
+    for name, value in inputs.items():
+        budget = budgets.get(name)
+        if budget is None or not isinstance(value, str):
+            fitted[name] = value
+            continue
+        # The CV is the candidate's own content; never treat it as boilerplate
+        is_job = name == "job_description"
+        fitted[name], original, tokens, dropped = fit_text(
+            value,
+            budget,
+            keywords=None if is_job else keywords,
+            drop_boilerplate=is_job
+        )
+        original_total += original
+        fitted_total += tokens
+        dropped_total += dropped
+
+    report = PromptReport(function_name, original_total, fitted_total, max(original_total - fitted_total, 0), dropped_total)
+    return fitted, report
+
+
+def prompt_layout():
+    """Return the PROMPT_LAYOUT setting: "prefix" (the default) or "inline"."""
+    layout = os.environ.get("PROMPT_LAYOUT", "prefix").strip().lower()
+    return layout if layout in PROMPT_LAYOUTS else "prefix"
+
+
+class PromptTemplate:
+    """A user prompt: a task line, instructions, optional examples and labelled inputs.
+
+    inputs lists (name, label) pairs in prompt order and examples lists
+    (label, text) pairs. A single-line value goes on its label's line and a
+    longer one below it.
+    """
+
+    def __init__(self, task, instructions, inputs, examples=()):
+        self.task = task
+        self.instructions = textwrap.dedent(instructions).strip()
+        self.inputs = inputs
+        self.examples = _labelled((label, textwrap.dedent(text)) for label, text in examples)
+        # Everything before the inputs in the prefix layout, identical for every call
+        self.prefix = "\n\n".join(part for part in (task, self.instructions, self.examples) if part) + INPUTS_SEPARATOR
+
+    def render(self, layout=None, **values):
+        """Return the prompt for values in the given layout (PROMPT_LAYOUT by default)."""
+        inputs = _labelled((label, str(values[name])) for name, label in self.inputs)
+        if (layout or prompt_layout()) == "inline":
+            return "\n\n".join(part for part in (self.task, inputs, self.instructions, self.examples) if part) + "\n"
+        return self.prefix + inputs + "\n"
+
+
+def _labelled(pairs):
+    blocks = []
+    for label, text in pairs:
+        text = text.strip()
+        blocks.append(f"{label}:\n{text}" if "\n" in text else f"{label}: {text}")
+    return "\n\n".join(blocks)
@@ -0,0 +1,194 @@
+"""
+Vectorized relevance scoring for skills, CVs and job descriptions.
+
+Texts become sparse TF-IDF term matrices (scipy CSR), so relevance for
+every skill against every posting, or every CV against every posting, is a
+single sparse matrix product. Nothing here calls the network.
+
+Two scores are available:
+    skill coverage   IDF-weighted share of a skill's tokens that appear in a
+                     job description (1.0 means every token is present)
+    document cosine  cosine similarity of TF-IDF vectors, used for CV/job pairs
+
+Skill coverage fits its IDF on skill names, from the skill taxonomy (names
+and synonyms) plus the skills being scored, never on the job descriptions
+being scored. A token shared by many skill names ("development",
+"testing") is generic and weighs less than a distinctive one ("graphql"),
+even when a single job is scored. The taxonomy's token counts are taken
+once per loaded taxonomy, so a request only counts its own skills.
+"""
+
+import re
+
+import numpy as np
+from scipy import sparse
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#]*(?:[./-][a-z0-9+#]+)*")
+
+# Coverage thresholds for the high/medium/low priority buckets
+HIGH_PRIORITY_THRESHOLD = 0.75
+MEDIUM_PRIORITY_THRESHOLD = 0.35
+
+
+def tokenize(text):
+    """Return lowercased word tokens, keeping names like node.js, c++ and ci/cd intact.
+
+    A plain plural "s" is dropped so "APIs" and "API" score as the same term.
+    """
+    return [
+        token[:-1] if len(token) > 3 and token.endswith("s") and not token.endswith("ss") else token
+        for token in TOKEN_PATTERN.findall(text.lower())
+    ]
+
+
+def _count_matrix(texts, vocabulary, grow=False):
+    """Build a CSR term-count matrix; new tokens extend vocabulary only if grow is set."""
+    indptr = [0]
+    indices = []
+    data = []
+    for text in texts:
+        counts = {}
+        for token in tokenize(text):
+            column = vocabulary.get(token)
+            if column is None:
+                if not grow:
+                    continue
+                column = vocabulary[token] = len(vocabulary)
+            counts[column] = counts.get(column, 0) + 1
+        indices.extend(counts)
+        data.extend(counts.values())
+        indptr.append(len(indices))
+    return sparse.csr_matrix(
+        (np.array(data, dtype=np.float32), np.array(indices, dtype=np.int32), np.array(indptr, dtype=np.int64)),
+        shape=(len(texts), len(vocabulary))
+    )
+
+
+def _idf(counts):
+    """Smoothed inverse document frequency for each column of a count matrix."""
+    document_frequency = np.bincount(counts.indices, minlength=counts.shape[1])
+    return (np.log((1 + counts.shape[0]) / (1 + document_frequency)) + 1).astype(np.float32)
+
+
+def _normalize_rows(matrix, norm="l2"):
+    """Scale each row of a CSR matrix to unit l1 or l2 norm (empty rows stay zero)."""
+    if norm == "l1":
+        lengths = np.asarray(abs(matrix).sum(axis=1)).ravel()
+    else:
+        lengths = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    lengths[lengths == 0] = 1
+    return sparse.diags(1 / lengths) @ matrix
+
+
+def priority_buckets(scores, high=HIGH_PRIORITY_THRESHOLD, medium=MEDIUM_PRIORITY_THRESHOLD):
+    """Map an array of scores to "high", "medium" and "low" labels."""
+    return np.where(scores >= high, "high", np.where(scores >= medium, "medium", "low"))
+
+
+class SkillCorpus:
+    """Per-token document frequencies over a fixed list of skill names, counted once."""
+
+    __slots__ = ("size", "document_frequency")
+
+    def __init__(self, names):
+        self.size = 0
+        self.document_frequency = {}
+        for name in names:
+            self.size += 1
+            for token in set(tokenize(name)):
+                self.document_frequency[token] = self.document_frequency.get(token, 0) + 1
+
+    def idf(self, vocabulary, presence):
+        """Smoothed IDF over this corpus plus the skills in a 0/1 presence matrix.
+
+        Matches _idf() on the corpus and skills stacked into one matrix,
+        without counting the corpus again.
+        """
+        frequency = np.zeros(len(vocabulary), dtype=np.int64)
+        for token, column in vocabulary.items():
+            frequency[column] = self.document_frequency.get(token, 0)
+        frequency += np.bincount(presence.indices, minlength=len(vocabulary))
+        documents = self.size + presence.shape[0]
+        return (np.log((1 + documents) / (1 + frequency)) + 1).astype(np.float32)
+
+
+_reference_corpus = (None, None)
+
+
+def reference_corpus():
+    """Return the SkillCorpus of the shared taxonomy's names and synonyms, the default for skill IDF.
+
+    Counted once per loaded taxonomy and reused by every SkillScorer.
+    """
+    global _reference_corpus
+    from skill_matcher import get_default_matcher
+    taxonomy = get_default_matcher().taxonomy
+    cached_taxonomy, corpus = _reference_corpus
+    if cached_taxonomy is not taxonomy:
+        corpus = SkillCorpus(taxonomy.index)
+        _reference_corpus = (taxonomy, corpus)
+    return corpus
+
+
+class SkillScorer:
+    """Scores a fixed skill list against any number of job descriptions.
+
+    The skill vocabulary, IDF and token weights are built once, so repeated
+    scoring only vectorizes the job descriptions and runs one sparse
+    product. reference is the corpus IDF is fitted on, together with the
+    skills themselves: a SkillCorpus or a list of names (the taxonomy's
+    names and synonyms by default).
+    """
+
+    def __init__(self, skills, reference=None):
+        self.skills = list(skills)
+        self.vocabulary = {}
+        presence = _count_matrix(self.skills, self.vocabulary, grow=True)
+        presence.data[:] = 1
+
+        if reference is None:
+            reference = reference_corpus()
+        elif not isinstance(reference, SkillCorpus):
+            reference = SkillCorpus(reference)
+        self.idf = reference.idf(self.vocabulary, presence)
+        # Rare tokens ("graphql") count for more of a skill than common ones ("development")
+        self._weights = _normalize_rows(presence.multiply(self.idf).tocsr(), norm="l1")
+
+    def score(self, job_descriptions):
+        """Return a (skills x jobs) array of skill coverage scores in [0, 1]."""
+        job_counts = _count_matrix(list(job_descriptions), self.vocabulary)
+        job_counts.data[:] = 1
+        return np.asarray((self._weights @ job_counts.T).todense())
+
+    def rank(self, job_description):
+        """Return skills sorted by relevance to one job, with score and priority bucket."""
+        scores = self.score([job_description])[:, 0]
+        buckets = priority_buckets(scores)
+        order = np.argsort(-scores, kind="stable")
+        return [
+            {"name": self.skills[i], "score": round(float(scores[i]), 4), "priority": str(buckets[i])}
+            for i in order
+        ]
+
+
+def score_skills(skills, job_descriptions):
+    """Return a (skills x jobs) array of coverage scores."""
+    return SkillScorer(skills).score(job_descriptions)
+
+
+def rank_skills(skills, job_description):
+    """Rank candidate skills for one job description, highest score first."""
+    return SkillScorer(skills).rank(job_description)
+
+
+def score_documents(cv_contents, job_descriptions):
+    """Return a (CVs x jobs) array of TF-IDF cosine similarities."""
+    cv_contents = list(cv_contents)
+    vocabulary = {}
+    counts = _count_matrix(cv_contents + list(job_descriptions), vocabulary, grow=True)
+    idf = _idf(counts)
+    counts.data = 1 + np.log(counts.data)  # sublinear term frequency
+    tfidf = _normalize_rows(counts.multiply(idf).tocsr())
+
+    cvs, jobs = tfidf[:len(cv_contents)], tfidf[len(cv_contents):]
+    return np.asarray((cvs @ jobs.T).todense())
@@ -0,0 +1,181 @@
+"""
+Content-addressed cache for OpenAI completions.
+
+Responses are keyed on a SHA-256 of everything that determines the output
+(function, model, messages, temperature, max_tokens and any extra request
+options). Lookups go to an in-process LRU tier first and then to Redis when
+USE_REDIS is enabled, so repeat requests for the same CV and job
+description skip the model round-trip entirely.
+
+Configuration (environment):
+    USE_REDIS                   enable the shared Redis tier ("true"/"false")
+    REDIS_URL                   Redis connection string
+    RESPONSE_CACHE_TTL          seconds before an entry expires (0 disables caching)
+    RESPONSE_CACHE_MAX_ENTRIES  maximum entries held in the in-process tier
+    RESPONSE_CACHE_MAX_BYTES    maximum total size of the in-process tier
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from instrumentation import logger
+
+REDIS_KEY_PREFIX = "resume-assistant:llm:"
+
+
+def env_flag(name, default=False):
+    """Read a true/false environment variable."""
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def make_cache_key(function_name, model, messages, temperature=None, max_tokens=None, **extra):
+    """Return a stable hash of every input that determines a completion."""
+    payload = {
+        "function": function_name,
+        "model": model,
+        "messages": messages,
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+        "extra": extra,
+    }
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class LRUCache:
+    """Thread-safe LRU cache with per-entry TTL and entry/byte limits."""
+
+    def __init__(self, max_entries=1024, max_bytes=32 * 1024 * 1024, ttl=86400):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached value, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, size, expires_at = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        """Store a string value, evicting least recently used entries as needed."""
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, time.monotonic() + self.ttl)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def delete(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class ResponseCache:
+    """Two-tier (in-process LRU, optional Redis) cache of completion texts."""
+
+    def __init__(self, local, redis_client=None, ttl=86400):
+        self.local = local
+        self.redis = redis_client
+        self.ttl = ttl
+        self.enabled = ttl > 0
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+
+        value = self.local.get(key)
+        if value is not None or self.redis is None:
+            return value
+
+        try:
+            raw = self.redis.get(REDIS_KEY_PREFIX + key)
+        except Exception as e:
+            logger.warning("Redis cache read failed: %s", e)
+            return None
+        if raw is None:
+            return None
+
+        value = raw.decode("utf-8") if isinstance(raw, bytes) else raw
+        # Promote to the local tier so the next hit stays in-process
+        self.local.set(key, value)
+        return value
+
+    def set(self, key, value):
+        if not self.enabled or value is None:
+            return
+
+        self.local.set(key, value)
+        if self.redis is None:
+            return
+        try:
+            self.redis.set(REDIS_KEY_PREFIX + key, value, ex=self.ttl)
+        except Exception as e:
+            logger.warning("Redis cache write failed: %s", e)
+
+
+def connect_redis():
+    """Return a Redis client when USE_REDIS is enabled and reachable, else None."""
+    if not env_flag("USE_REDIS"):
+        return None
+    try:
+        import redis
+        client = redis.Redis.from_url(os.environ.get("REDIS_URL", "redis://localhost:6379/0"))
+        client.ping()
+        return client
+    except Exception as e:
+        logger.warning("Redis unavailable, using in-process cache only: %s", e)
+        return None
+
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """Return the shared response cache, configured from the environment on first use."""
+    global _response_cache
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                ttl = int(os.environ.get("RESPONSE_CACHE_TTL", "86400"))
+                local = LRUCache(
+                    max_entries=int(os.environ.get("RESPONSE_CACHE_MAX_ENTRIES", "1024")),
+                    max_bytes=int(os.environ.get("RESPONSE_CACHE_MAX_BYTES", str(32 * 1024 * 1024))),
+                    ttl=ttl
+                )
+                _response_cache = ResponseCache(local, connect_redis() if ttl > 0 else None, ttl=ttl)
+    return _response_cache
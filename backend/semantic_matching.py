@@ -0,0 +1,383 @@
+"""
+Semantic skill matching with local embeddings and a nearest-neighbour index.
+
+The keyword engine only sees the names and synonyms listed in the skill
+taxonomy, so an unlisted variant ("React 18") or a related phrase
+("unit tests" for "testing") is missed. With SEMANTIC_MATCHING
+enabled, skills, CV entries and job-description phrases are embedded as
+unit vectors and compared by cosine similarity, on the CPU and without any
+API call:
+
+    hashing   the default: hashed character n-grams and word stems, a
+              fastText-style model with no download and no extra dependency
+    <name>    any sentence-transformers model (e.g. all-MiniLM-L6-v2), if
+              the package is installed; thresholds may need retuning
+
+The skill vocabulary (the taxonomy plus SEMANTIC_VOCABULARY_PATH) lives in
+a VectorIndex, saved to SEMANTIC_INDEX_PATH so a restart loads it instead
+of embedding everything again. Large vocabularies are clustered for
+approximate search; small ones are searched exactly. Embeddings are cached
+per text and each job description's phrase index per job, so repeat
+postings cost one matrix product per query.
+
+Configuration (environment):
+    SEMANTIC_MATCHING            true turns semantic matching on
+    SEMANTIC_MODEL               "hashing" or a sentence-transformers model name
+    SEMANTIC_INDEX_PATH          file the vocabulary index is saved to and loaded from
+    SEMANTIC_VOCABULARY_PATH     extra skill names, one per line
+    SEMANTIC_MATCH_THRESHOLD     similarity from which two texts name the same skill
+    SEMANTIC_RELATED_THRESHOLD   similarity from which a skill counts as related to a job
+    SEMANTIC_CACHE_SIZE          embeddings kept in memory
+    SEMANTIC_JOB_CACHE_SIZE      job descriptions whose phrase index is kept in memory
+"""
+
+import hashlib
+import math
+import os
+import re
+import threading
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+
+from instrumentation import logger
+from relevance_scoring import TOKEN_PATTERN
+from response_cache import env_flag
+
+INDEX_FORMAT = 1
+HASHING_DIMENSIONS = 256
+# Below this many vectors an exact search takes about a millisecond anyway
+ANN_MIN_SIZE = 20000
+DEFAULT_PROBES = 16
+
+STEM_SUFFIXES = (".js", "js", "ing", "ed", "es", "s")
+NGRAM_SIZES = (3, 4, 5)
+NGRAM_WEIGHT = 0.35
+
+PHRASE_SPLIT_PATTERN = re.compile(r"[\n,;:()\[\]•·|]+|[.!?](?:\s|$)")
+MAX_PHRASE_WORDS = 3
+MAX_JOB_PHRASES = 2000
+STOPWORDS = frozenset("""
+a an and are as at be by for from have in into is it of on or our the their this to we with will you your
+who what which experience experienced knowledge strong plus years year ability including skills skill
+""".split())
+
+
+def _stem(token):
+    for suffix in STEM_SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            return token[:-len(suffix)]
+    return token
+
+
+class HashingEmbedder:
+    """Embeds text as signed hashes of word stems and their character n-grams.
+
+    Names that share a stem ("ReactJS", "React") or most of their n-grams
+    ("PostgreSQL", "Postgres") land close together; unrelated names are
+    near orthogonal.
+    """
+
+    def __init__(self, dimensions=HASHING_DIMENSIONS):
+        self.dimensions = dimensions
+        self.signature = f"hashing-{dimensions}-v1"
+
+    def _features(self, text):
+        for token in TOKEN_PATTERN.findall(text.lower()):
+            stem = _stem(token)
+            yield "w:" + stem, 1.0
+            padded = "<" + stem + ">"
+            for size in NGRAM_SIZES:
+                for start in range(len(padded) - size + 1):
+                    yield padded[start:start + size], NGRAM_WEIGHT
+
+    def encode(self, texts):
+        """Return a (texts x dimensions) float32 array of unit vectors."""
+        rows, columns, weights = [], [], []
+        for row, text in enumerate(texts):
+            for feature, weight in self._features(text):
+                digest = zlib.crc32(feature.encode("utf-8"))
+                rows.append(row)
+                columns.append(digest % self.dimensions)
+                weights.append(weight if digest & 0x80000000 else -weight)
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        np.add.at(vectors, (rows, columns), weights)
+        return _normalize(vectors)
+
+
+class SentenceTransformerEmbedder:
+    """Embeds text with a sentence-transformers model on the CPU."""
+
+    def __init__(self, model_name):
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.signature = "sentence-transformers:" + model_name
+
+    def encode(self, texts):
+        vectors = self.model.encode(list(texts), convert_to_numpy=True, normalize_embeddings=True)
+        return np.asarray(vectors, dtype=np.float32)
+
+
+def make_embedder(name=None):
+    """Return the embedder for a SEMANTIC_MODEL name, falling back to hashing."""
+    if not name or name == "hashing":
+        return HashingEmbedder()
+    try:
+        return SentenceTransformerEmbedder(name)
+    except Exception as e:
+        logger.warning("Could not load embedding model %s (%s); using hashed n-grams", name, e)
+        return HashingEmbedder()
+
+
+def _normalize(vectors):
+    lengths = np.linalg.norm(vectors, axis=1, keepdims=True)
+    lengths[lengths == 0] = 1
+    return vectors / lengths
+
+
+def _top_k(scores, k):
+    """Indices of the k highest scores, best first."""
+    if k >= len(scores):
+        return np.argsort(-scores, kind="stable")
+    best = np.argpartition(-scores, k - 1)[:k]
+    return best[np.argsort(-scores[best], kind="stable")]
+
+
+class VectorIndex:
+    """Cosine nearest-neighbour search over labelled unit vectors.
+
+    With lists set, vectors are grouped around that many k-means centroids
+    and a search only scores the members of the closest few groups (an IVF
+    index); otherwise every vector is scored.
+    """
+
+    def __init__(self, labels, vectors, lists=0, seed=0):
+        self.labels = list(labels)
+        self.vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        self.centroids = None
+        self.members = None
+        self.offsets = None
+        if lists and len(self.labels) > lists:
+            self._cluster(lists, seed)
+
+    @classmethod
+    def build(cls, labels, vectors, ann_min_size=ANN_MIN_SIZE):
+        """Index vectors exactly, or approximately with about sqrt(n) groups if there are many."""
+        count = len(vectors)
+        return cls(labels, vectors, lists=int(math.sqrt(count)) if count >= ann_min_size else 0)
+
+    def __len__(self):
+        return len(self.labels)
+
+    def _cluster(self, lists, seed, iterations=8):
+        """Spherical k-means; members holds vector indices grouped by centroid, offsets their bounds."""
+        rng = np.random.default_rng(seed)
+        centroids = self.vectors[rng.choice(len(self.vectors), lists, replace=False)]
+        for _ in range(iterations):
+            assignment = np.argmax(self.vectors @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, self.vectors)
+            empty = np.bincount(assignment, minlength=lists) == 0
+            sums[empty] = centroids[empty]
+            centroids = _normalize(sums)
+        assignment = np.argmax(self.vectors @ centroids.T, axis=1)
+        self.centroids = centroids
+        self.members = np.argsort(assignment, kind="stable").astype(np.int32)
+        self.offsets = np.searchsorted(assignment[self.members], np.arange(lists + 1)).astype(np.int64)
+
+    def search(self, queries, k=1, probes=DEFAULT_PROBES):
+        """Return, per query vector, up to k (label, similarity) pairs, most similar first."""
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        if not self.labels:
+            return [[] for _ in queries]
+        if self.centroids is None:
+            scores = queries @ self.vectors.T
+            return [[(self.labels[i], float(row[i])) for i in _top_k(row, k)] for row in scores]
+
+        results = []
+        for query, centroid_scores in zip(queries, queries @ self.centroids.T):
+            groups = _top_k(centroid_scores, min(probes, len(self.centroids)))
+            candidates = np.concatenate([self.members[self.offsets[g]:self.offsets[g + 1]] for g in groups])
+            scores = self.vectors[candidates] @ query
+            results.append([(self.labels[candidates[i]], float(scores[i])) for i in _top_k(scores, k)])
+        return results
+
+    def save(self, path, signature):
+        """Write the index to path atomically; signature identifies the embedder and vocabulary."""
+        arrays = {
+            "format": np.array(INDEX_FORMAT),
+            "signature": np.array(signature),
+            "labels": np.array(self.labels, dtype=str),
+            "vectors": self.vectors,
+        }
+        if self.centroids is not None:
+            arrays.update(centroids=self.centroids, members=self.members, offsets=self.offsets)
+        temporary = path + ".tmp"
+        with open(temporary, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path, signature):
+        """Return the index saved at path, or None if it is missing, unreadable or for another signature."""
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as saved:
+                if int(saved["format"]) != INDEX_FORMAT or str(saved["signature"]) != signature:
+                    return None
+                index = cls(saved["labels"].tolist(), saved["vectors"])
+                if "centroids" in saved:
+                    index.centroids = saved["centroids"]
+                    index.members = saved["members"]
+                    index.offsets = saved["offsets"]
+                return index
+        except (OSError, KeyError, ValueError) as e:
+            logger.warning("Could not load semantic index %s: %s", path, e)
+            return None
+
+
+def job_phrases(job_description):
+    """Return the distinct one- to three-word phrases of a job description that could name a skill."""
+    phrases = OrderedDict()
+    for part in PHRASE_SPLIT_PATTERN.split(job_description.lower()):
+        words = TOKEN_PATTERN.findall(part)
+        for start in range(len(words)):
+            if words[start] in STOPWORDS:
+                continue
+            for end in range(start + 1, min(start + MAX_PHRASE_WORDS, len(words)) + 1):
+                if words[end - 1] not in STOPWORDS:
+                    phrases[" ".join(words[start:end])] = None
+        if len(phrases) >= MAX_JOB_PHRASES:
+            break
+    return list(phrases)[:MAX_JOB_PHRASES]
+
+
+class SemanticMatcher:
+    """Finds skills that mean the same thing as, or relate to, other skills and job descriptions."""
+
+    def __init__(self, embedder, vocabulary, index_path=None, match_threshold=0.8, related_threshold=0.55,
+                 cache_size=20000, job_cache_size=256):
+        self.embedder = embedder
+        self.match_threshold = match_threshold
+        self.related_threshold = related_threshold
+        self.cache_size = cache_size
+        self.job_cache_size = job_cache_size
+        self._vectors = OrderedDict()
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self.index = self._vocabulary_index(list(OrderedDict.fromkeys(vocabulary)), index_path)
+
+    def _vocabulary_index(self, vocabulary, index_path):
+        digest = hashlib.sha256("\n".join(vocabulary).encode("utf-8")).hexdigest()[:16]
+        signature = f"{self.embedder.signature}/{digest}"
+        if index_path:
+            index = VectorIndex.load(index_path, signature)
+            if index is not None:
+                logger.debug("Loaded semantic index of %d skills from %s", len(index), index_path)
+                return index
+        index = VectorIndex.build(vocabulary, self.embed(vocabulary))
+        if index_path:
+            try:
+                index.save(index_path, signature)
+            except OSError as e:
+                logger.warning("Could not save semantic index %s: %s", index_path, e)
+        return index
+
+    def embed(self, texts):
+        """Return unit vectors for texts, embedding only those not already cached."""
+        keys = [" ".join(text.lower().split()) for text in texts]
+        if not keys:
+            return np.zeros((0, 0), dtype=np.float32)
+        with self._lock:
+            cached = {key: self._vectors[key] for key in keys if key in self._vectors}
+            for key in cached:
+                self._vectors.move_to_end(key)
+        missing = list(OrderedDict.fromkeys(key for key in keys if key not in cached))
+        if missing:
+            fresh = dict(zip(missing, self.embedder.encode(missing)))
+            cached.update(fresh)
+            with self._lock:
+                self._vectors.update(fresh)
+                while len(self._vectors) > self.cache_size:
+                    self._vectors.popitem(last=False)
+        return np.stack([cached[key] for key in keys])
+
+    def nearest(self, texts, k=1):
+        """Return, per text, its k most similar vocabulary skills as (skill, similarity)."""
+        texts = list(texts)
+        return self.index.search(self.embed(texts), k) if texts else []
+
+    def canonical(self, texts):
+        """Return, per text, the vocabulary skill it names (at least match_threshold similar) or None."""
+        return [
+            matches[0][0] if matches and matches[0][1] >= self.match_threshold else None
+            for matches in self.nearest(texts)
+        ]
+
+    def job_index(self, job_description):
+        """Return the phrase index of a job description, built once per distinct posting."""
+        key = hashlib.sha256(job_description.encode("utf-8")).hexdigest()
+        with self._lock:
+            index = self._jobs.get(key)
+            if index is not None:
+                self._jobs.move_to_end(key)
+                return index
+        phrases = job_phrases(job_description)
+        index = VectorIndex.build(phrases, self.embed(phrases))
+        with self._lock:
+            self._jobs[key] = index
+            while len(self._jobs) > self.job_cache_size:
+                self._jobs.popitem(last=False)
+        return index
+
+    def match_job(self, skills, job_description):
+        """Return, per skill, the most similar job-description phrase as (phrase, similarity)."""
+        skills = list(skills)
+        index = self.job_index(job_description)
+        if not skills or not len(index):
+            return [(None, 0.0) for _ in skills]
+        return [matches[0] for matches in index.search(self.embed(skills))]
+
+    def covered(self, items, reference):
+        """Return, per item, whether some reference text names the same skill."""
+        items, reference = list(items), list(reference)
+        if not items or not reference:
+            return [False] * len(items)
+        scores = self.embed(items) @ self.embed(reference).T
+        return [bool(best >= self.match_threshold) for best in scores.max(axis=1)]
+
+
+def _load_vocabulary(path):
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+
+_semantic_matcher = None
+_semantic_lock = threading.Lock()
+
+
+def get_semantic_matcher():
+    """Return the shared SemanticMatcher, or None unless SEMANTIC_MATCHING is enabled."""
+    global _semantic_matcher
+    if not env_flag("SEMANTIC_MATCHING"):
+        return None
+    if _semantic_matcher is None:
+        with _semantic_lock:
+            if _semantic_matcher is None:
+                from skill_matcher import get_default_matcher
+                vocabulary = get_default_matcher().known_terms()
+                path = os.environ.get("SEMANTIC_VOCABULARY_PATH")
+                if path:
+                    vocabulary += _load_vocabulary(path)
+                _semantic_matcher = SemanticMatcher(
+                    make_embedder(os.environ.get("SEMANTIC_MODEL")),
+                    vocabulary,
+                    index_path=os.environ.get("SEMANTIC_INDEX_PATH") or None,
+                    match_threshold=float(os.environ.get("SEMANTIC_MATCH_THRESHOLD", "0.8")),
+                    related_threshold=float(os.environ.get("SEMANTIC_RELATED_THRESHOLD", "0.55")),
+                    cache_size=int(os.environ.get("SEMANTIC_CACHE_SIZE", "20000")),
+                    job_cache_size=int(os.environ.get("SEMANTIC_JOB_CACHE_SIZE", "256"))
+                )
+    return _semantic_matcher
@@ -0,0 +1,223 @@
+"""
+Per-session state for the multi-step editor flow.
+
+A session holds named values: the parsed CV, the job description with its
+extracted keywords, enhancement results and the incremental optimizer's
+section results. Later steps (tips, PDF download) read them back instead
+of re-sending and re-processing the full CV.
+
+With USE_REDIS enabled, each session is one Redis hash; reads and writes
+of several values go out as one pipeline (HMGET or HSET plus EXPIRE), and
+every access extends the session's TTL. Otherwise sessions live in a
+bounded in-process LRU with the same TTL. Values are JSON, zlib-compressed
+once they reach COMPRESS_MIN_BYTES; a one-byte tag records which.
+
+Configuration (environment):
+    USE_REDIS / REDIS_URL    shared Redis store (see response_cache)
+    SESSION_TTL              seconds a session is kept after its last access
+    SESSION_MAX_SESSIONS     sessions kept at most in the in-process store
+    SESSION_MAX_BYTES        total encoded size kept in the in-process store
+"""
+
+import json
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+from instrumentation import logger
+from response_cache import connect_redis
+
+SESSION_KEY_PREFIX = "resume-assistant:session:"
+COMPRESS_MIN_BYTES = 1024
+
+_PLAIN = b"j"
+_COMPRESSED = b"z"
+
+
+class SessionExpired(LookupError):
+    """Raised when a session holds no CV: it was never started or its TTL ran out."""
+
+
+def encode_value(value):
+    """Serialize a JSON-compatible value to tagged bytes, compressing large ones."""
+    data = json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    if len(data) >= COMPRESS_MIN_BYTES:
+        return _COMPRESSED + zlib.compress(data, 6)
+    return _PLAIN + data
+
+
+def decode_value(raw):
+    tag, data = raw[:1], raw[1:]
+    if tag == _COMPRESSED:
+        data = zlib.decompress(data)
+    elif tag != _PLAIN:
+        raise ValueError(f"Unknown session value encoding {tag!r}")
+    return json.loads(data)
+
+
+class MemorySessionBackend:
+    """In-process sessions: an LRU of field dicts whose TTL is renewed on access."""
+
+    def __init__(self, max_sessions=1000, ttl=3600, max_bytes=64 * 1024 * 1024):
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        # session id -> [fields, expires_at, size in bytes]
+        self._sessions = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def _entry(self, session_id, create=False):
+        now = time.monotonic()
+        entry = self._sessions.get(session_id)
+        if entry is not None and entry[1] <= now:
+            self._remove(session_id)
+            entry = None
+        if entry is None:
+            if not create:
+                return None
+            entry = self._sessions[session_id] = [{}, 0, 0]
+        entry[1] = now + self.ttl
+        self._sessions.move_to_end(session_id)
+        return entry
+
+    def _remove(self, session_id):
+        self._bytes -= self._sessions.pop(session_id)[2]
+
+    def _resize(self, entry):
+        size = sum(len(value) for value in entry[0].values())
+        self._bytes += size - entry[2]
+        entry[2] = size
+
+    def get_many(self, session_id, fields):
+        with self._lock:
+            entry = self._entry(session_id)
+            return [entry[0].get(field) if entry is not None else None for field in fields]
+
+    def set_many(self, session_id, mapping):
+        with self._lock:
+            entry = self._entry(session_id, create=True)
+            entry[0].update(mapping)
+            self._resize(entry)
+            # Evict least recently used sessions, never the one just written
+            while len(self._sessions) > 1 and (len(self._sessions) > self.max_sessions or self._bytes > self.max_bytes):
+                self._remove(next(iter(self._sessions)))
+
+    def delete(self, session_id, fields=None):
+        with self._lock:
+            if session_id not in self._sessions:
+                return
+            if fields is None:
+                self._remove(session_id)
+                return
+            entry = self._sessions[session_id]
+            for field in fields:
+                entry[0].pop(field, None)
+            self._resize(entry)
+
+
+class RedisSessionBackend:
+    """Sessions as Redis hashes, one pipelined round trip per read or write."""
+
+    def __init__(self, client, ttl=3600):
+        self.client = client
+        self.ttl = ttl
+
+    def get_many(self, session_id, fields):
+        key = SESSION_KEY_PREFIX + session_id
+        pipe = self.client.pipeline(transaction=False)
+        pipe.hmget(key, fields)
+        pipe.expire(key, self.ttl)
+        return pipe.execute()[0]
+
+    def set_many(self, session_id, mapping):
+        key = SESSION_KEY_PREFIX + session_id
+        pipe = self.client.pipeline(transaction=False)
+        pipe.hset(key, mapping=mapping)
+        pipe.expire(key, self.ttl)
+        pipe.execute()
+
+    def delete(self, session_id, fields=None):
+        key = SESSION_KEY_PREFIX + session_id
+        if fields is None:
+            self.client.delete(key)
+        elif fields:
+            self.client.hdel(key, *fields)
+
+
+class SessionStore:
+    """Named JSON values per session over a memory or Redis backend.
+
+    Backend errors are logged and treated as missing values or dropped
+    writes, so a Redis outage costs recomputation rather than a failed
+    request.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def get_many(self, session_id, names):
+        """Return {name: value} for the names the session holds."""
+        names = list(names)
+        try:
+            raws = self.backend.get_many(session_id, names)
+        except Exception as e:
+            logger.warning("Session store read failed: %s", e)
+            return {}
+
+        values = {}
+        for name, raw in zip(names, raws):
+            if raw is None:
+                continue
+            try:
+                values[name] = decode_value(raw)
+            except ValueError as e:
+                logger.warning("Dropping unreadable session value %s: %s", name, e)
+        return values
+
+    def get(self, session_id, name, default=None):
+        return self.get_many(session_id, [name]).get(name, default)
+
+    def set_many(self, session_id, values):
+        if not values:
+            return
+        try:
+            self.backend.set_many(session_id, {name: encode_value(value) for name, value in values.items()})
+        except Exception as e:
+            logger.warning("Session store write failed: %s", e)
+
+    def set(self, session_id, name, value):
+        self.set_many(session_id, {name: value})
+
+    def delete(self, session_id, names=None):
+        """Delete some of a session's values, or the whole session if names is None."""
+        try:
+            self.backend.delete(session_id, None if names is None else list(names))
+        except Exception as e:
+            logger.warning("Session store delete failed: %s", e)
+
+
+_session_store = None
+_session_store_lock = threading.Lock()
+
+
+def get_session_store():
+    """Return the shared SessionStore, on Redis when enabled, configured on first use."""
+    global _session_store
+    if _session_store is None:
+        with _session_store_lock:
+            if _session_store is None:
+                ttl = int(os.environ.get("SESSION_TTL", "3600"))
+                client = connect_redis()
+                if client is not None:
+                    backend = RedisSessionBackend(client, ttl=ttl)
+                else:
+                    backend = MemorySessionBackend(
+                        max_sessions=int(os.environ.get("SESSION_MAX_SESSIONS", "1000")),
+                        ttl=ttl,
+                        max_bytes=int(os.environ.get("SESSION_MAX_BYTES", str(64 * 1024 * 1024)))
+                    )
+                _session_store = SessionStore(backend)
+    return _session_store
@@ -0,0 +1,173 @@
+"""
+Request coalescing (single-flight) for identical in-flight OpenAI calls.
+
+When several requests need the same completion at the same time, only one
+of them (the leader) calls the API; the others wait for its result.
+
+    - Threads in one worker coalesce through an in-process table of calls.
+    - Tasks in one event loop coalesce through shared asyncio futures.
+    - Across gunicorn workers, the leader takes a Redis lock (SET NX PX).
+      Leaders in other workers then poll the shared response cache for the
+      result instead of calling the API themselves.
+
+Configuration (environment):
+    SINGLE_FLIGHT_LOCK_TTL   seconds a Redis lock is held at most
+    SINGLE_FLIGHT_WAIT       seconds a follower waits before calling the API itself
+"""
+
+import asyncio
+import os
+import threading
+import time
+import uuid
+
+from instrumentation import logger
+
+REDIS_LOCK_PREFIX = "resume-assistant:inflight:"
+REDIS_POLL_INTERVAL = 0.05
+
+# Delete the lock only if we still own it
+RELEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Deduplicates concurrent calls that share a key."""
+
+    def __init__(self, redis_client=None, lock_ttl=60.0, wait=60.0):
+        self.redis = redis_client
+        self.lock_ttl = lock_ttl
+        self.wait = wait
+        self._calls = {}
+        self._async_calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn, lookup=None):
+        """Return fn(), sharing one execution among concurrent callers with the same key.
+
+        lookup, if given, reads a result another worker may have stored (for
+        example the shared response cache); it enables the Redis lock path.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._run_leader(key, fn, lookup)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+    def _run_leader(self, key, fn, lookup):
+        """Run fn, first coordinating with other workers through Redis when available."""
+        if self.redis is None or lookup is None:
+            return fn()
+
+        lock_key = REDIS_LOCK_PREFIX + key
+        token = uuid.uuid4().hex
+        try:
+            acquired = self.redis.set(lock_key, token, nx=True, px=int(self.lock_ttl * 1000))
+        except Exception as e:
+            logger.warning("Redis single-flight lock failed: %s", e)
+            return fn()
+
+        if acquired:
+            try:
+                return fn()
+            finally:
+                try:
+                    self.redis.eval(RELEASE_SCRIPT, 1, lock_key, token)
+                except Exception as e:
+                    logger.warning("Redis single-flight unlock failed: %s", e)
+
+        # Another worker is already calling the API; wait for its result
+        deadline = time.monotonic() + self.wait
+        while time.monotonic() < deadline:
+            result = lookup()
+            if result is not None:
+                return result
+            try:
+                if not self.redis.exists(lock_key):
+                    break
+            except Exception:
+                break
+            time.sleep(REDIS_POLL_INTERVAL)
+
+        result = lookup()
+        return result if result is not None else fn()
+
+    async def do_async(self, key, coroutine_fn):
+        """Async counterpart of do() for tasks sharing one event loop."""
+        loop = asyncio.get_running_loop()
+        calls = self._async_calls.setdefault(loop, {})
+
+        future = calls.get(key)
+        if future is not None:
+            # shield: one cancelled follower must not cancel the shared call
+            return await asyncio.shield(future)
+
+        future = calls[key] = loop.create_future()
+        try:
+            result = await coroutine_fn()
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            # Followers get an ordinary error they can fall back from; a
+            # cancelled future would cancel each of them in turn
+            future.set_exception(asyncio.TimeoutError("shared call was cancelled before it finished"))
+            future.exception()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark retrieved so an unobserved failure does not log a warning
+            future.exception()
+            raise
+        finally:
+            calls.pop(key, None)
+            if not calls:
+                self._async_calls.pop(loop, None)
+
+
+_single_flight = None
+_single_flight_lock = threading.Lock()
+
+
+def get_single_flight():
+    """Return the shared SingleFlight, using the response cache's Redis connection."""
+    global _single_flight
+    if _single_flight is None:
+        with _single_flight_lock:
+            if _single_flight is None:
+                from response_cache import get_response_cache
+                _single_flight = SingleFlight(
+                    redis_client=get_response_cache().redis,
+                    lock_ttl=float(os.environ.get("SINGLE_FLIGHT_LOCK_TTL", "60")),
+                    wait=float(os.environ.get("SINGLE_FLIGHT_WAIT", "60"))
+                )
+    return _single_flight
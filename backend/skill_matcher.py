@@ -0,0 +1,179 @@
+"""
+Skill matching engine for the Resume Assistant demo-mode analyzers.
+
+Skills come from a SkillTaxonomy (see skill_taxonomy), whose lookup table
+maps every lowercased skill name and synonym to a skill id. A scan walks
+the words of a CV or job description once and looks each one up, extending
+a match word by word while it can still grow into a longer skill, so the
+cost of a scan depends on the length of the text and not on the number of
+skills we know about. Each scan returns the hits, reported under their
+canonical names, with their category and character offsets.
+
+A custom taxonomy can be loaded from a JSON file by pointing
+SKILL_TAXONOMY_PATH at it.
+"""
+
+import os
+import re
+from bisect import bisect_right
+from collections import namedtuple
+
+from skill_taxonomy import DEFAULT_TAXONOMY, WORD_PATTERN, SkillTaxonomy, load_taxonomy
+
+# Joins documents for a batch scan; no skill term can match across it
+DOCUMENT_SEPARATOR = "\n\x00\n"
+
+SkillHit = namedtuple("SkillHit", ["term", "category", "start", "end"])
+
+
+class SkillMatcher:
+    """Single-pass matcher over a SkillTaxonomy (or a {category: [terms]} dict)."""
+
+    def __init__(self, taxonomy):
+        if not isinstance(taxonomy, SkillTaxonomy):
+            taxonomy = SkillTaxonomy.from_dict(taxonomy)
+        self.taxonomy = taxonomy
+        self.categories = taxonomy.categories
+        # Terms nested inside longer ones (e.g. "REST" in "REST API"), worked out on first use
+        self._nested = {}
+
+    def _nested_terms(self, key):
+        """Return (skill id, start, end) for every other taxonomy term inside key.
+
+        Fragments end at a word boundary or before a version number, so
+        "CSS3" also counts as "CSS".
+        """
+        nested = self._nested.get(key)
+        if nested is None:
+            index = self.taxonomy.index
+            starts = [m.start() for m in re.finditer(r'\b\w', key)]
+            ends = [m.end() for m in re.finditer(r'\w\b|[^\W\d](?=\d)', key)]
+            nested = []
+            for start in starts:
+                for end in ends:
+                    fragment = key[start:end]
+                    if end > start and fragment != key and fragment in index:
+                        nested.append((index[fragment], start, end))
+            self._nested[key] = nested
+        return nested
+
+    def known_terms(self):
+        """Return every distinct skill term in taxonomy order."""
+        return list(self.taxonomy.names)
+
+    def find_all(self, text, overlapping=False):
+        """Return every SkillHit in text, in document order.
+
+        At each word the longest term starting there wins ("unit testing"
+        over "testing", "REST API" over "REST"). With overlapping=True,
+        terms nested inside a longer hit are also reported (a "REST API"
+        hit also yields "REST").
+        """
+        taxonomy = self.taxonomy
+        if not text or not taxonomy.names:
+            return []
+        index, prefixes, max_words = taxonomy.index, taxonomy.prefixes, taxonomy.max_words
+        names, categories, category_ids = taxonomy.names, taxonomy.categories, taxonomy.category_ids
+
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            lowered = None  # a character whose lowercase is longer; lowercase each span instead
+        words = [match.span() for match in WORD_PATTERN.finditer(text)]
+
+        hits = []
+        position = 0
+        count = len(words)
+        while position < count:
+            start = words[position][0]
+            match = None
+            for last in range(position, min(count, position + max_words)):
+                end = words[last][1]
+                key = lowered[start:end] if lowered is not None else text[start:end].lower()
+                skill = index.get(key)
+                if skill is not None:
+                    match = (last, skill, key)
+                if key not in prefixes:
+                    break
+            if match is None:
+                position += 1
+                continue
+
+            last, skill, key = match
+            end = words[last][1]
+            hits.append(SkillHit(names[skill], categories[category_ids[skill]], start, end))
+            if overlapping:
+                for nested_skill, nested_start, nested_end in self._nested_terms(key):
+                    hits.append(SkillHit(
+                        names[nested_skill],
+                        categories[category_ids[nested_skill]],
+                        start + nested_start,
+                        start + nested_end
+                    ))
+            position = last + 1
+        return hits
+
+    def terms_in(self, text):
+        """Return the set of lowercased skill terms present in text."""
+        return self.terms_from_hits(self.find_all(text))
+
+    def terms_from_hits(self, hits):
+        """Return the lowercased terms of hits plus any terms nested inside them."""
+        keys = self.taxonomy.keys
+        terms = set()
+        for hit in hits:
+            key = hit.term.lower()
+            terms.add(key)
+            terms.update(keys[skill] for skill, _, _ in self._nested_terms(key))
+        return terms
+
+    def find_all_many(self, texts, overlapping=False):
+        """Return one list of SkillHits per text, from a single scan over all of them.
+
+        Hit offsets are relative to their own text.
+        """
+        texts = list(texts)
+        starts = []
+        position = 0
+        for text in texts:
+            starts.append(position)
+            position += len(text) + len(DOCUMENT_SEPARATOR)
+
+        results = [[] for _ in texts]
+        for hit in self.find_all(DOCUMENT_SEPARATOR.join(texts), overlapping):
+            index = bisect_right(starts, hit.start) - 1
+            offset = starts[index]
+            results[index].append(hit._replace(start=hit.start - offset, end=hit.end - offset))
+        return results
+
+    def unique_skills(self, text, category_order=None, hits=None):
+        """Return the distinct skills found in text.
+
+        Skills are grouped by category (taxonomy order unless category_order
+        is given) and ordered by first appearance within each category.
+        Pass hits from find_all_many() to reuse an earlier scan.
+        """
+        order = category_order or self.categories
+        rank = {category: index for index, category in enumerate(order)}
+
+        seen = set()
+        first_hits = []
+        for hit in self.find_all(text) if hits is None else hits:
+            # Hit terms are canonical names, one per skill
+            if hit.term not in seen and hit.category in rank:
+                seen.add(hit.term)
+                first_hits.append(hit)
+
+        first_hits.sort(key=lambda hit: (rank[hit.category], hit.start))
+        return [hit.term for hit in first_hits]
+
+
+_default_matcher = None
+
+
+def get_default_matcher():
+    """Return the shared matcher, built once from SKILL_TAXONOMY_PATH or the defaults."""
+    global _default_matcher
+    if _default_matcher is None:
+        path = os.environ.get("SKILL_TAXONOMY_PATH")
+        _default_matcher = SkillMatcher(load_taxonomy(path) if path else SkillTaxonomy.from_dict(DEFAULT_TAXONOMY))
+    return _default_matcher
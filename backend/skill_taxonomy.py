@@ -0,0 +1,196 @@
+"""
+Compact skill taxonomy: canonical skills, synonyms, categories, priority
+weights and tags, built once into interned, array-backed tables.
+
+Every canonical skill gets an integer id. Names are interned strings in a
+list indexed by id, categories and weights are array columns indexed by
+id, and a single dict maps every lowercased name and synonym to its id, so
+normalizing or looking up a skill is one dict lookup however large the
+taxonomy is. The skill matcher scans text against the same dict.
+
+Taxonomy files are JSON, either a plain {"category": ["Skill", ...]}
+object or the full form:
+
+    {
+        "categories": {"frameworks": ["React", "Angular"], "testing": ["Jest"]},
+        "synonyms": {"React": ["ReactJS", "React.js"]},
+        "weights": {"React": 1.0, "Jest": 0.5},
+        "tags": {"summary": ["React"]}
+    }
+
+Category order matters (analyzers report skills grouped by category), and
+a name listed under two categories belongs to the first. Weights rank
+skills for prioritization: HIGH_PRIORITY_WEIGHT and up is a high priority
+skill, MEDIUM_PRIORITY_WEIGHT and up a medium one. Tags name ordered skill
+lists that analyzers pick from, such as the skills worth a mention in a
+summary. Skills are matched in text on word boundaries, so names should
+start and end with a letter or digit.
+"""
+
+import json
+import re
+import sys
+from array import array
+
+HIGH_PRIORITY_WEIGHT = 0.75
+MEDIUM_PRIORITY_WEIGHT = 0.35
+
+WORD_PATTERN = re.compile(r"\w+")
+
+DEFAULT_TAXONOMY = {
+    "categories": {
+        "frameworks": ["React", "Angular", "Vue", "TypeScript", "JavaScript", "Node.js"],
+        "markup": ["HTML5", "CSS3", "HTML", "CSS", "SCSS", "LESS", "Tailwind", "Bootstrap"],
+        "data": ["Redux", "GraphQL", "REST API", "REST", "Axios", "Fetch"],
+        "testing": ["testing", "unit testing", "Jest", "Cypress", "Selenium", "TDD"],
+        "responsive": ["responsive", "mobile-first", "cross-browser"],
+        "process": ["Git", "CI/CD", "Agile", "Scrum", "DevOps"],
+    },
+    "synonyms": {
+        "React": ["ReactJS", "React.js"],
+        "Vue": ["VueJS", "Vue.js"],
+        "Angular": ["AngularJS"],
+        "Node.js": ["NodeJS"],
+        "REST API": ["RESTful API", "REST APIs", "RESTful APIs"],
+        "unit testing": ["unit tests"],
+        "TDD": ["test-driven development"],
+        "CI/CD": ["continuous integration"],
+    },
+    "weights": {
+        "React": 1.0, "TypeScript": 1.0, "Redux": 1.0, "responsive": 1.0, "testing": 1.0,
+        "JavaScript": 0.5, "CSS": 0.5, "HTML": 0.5, "REST": 0.5, "Git": 0.5,
+    },
+    "tags": {
+        "summary": ["React", "TypeScript", "CSS", "responsive", "Redux", "GraphQL", "testing"],
+    },
+}
+
+
+def normalize_key(name):
+    """Return the lookup key for a skill name: lowercased, with single spaces."""
+    return " ".join(name.split()).lower()
+
+
+class SkillTaxonomy:
+    """Canonical skills with their synonyms, categories, weights and tags, indexed by id."""
+
+    __slots__ = ("names", "keys", "categories", "category_ids", "weights", "index", "tags", "priority_keys",
+                 "prefixes", "max_words")
+
+    def __init__(self, categories, synonyms=None, weights=None, tags=None):
+        self.names = []
+        self.keys = []
+        self.categories = []
+        self.category_ids = array("H")
+        self.weights = array("f")
+        self.index = {}
+
+        for category, skills in categories.items():
+            category_id = len(self.categories)
+            self.categories.append(sys.intern(category))
+            for name in skills:
+                key = sys.intern(normalize_key(name))
+                if not key or key in self.index:
+                    continue
+                self.index[key] = len(self.names)
+                self.names.append(sys.intern(name.strip()))
+                self.keys.append(key)
+                self.category_ids.append(category_id)
+                self.weights.append(0.0)
+
+        for name, aliases in (synonyms or {}).items():
+            skill = self._require(name, "synonyms")
+            for alias in aliases:
+                self.index.setdefault(sys.intern(normalize_key(alias)), skill)
+        for name, weight in (weights or {}).items():
+            self.weights[self._require(name, "weights")] = float(weight)
+        self.tags = {
+            tag: array("I", (self._require(name, "tags") for name in names))
+            for tag, names in (tags or {}).items()
+        }
+
+        self.priority_keys = {
+            "high": frozenset(key for key, weight in zip(self.keys, self.weights) if weight >= HIGH_PRIORITY_WEIGHT),
+            "medium": frozenset(
+                key for key, weight in zip(self.keys, self.weights)
+                if MEDIUM_PRIORITY_WEIGHT <= weight < HIGH_PRIORITY_WEIGHT
+            ),
+        }
+
+        # Multi-word keys are found by extending a match a word at a time,
+        # for as long as the text so far is the start of some key
+        self.prefixes = set()
+        self.max_words = 0
+        for key in self.index:
+            ends = [match.end() for match in WORD_PATTERN.finditer(key)]
+            self.max_words = max(self.max_words, len(ends))
+            self.prefixes.update(key[:end] for end in ends[:-1])
+
+    def _require(self, name, section):
+        skill = self.index.get(normalize_key(name))
+        if skill is None:
+            raise ValueError(f"Skill taxonomy {section} name unknown skill {name!r}")
+        return skill
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return normalize_key(name) in self.index
+
+    def skill_id(self, name):
+        """Return the id of the skill a name or synonym refers to, or None."""
+        return self.index.get(normalize_key(name))
+
+    def normalize(self, name):
+        """Return the canonical name for a skill name or synonym, or None if unknown."""
+        skill = self.index.get(normalize_key(name))
+        return self.names[skill] if skill is not None else None
+
+    def category(self, name):
+        skill = self.index.get(normalize_key(name))
+        return self.categories[self.category_ids[skill]] if skill is not None else None
+
+    def weight(self, name):
+        skill = self.index.get(normalize_key(name))
+        return self.weights[skill] if skill is not None else 0.0
+
+    def priority(self, name):
+        """Return "high", "medium" or None from a skill's weight."""
+        weight = self.weight(name)
+        if weight >= HIGH_PRIORITY_WEIGHT:
+            return "high"
+        return "medium" if weight >= MEDIUM_PRIORITY_WEIGHT else None
+
+    def tagged(self, tag, terms=None):
+        """Return the canonical names listed under a tag, in order.
+
+        With terms (a set of lowercased terms, as from SkillMatcher.terms_in),
+        only the skills among them are returned.
+        """
+        return [
+            self.names[skill] for skill in self.tags.get(tag, ())
+            if terms is None or self.keys[skill] in terms
+        ]
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a taxonomy from the full JSON form or a plain {category: [skills]} object."""
+        if not isinstance(data, dict):
+            raise ValueError("Skill taxonomy must be a JSON object")
+        if not isinstance(data.get("categories"), dict):
+            data = {"categories": data}
+        for section in ("categories", "synonyms", "weights", "tags"):
+            if not isinstance(data.get(section, {}), dict):
+                raise ValueError(f"Skill taxonomy {section} must be a JSON object")
+        return cls(data["categories"], data.get("synonyms"), data.get("weights"), data.get("tags"))
+
+
+def load_taxonomy(path):
+    """Load a SkillTaxonomy from a JSON file."""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    try:
+        return SkillTaxonomy.from_dict(data)
+    except ValueError as e:
+        raise ValueError(f"{e} (in {path})") from None
@@ -0,0 +1,229 @@
+"""
+Validation and local repair of structured (JSON) model replies.
+
+Replies requested with response_format json_object still arrive with
+defects often enough to matter: code fences or prose around the JSON,
+trailing commas, single quotes, bare keys, Python literals, or output cut
+off at max_tokens. Throwing such a reply away wastes a paid completion, so
+parse_json() repairs those defects locally first. A RecordSchema then
+validates the records in the reply field by field, coercing what it safely
+can (case, whitespace, numeric strings) and reporting which records are
+incomplete, so the caller can re-ask the model for just those.
+"""
+
+import json
+import re
+from collections import namedtuple
+
+FENCE_PATTERN = re.compile(r"```(?:json)?\s*(.*?)(?:```|$)", re.DOTALL | re.IGNORECASE)
+BARE_WORD_PATTERN = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+NUMBER_PATTERN = re.compile(r"-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?")
+PYTHON_LITERALS = {"True": "true", "False": "false", "None": "null", "NaN": "null", "undefined": "null"}
+
+StructuredReply = namedtuple("StructuredReply", ["records", "incomplete", "repaired"])
+
+
+def _drop_trailing_comma(out):
+    while out and out[-1].isspace():
+        out.pop()
+    if out and out[-1] == ",":
+        out.pop()
+
+
+def repair_json(text):
+    """Rewrite near-JSON starting at text[0] into JSON text.
+
+    Fixes single-quoted strings, raw newlines in strings, bare keys and
+    words, Python literals, comments and trailing commas, ignores anything
+    after the top-level value, and closes strings and brackets left open by
+    a truncated reply.
+    """
+    out = []
+    closers = []
+    position = 0
+    length = len(text)
+    while position < length:
+        char = text[position]
+
+        if char in "\"'":
+            parts = []
+            position += 1
+            while position < length and text[position] != char:
+                current = text[position]
+                if current == "\\" and position + 1 < length:
+                    escaped = text[position + 1]
+                    parts.append("'" if escaped == "'" else "\\" + escaped)
+                    position += 2
+                    continue
+                parts.append('\\"' if current == '"' else "\\n" if current == "\n" else current)
+                position += 1
+            out.append('"' + "".join(parts) + '"')
+            position += 1
+            continue
+
+        if text.startswith("//", position):
+            newline = text.find("\n", position)
+            position = length if newline == -1 else newline
+            continue
+        if text.startswith("/*", position):
+            end = text.find("*/", position + 2)
+            position = length if end == -1 else end + 2
+            continue
+
+        number = NUMBER_PATTERN.match(text, position)
+        if number:
+            out.append(number.group())
+            position = number.end()
+            continue
+
+        word = BARE_WORD_PATTERN.match(text, position)
+        if word:
+            value = word.group()
+            out.append(value if value in ("true", "false", "null") else PYTHON_LITERALS.get(value) or json.dumps(value))
+            position = word.end()
+            continue
+
+        if char in "{[":
+            closers.append("}" if char == "{" else "]")
+            out.append(char)
+        elif char in "}]":
+            _drop_trailing_comma(out)
+            if closers:
+                out.append(closers.pop())
+            if not closers:
+                break
+        else:
+            out.append(char)
+        position += 1
+
+    # Truncated reply: drop a dangling separator or key and close what is still open
+    _drop_trailing_comma(out)
+    if closers and closers[-1] == "}" and out and out[-1].startswith('"'):
+        previous = next((token for token in reversed(out[:-1]) if not token.isspace()), "")
+        if previous in ("{", ","):
+            out.pop()
+            _drop_trailing_comma(out)
+    if out and out[-1] == ":":
+        out.append("null")
+    out.extend(reversed(closers))
+    return "".join(out)
+
+
+def parse_json(text):
+    """Parse a JSON reply, repairing it if needed; returns (value, repaired).
+
+    Raises ValueError if no JSON object or array can be recovered.
+    """
+    try:
+        return json.loads(text), False
+    except ValueError:
+        pass
+
+    fenced = FENCE_PATTERN.search(text)
+    candidate = fenced.group(1) if fenced else text
+    starts = [index for index in (candidate.find("{"), candidate.find("[")) if index != -1]
+    if not starts:
+        raise ValueError("Reply contains no JSON object or array")
+    return json.loads(repair_json(candidate[min(starts):])), True
+
+
+class Field:
+    """One field of a record: its type (str, int or list of str), allowed values and aliases."""
+
+    __slots__ = ("name", "kind", "choices", "required", "aliases")
+
+    def __init__(self, name, kind=str, choices=None, required=True, aliases=()):
+        self.name = name
+        self.kind = kind
+        self.choices = choices
+        self.required = required
+        self.aliases = aliases
+
+    def lookup(self, item):
+        for key in (self.name,) + tuple(self.aliases):
+            if item.get(key) is not None:
+                return item[key]
+        return None
+
+    def coerce(self, value):
+        """Return value converted to the field's type, or raise ValueError."""
+        if value is None:
+            raise ValueError(f"{self.name} is missing")
+        if self.kind is int:
+            if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+                raise ValueError(f"{self.name} is not a number")
+            return int(value)
+        if self.kind is list:
+            items = [value] if isinstance(value, str) else value
+            if not isinstance(items, list):
+                raise ValueError(f"{self.name} is not a list")
+            items = [str(item).strip() for item in items if isinstance(item, (str, int, float)) and str(item).strip()]
+            if not items:
+                raise ValueError(f"{self.name} is empty")
+            return items
+
+        if isinstance(value, (dict, list)):
+            raise ValueError(f"{self.name} is not a string")
+        value = str(value).strip()
+        if not value:
+            raise ValueError(f"{self.name} is empty")
+        if self.choices is not None:
+            value = value.lower()
+            if value not in self.choices:
+                raise ValueError(f"{self.name} must be one of {', '.join(self.choices)}")
+        return value
+
+
+class RecordSchema:
+    """The records a structured reply should hold: a list of objects, bare or under list_key."""
+
+    def __init__(self, list_key, fields):
+        self.list_key = list_key
+        self.fields = fields
+
+    def items(self, value):
+        """Find the record list in a parsed reply, tolerating the common wrong shapes."""
+        if isinstance(value, list):
+            return value
+        if isinstance(value, dict):
+            if isinstance(value.get(self.list_key), list):
+                return value[self.list_key]
+            lists = [item for item in value.values() if isinstance(item, list)]
+            if len(lists) == 1:
+                return lists[0]
+            if any(field.lookup(value) is not None for field in self.fields):
+                return [value]
+        raise ValueError(f"Reply has no {self.list_key} list")
+
+    def validate(self, value):
+        """Return (records, incomplete) for a parsed reply.
+
+        records are the complete records with coerced values; incomplete
+        holds (partial record, missing field names) for the others. A bare
+        string item is read as a record with only its first field.
+        """
+        records, incomplete = [], []
+        for item in self.items(value):
+            if isinstance(item, str):
+                item = {self.fields[0].name: item}
+            if not isinstance(item, dict):
+                continue
+            record, missing = {}, []
+            for field in self.fields:
+                try:
+                    record[field.name] = field.coerce(field.lookup(item))
+                except (TypeError, ValueError, OverflowError):
+                    if field.required:
+                        missing.append(field.name)
+            if missing:
+                incomplete.append((record, missing))
+            else:
+                records.append(record)
+        return records, incomplete
+
+
+def read_records(schema, text):
+    """Parse, repair and validate a reply into a StructuredReply; raises ValueError if unreadable."""
+    value, repaired = parse_json(text)
+    records, incomplete = schema.validate(value)
+    return StructuredReply(records, incomplete, repaired)
@@ -0,0 +1,46 @@
+import types
+
+import benchmark
+from instrumentation import instrumented, mark_demo, mark_fallback
+
+
+def make_module(outcomes):
+    outcomes = iter(outcomes)
+
+    @instrumented("optimize_cv_content")
+    def optimize_cv_content(cv_content, job_description):
+        outcome = next(outcomes, "ok")
+        if outcome == "fallback":
+            mark_fallback()
+        elif outcome == "demo":
+            mark_demo()
+        elif outcome == "error":
+            raise RuntimeError("boom")
+        return cv_content
+
+    return types.SimpleNamespace(optimize_cv_content=optimize_cv_content)
+
+
+CORPUS = {"cv": "CV text", "job": "Job text", "summary": "", "skills": []}
+
+
+def test_fallback_and_demo_calls_are_counted_and_left_out_of_api_latency():
+    # The first call is the untimed memory measurement
+    module = make_module(["ok", "ok", "fallback", "demo", "error", "ok"])
+    result = benchmark.measure(module, "optimize_cv_content", CORPUS, iterations=5, concurrency=1, mode="api")
+    assert (result["ok"], result["fallback"], result["demo"], result["errors"]) == (2, 1, 1, 1)
+    assert result["measured_calls"] == 2
+
+
+def test_demo_mode_measures_demo_calls():
+    module = make_module(["demo"] * 4)
+    result = benchmark.measure(module, "optimize_cv_content", CORPUS, iterations=3, concurrency=1, mode="demo")
+    assert result["measured_calls"] == 3
+    assert result["p50_ms"] is not None
+
+
+def test_no_matching_calls_reports_no_latency():
+    module = make_module(["fallback"] * 4)
+    result = benchmark.measure(module, "optimize_cv_content", CORPUS, iterations=3, concurrency=1, mode="api")
+    assert result["measured_calls"] == 0
+    assert result["p50_ms"] is None
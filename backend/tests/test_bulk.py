@@ -0,0 +1,32 @@
+import bulk
+import openai_demo
+
+FUNCTIONS = [("prioritize_skills", openai_demo.prioritize_skills)]
+CV = "Jane Doe\n\nSkills: React, CSS\n\nExperience\n- Built apps"
+JOB = "React developer with TypeScript"
+
+
+def skill_names(output):
+    return sorted(skill["name"] for skill in output["results"]["prioritize_skills"])
+
+
+def test_skills_string_is_split_into_names():
+    output = bulk.process_record(FUNCTIONS, 1, {"cv": CV, "job_description": JOB, "skills": "Python, SQL | Docker"})
+    assert skill_names(output) == ["Docker", "Python", "SQL"]
+
+
+def test_skills_list_is_used_as_given():
+    output = bulk.process_record(FUNCTIONS, 1, {"cv": CV, "job_description": JOB, "skills": ["Go", " Rust "]})
+    assert skill_names(output) == ["Go", "Rust"]
+
+
+def test_missing_skills_fall_back_to_the_cv_skills_section():
+    output = bulk.process_record(FUNCTIONS, 1, {"cv": CV, "job_description": JOB})
+    assert skill_names(output) == ["CSS", "React"]
+
+
+def test_malformed_fields_are_reported_per_record():
+    for record in ({"skills": {"a": 1}}, {"skills": ["React", 3]}, {"basic_summary": ["x"]}):
+        output = bulk.process_record(FUNCTIONS, 4, dict(record, cv=CV, job_description=JOB, id="c-4"))
+        assert output["id"] == "c-4"
+        assert "error" in output and "results" not in output
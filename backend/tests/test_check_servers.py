@@ -0,0 +1,52 @@
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import check_servers
+
+
+class CountingHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    connections = 0
+
+    def setup(self):
+        type(self).connections += 1
+        super().setup()
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+
+def serve():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), CountingHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/status"
+
+
+def test_watch_reuses_one_connection_per_server():
+    CountingHandler.connections = 0
+    server, url = serve()
+    try:
+        summary = check_servers.watch(check_servers.make_session(1), [("backend", url)], 0.01, count=5)
+    finally:
+        server.shutdown()
+    assert summary["backend"]["samples"] == 5
+    assert summary["backend"]["failures"] == 0
+    assert CountingHandler.connections == 1
+
+
+def test_watch_counts_a_closed_port_as_a_failed_sample():
+    server, url = serve()
+    server.shutdown()
+    server.server_close()
+    summary = check_servers.watch(check_servers.make_session(1), [("backend", url)], 0.01, count=2, timeout=0.5)
+    assert summary["backend"] == dict(summary["backend"], samples=2, failures=2, p50_ms=None)
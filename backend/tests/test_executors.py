@@ -0,0 +1,39 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+WARM_WORKER = (
+    "import sys, executors; executors._warm_worker(); "
+    "print('semantic_matching' in sys.modules, 'numpy' in sys.modules)"
+)
+
+
+def run_warm_worker(monkeypatch, semantic):
+    monkeypatch.setenv("SEMANTIC_MATCHING", "true" if semantic else "false")
+    completed = subprocess.run(
+        [sys.executable, "-c", WARM_WORKER], capture_output=True, text=True, check=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+    return completed.stdout.split()
+
+
+def test_worker_warm_up_skips_semantic_matching_when_disabled(monkeypatch):
+    assert run_warm_worker(monkeypatch, semantic=False)[0] == "False"
+
+
+def test_worker_warm_up_builds_semantic_matcher_when_enabled(monkeypatch):
+    pytest.importorskip("numpy")
+    assert run_warm_worker(monkeypatch, semantic=True) == ["True", "True"]
+
+
+def test_streamed_demo_rewrite_offloads_with_the_size_it_was_checked_with(monkeypatch):
+    import openai_demo
+
+    checked, offloaded = [], []
+    monkeypatch.setattr(openai_demo, "_use_demo_mode", lambda: True)
+    monkeypatch.setattr(openai_demo, "should_offload", lambda size: checked.append(size) or True)
+    monkeypatch.setattr(openai_demo, "run_cpu", lambda fn, *args, size=0: offloaded.append(size) or fn(*args))
+    chunks = list(openai_demo.optimize_cv_content_stream("Jane Doe\n\nSkills: React", "React developer"))
+    assert chunks and offloaded == checked
@@ -0,0 +1,21 @@
+import openai_demo
+
+JOB = "React developer with TypeScript and testing experience"
+CV = "Jane Doe\n\nSummary\nFrontend developer.\n\nExperience\n- Built React apps for clients\n- Wrote unit tests"
+REWORDED = CV.replace("Built React apps for clients", "Shipped React apps used by 40 clients")
+
+
+def test_model_tips_are_regenerated_when_a_bullet_is_reworded(monkeypatch):
+    calls = []
+    monkeypatch.setattr(openai_demo, "_use_demo_mode", lambda: False)
+    monkeypatch.setattr(openai_demo, "_chat_completion",
+                        lambda name, prompt, model, **params: calls.append(prompt) or f"1. Tip {len(calls)}")
+    openai_demo.reset_incremental_session("tips-test")
+
+    first = openai_demo.get_resume_pro_tips_incremental("tips-test", CV, JOB)
+    again = openai_demo.get_resume_pro_tips_incremental("tips-test", CV, JOB)
+    reworded = openai_demo.get_resume_pro_tips_incremental("tips-test", REWORDED, JOB)
+
+    assert first == again == ["Tip 1"]
+    assert reworded == ["Tip 2"]
+    assert "Shipped React apps" in calls[1]
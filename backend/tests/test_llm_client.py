@@ -0,0 +1,172 @@
+import asyncio
+import types
+
+import pytest
+
+from llm_client import TRIAL, CircuitBreaker, CircuitOpenError, LLMClient, RateLimitTimeout, TokenBucket, never_sent
+
+
+class APIError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+
+
+def make_client(create, threshold=2):
+    client = LLMClient("sk-test")
+    client.backoff_base = 0.001
+    client.max_retries = 2
+    client.breaker = CircuitBreaker(threshold=threshold, cooldown=60.0)
+    client._client = types.SimpleNamespace(chat=types.SimpleNamespace(completions=types.SimpleNamespace(create=create)))
+    return client
+
+
+def reply(**params):
+    return types.SimpleNamespace(choices=[], usage=None)
+
+
+def failing(status_code):
+    def create(**params):
+        raise APIError(status_code)
+    return create
+
+
+def test_breaker_opens_after_threshold_and_recovers_through_one_trial():
+    breaker = CircuitBreaker(threshold=2, cooldown=0.0)
+    breaker.record_failure()
+    assert breaker.allow() is True
+    breaker.record_failure()
+    assert breaker.allow() == TRIAL
+    assert breaker.allow() is False
+    breaker.record_success()
+    assert breaker.allow() is True
+
+
+def test_failed_trial_reopens_breaker():
+    breaker = CircuitBreaker(threshold=1, cooldown=0.0)
+    breaker.record_failure()
+    assert breaker.allow() == TRIAL
+    breaker.record_failure()
+    assert breaker.allow() == TRIAL
+
+
+def test_client_errors_do_not_reset_the_breaker():
+    client = make_client(failing(503), threshold=2)
+    with pytest.raises(APIError):
+        client.create(model="m", messages=[])
+    client.client.chat.completions.create = failing(400)
+    with pytest.raises(APIError):
+        client.create(model="m", messages=[])
+    assert client.breaker._failures == 1
+
+    client.client.chat.completions.create = failing(503)
+    with pytest.raises(APIError):
+        client.create(model="m", messages=[])
+    assert client.degraded
+    with pytest.raises(CircuitOpenError):
+        client.create(model="m", messages=[])
+
+
+def test_client_error_on_trial_call_lets_the_next_call_try():
+    client = make_client(failing(400), threshold=1)
+    client.breaker.record_failure()
+    client.breaker.cooldown = 0.0
+    with pytest.raises(APIError):
+        client.create(model="m", messages=[])
+    assert client.breaker.allow() == TRIAL
+
+
+def test_stream_outcome_is_recorded_when_iteration_finishes():
+    def broken_stream(**params):
+        def chunks():
+            yield "first"
+            raise APIError(502)
+        return chunks()
+
+    client = make_client(broken_stream, threshold=1)
+    stream = client.create(model="m", messages=[], stream=True)
+    assert not client.degraded
+    with pytest.raises(APIError):
+        list(stream)
+    assert client.degraded
+
+
+def test_completed_stream_records_success():
+    client = make_client(lambda **params: iter(["a", "b"]), threshold=2)
+    client.breaker.record_failure()
+    assert list(client.create(model="m", messages=[], stream=True)) == ["a", "b"]
+    assert client.breaker._failures == 0
+
+
+def flaky(error, failures=2):
+    attempts = []
+
+    def create(**params):
+        attempts.append(1)
+        if len(attempts) <= failures:
+            raise error
+        return reply()
+    return create, attempts
+
+
+def send(client):
+    client.request_bucket = TokenBucket(100)
+    client.token_bucket = TokenBucket(10000)
+    client.create(model="m", messages=[{"role": "user", "content": "hello"}], max_tokens=1000)
+
+
+def test_rate_limited_attempts_keep_their_reservations():
+    create, attempts = flaky(APIError(429))
+    client = make_client(create, threshold=10)
+    send(client)
+    assert len(attempts) == 3
+    assert client.request_bucket._tokens < 98
+    assert client.token_bucket._tokens < 7100
+
+
+def test_attempts_that_never_connected_are_refunded():
+    create, attempts = flaky(ConnectionRefusedError("refused"))
+    client = make_client(create, threshold=10)
+    send(client)
+    assert len(attempts) == 3
+    # Only the successful attempt keeps its reservation
+    assert 98.9 < client.request_bucket._tokens < 99.1
+    assert 8900 < client.token_bucket._tokens < 9100
+
+
+def test_timeouts_are_not_refunded():
+    assert not never_sent(TimeoutError())
+    assert not never_sent(APIError(503))
+    assert never_sent(ConnectionResetError())
+
+
+def test_rate_limit_timeout_returns_both_reservations():
+    client = make_client(reply)
+    client.request_bucket = TokenBucket(60)
+    client.token_bucket = TokenBucket(6000)
+    client.request_bucket.reserve(60)
+    with pytest.raises(RateLimitTimeout):
+        client.create(deadline=0.01, model="m", messages=[], max_tokens=1000)
+    # The request slot taken by the rejected call is back: no debt left to wait out
+    assert client.request_bucket.reserve(0) == 0.0
+    assert client.token_bucket._tokens > 5999
+
+
+def test_each_event_loop_gets_its_own_async_client():
+    pytest.importorskip("openai")
+    client = LLMClient("sk-test")
+
+    async def current():
+        assert client.async_client is client.async_client
+        return client.async_client
+
+    first = asyncio.run(current())
+    second = asyncio.run(current())
+    assert first is not second
+
+
+def test_token_bucket_refund_is_capped_at_capacity():
+    bucket = TokenBucket(600)
+    bucket.reserve(100)
+    bucket.refund(1000)
+    assert bucket._tokens == 600
@@ -0,0 +1,50 @@
+import openai_demo
+from model_router import ModelRouter
+
+
+def make_router(**options):
+    return ModelRouter(small_model="small-model", large_model="large-model", large_min_tokens=400, **options)
+
+
+def test_rewrite_threshold():
+    router = make_router()
+    assert router.rewrite("optimize_cv_content", 399).tier == "small"
+    assert router.rewrite("optimize_cv_content", 400).tier == "large"
+    assert router.rewrite("optimize_cv_content", 400).model == "large-model"
+
+
+def test_task_uses_small_model():
+    route = make_router().task("get_resume_pro_tips")
+    assert (route.tier, route.model) == ("small", "small-model")
+
+
+def test_short_cv_rewrite_routes_small_despite_fixed_prompt_text(monkeypatch):
+    models = []
+
+    def fake_completion(function_name, prompt, model, cacheable=None, **params):
+        models.append(model)
+        return "Optimized CV"
+
+    monkeypatch.setattr(openai_demo, "_use_demo_mode", lambda: False)
+    monkeypatch.setattr(openai_demo, "_chat_completion", fake_completion)
+    monkeypatch.setattr(openai_demo, "get_router", make_router)
+
+    openai_demo.optimize_cv_content("Jane Doe\nSkills: React, CSS", "React developer")
+    openai_demo.optimize_cv_content("Jane Doe\n\n" + "Built React apps for clients. " * 150, "React developer")
+    assert models == ["small-model", "large-model"]
+
+
+def test_disabled_routing_uses_the_configured_model_for_everything():
+    router = make_router(enabled=False, default_model="gpt-3.5-turbo")
+    for route in (router.task("get_resume_pro_tips"), router.rewrite("optimize_cv_content", 5000),
+                  router.route("prioritize_skills", "local", "keywords")):
+        assert (route.tier, route.model) == ("default", "gpt-3.5-turbo")
+
+
+def test_disabled_routing_falls_back_to_the_small_model():
+    assert make_router(enabled=False).rewrite("optimize_cv_content", 5000).model == "small-model"
+
+
+def test_signature_changes_with_the_models_in_use():
+    assert make_router().signature != make_router(enabled=False).signature
+    assert make_router(enabled=False).signature != make_router(enabled=False, default_model="other").signature
@@ -0,0 +1,57 @@
+import asyncio
+
+import pytest
+
+import openai_demo
+from prompt_builder import PROMPT_BUDGETS, count_tokens
+
+JOB = "Senior React developer with TypeScript and GraphQL"
+BULLETS = "\n".join(f"- Delivered project {i} for client {i}, cutting page load time by {i % 50} percent" for i in range(400))
+LONG_CV = f"Jane Doe\n\nSummary\nFrontend developer.\n\nExperience\n{BULLETS}\n\nEducation\nBSc Computer Science"
+SHORT_CV = "Jane Doe\n\nSummary\nFrontend developer.\n\nExperience\n- Built React apps"
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    calls = []
+
+    def fake_completion(function_name, prompt, model, cacheable=None, **params):
+        calls.append((function_name, prompt, params))
+        return f"[{function_name}: {prompt.strip().splitlines()[-1]}]"
+
+    monkeypatch.setattr(openai_demo, "_use_demo_mode", lambda: False)
+    monkeypatch.setattr(openai_demo, "_chat_completion", fake_completion)
+    return calls
+
+
+def test_long_cv_is_rewritten_section_by_section_without_dropping_lines(calls):
+    assert count_tokens(LONG_CV) > PROMPT_BUDGETS["optimize_cv_content"]["cv_content"]
+    result = openai_demo.optimize_cv_content(LONG_CV, JOB)
+
+    assert {name for name, _, _ in calls} == {"optimize_cv_section"}
+    prompts = "\n".join(prompt for _, prompt, _ in calls)
+    assert all(line in prompts for line in LONG_CV.split("\n")[1:] if line)
+    assert result.count("[optimize_cv_section") == len(calls)
+    assert result.startswith("Jane Doe")
+    assert max(params["max_tokens"] for _, _, params in calls) <= openai_demo.OPTIMIZE_CV_PARAMS["max_tokens"]
+
+
+def test_stream_and_async_match_the_sectioned_rewrite(calls):
+    expected = openai_demo.optimize_cv_content(LONG_CV, JOB)
+    calls.clear()
+    streamed = "".join(openai_demo.optimize_cv_content_stream(LONG_CV, JOB)).strip()
+    calls.clear()
+    awaited = asyncio.run(openai_demo.optimize_cv_content_async(LONG_CV, JOB))
+    assert streamed == awaited == expected
+
+
+def test_cv_within_budget_is_rewritten_in_one_call(calls):
+    assert openai_demo.optimize_cv_content(SHORT_CV, JOB).startswith("[optimize_cv_content: ")
+    assert len(calls) == 1
+
+
+def test_long_section_is_split_on_line_boundaries():
+    chunks = openai_demo._section_chunks(BULLETS, openai_demo.SECTION_CHUNK_TOKENS)
+    assert len(chunks) > 1
+    assert "\n".join(chunks) == BULLETS
+    assert all(count_tokens(chunk) <= openai_demo.SECTION_CHUNK_TOKENS for chunk in chunks)
@@ -0,0 +1,49 @@
+import io
+
+import pytest
+
+import pdf_pipeline
+
+
+def test_normalize_bullets_only_touches_line_starts():
+    text = "Skills\n\x7f React\n  \uf0b7 Redux\n\u25cf Jest\nPrice \x7f 5\n- dash"
+    assert pdf_pipeline.normalize_bullets(text) == "Skills\n• React\n  • Redux\n• Jest\nPrice \x7f 5\n- dash"
+
+
+def test_rendered_bullets_survive_a_round_trip(tmp_path):
+    pytest.importorskip("reportlab")
+    pytest.importorskip("PyPDF2")
+    path = tmp_path / "cv.pdf"
+    pages = pdf_pipeline.render_cv_pdf(["Experience\n• Built React apps\n• Led a", " migration\n"], str(path))
+    assert pages == 1
+
+    cv = pdf_pipeline.ingest_pdf(str(path))
+    assert "• Built React apps" in cv.text
+    assert "• Led a migration" in cv.text
+    assert "\x7f" not in cv.text
+
+
+def test_long_output_starts_new_pages():
+    pytest.importorskip("reportlab")
+    pages = pdf_pipeline.render_cv_pdf(("• line\n" for _ in range(300)), io.BytesIO())
+    assert pages > 1
+
+
+def test_oversized_upload_is_rejected(tmp_path):
+    pytest.importorskip("PyPDF2")
+    path = tmp_path / "big.pdf"
+    path.write_bytes(b"%PDF" + b"0" * 100)
+    with pytest.raises(pdf_pipeline.UploadTooLarge):
+        list(pdf_pipeline.iter_pdf_pages(str(path), max_size=10))
+
+
+def test_truncated_ingest_logs_the_length_it_returns(tmp_path, caplog):
+    pytest.importorskip("reportlab")
+    pytest.importorskip("PyPDF2")
+    path = tmp_path / "long.pdf"
+    pdf_pipeline.render_cv_pdf((f"• Delivered project {i}\n" for i in range(300)), str(path))
+
+    with caplog.at_level("INFO", logger="resume_assistant"):
+        cv = pdf_pipeline.ingest_pdf(str(path), max_chars=500)
+    assert len(cv.text) <= 500
+    assert f"({len(cv.text)} characters)" in caplog.text
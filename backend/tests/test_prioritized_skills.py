@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+import openai_demo
+
+
+def reply(*entries):
+    return json.dumps({"skills": [{"name": name, "priority": priority} for name, priority in entries]})
+
+
+def test_substring_names_do_not_cover_other_skills():
+    prioritized, unresolved, _ = openai_demo._parse_prioritized_skills(
+        ["C", "C++", "Java", "JavaScript (ES6+)"],
+        reply(("C++", "high"), ("JavaScript (ES6+)", "medium"))
+    )
+    assert [record["name"] for record in prioritized] == ["C++", "JavaScript (ES6+)"]
+    assert unresolved == ["C", "Java"]
+
+
+def test_names_match_after_normalizing_case_and_spaces():
+    prioritized, unresolved, _ = openai_demo._parse_prioritized_skills(
+        ["Unit  Testing", "python"], reply(("unit testing", "high"), ("Python", "low"))
+    )
+    assert len(prioritized) == 2
+    assert unresolved == []
+
+
+def test_taxonomy_synonyms_match():
+    prioritized, unresolved, _ = openai_demo._parse_prioritized_skills(["ReactJS"], reply(("React", "high")))
+    assert prioritized == [{"name": "React", "priority": "high"}]
+    assert unresolved == []
+
+
+def test_each_entry_covers_one_candidate():
+    prioritized, unresolved, _ = openai_demo._parse_prioritized_skills(["React", "ReactJS"], reply(("React", "high")))
+    assert len(prioritized) == 1
+    assert unresolved == ["ReactJS"]
+
+
+def test_entries_for_unknown_skills_are_dropped_and_reply_order_kept():
+    prioritized, unresolved, _ = openai_demo._parse_prioritized_skills(
+        ["SQL", "Python"], reply(("Python", "high"), ("Kubernetes", "high"), ("SQL", "low"))
+    )
+    assert [record["name"] for record in prioritized] == ["Python", "SQL"]
+    assert unresolved == []
+
+
+def test_unreadable_reply_raises():
+    with pytest.raises(ValueError):
+        openai_demo._parse_prioritized_skills(["SQL"], "no json here")
+
+
+def test_missing_skills_are_reasked(monkeypatch):
+    replies = [reply(("C++", "high")), reply(("C", "low"))]
+    prompts = []
+
+    def fake_completion(function_name, prompt, model, cacheable=None, **params):
+        prompts.append(prompt)
+        return replies.pop(0)
+
+    monkeypatch.setattr(openai_demo, "_use_demo_mode", lambda: False)
+    monkeypatch.setattr(openai_demo, "_chat_completion", fake_completion)
+    monkeypatch.setenv("ROUTER_ENABLED", "false")
+
+    result = openai_demo.prioritize_skills(["C", "C++"], "Systems programmer")
+    assert sorted(result, key=lambda record: record["name"]) == [
+        {"name": "C", "priority": "low"}, {"name": "C++", "priority": "high"}
+    ]
+    assert len(prompts) == 2
+    assert '["C"]' in prompts[1]
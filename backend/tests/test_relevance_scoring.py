@@ -0,0 +1,65 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("scipy")
+
+import relevance_scoring  # noqa: E402
+from relevance_scoring import SkillCorpus, SkillScorer, rank_skills, score_documents  # noqa: E402
+
+
+SKILLS = ["GraphQL development", "web development", "mobile development"]
+
+
+def test_single_job_weights_distinctive_tokens_over_generic_ones():
+    scores = SkillScorer(SKILLS).score(["We need GraphQL experience", "Mostly development work"])
+    rare_only, generic_only = scores[0]
+    assert rare_only > 0.5 > generic_only
+
+
+def test_idf_does_not_depend_on_the_jobs_scored():
+    scorer = SkillScorer(SKILLS)
+    alone = scorer.score(["GraphQL development"])[:, 0]
+    together = scorer.score(["GraphQL development", "development", "development"])[:, 0]
+    assert np.allclose(alone, together)
+
+
+def test_full_coverage_scores_one():
+    scores = SkillScorer(["React", "unit testing"]).score(["React developer with unit testing experience"])
+    assert np.allclose(scores[:, 0], 1.0)
+
+
+def test_reference_corpus_can_be_given():
+    scorer = SkillScorer(["GraphQL development"], reference=["development"] * 20)
+    assert scorer.score(["graphql"])[0, 0] > 0.6
+
+
+def test_counted_corpus_gives_the_same_idf_as_stacking_it_with_the_skills():
+    reference = ["React", "React Native", "web development", "unit testing", "C++"]
+    skills = ["React development", "C++ testing", "Rust"]
+    vocabulary = {}
+    presence = relevance_scoring._count_matrix(skills, vocabulary, grow=True)
+    presence.data[:] = 1
+    stacked = relevance_scoring._idf(relevance_scoring._count_matrix(reference + skills, vocabulary))
+    assert np.allclose(SkillCorpus(reference).idf(vocabulary, presence), stacked)
+
+
+def test_taxonomy_corpus_is_counted_once_per_taxonomy(monkeypatch):
+    import skill_matcher
+    from skill_taxonomy import DEFAULT_TAXONOMY, SkillTaxonomy
+
+    corpus = relevance_scoring.reference_corpus()
+    assert relevance_scoring.reference_corpus() is corpus
+    monkeypatch.setattr(skill_matcher, "_default_matcher",
+                        skill_matcher.SkillMatcher(SkillTaxonomy.from_dict(DEFAULT_TAXONOMY)))
+    assert relevance_scoring.reference_corpus() is not corpus
+
+
+def test_rank_orders_by_score():
+    ranked = rank_skills(["Cobol", "React", "GraphQL development"], "React and GraphQL engineer")
+    assert [skill["name"] for skill in ranked][:1] == ["React"]
+    assert ranked[-1] == {"name": "Cobol", "score": 0.0, "priority": "low"}
+
+
+def test_document_cosine_prefers_the_matching_job():
+    scores = score_documents(["React TypeScript frontend"], ["React TypeScript role", "Java backend role"])
+    assert scores[0, 0] > scores[0, 1]
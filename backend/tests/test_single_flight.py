@@ -0,0 +1,115 @@
+import asyncio
+import threading
+
+import pytest
+
+from single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "reply"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do("key", fn)))
+    leader.start()
+    started.wait(5)
+    followers = [threading.Thread(target=lambda: results.append(flight.do("key", fn))) for _ in range(3)]
+    for follower in followers:
+        follower.start()
+    release.set()
+    for thread in [leader] + followers:
+        thread.join(5)
+    assert results == ["reply"] * 4
+    assert len(calls) == 1
+
+
+def test_leader_error_reaches_followers():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    errors = []
+
+    def fn():
+        started.set()
+        release.wait(5)
+        raise ValueError("bad reply")
+
+    def call():
+        try:
+            flight.do("key", fn)
+        except ValueError as e:
+            errors.append(str(e))
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait(5)
+    follower = threading.Thread(target=call)
+    follower.start()
+    release.set()
+    leader.join(5)
+    follower.join(5)
+    assert errors == ["bad reply", "bad reply"]
+
+
+def test_async_calls_share_one_execution():
+    flight = SingleFlight()
+    calls = []
+
+    async def fn():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "reply"
+
+    async def main():
+        return await asyncio.gather(*(flight.do_async("key", fn) for _ in range(4)))
+
+    assert asyncio.run(main()) == ["reply"] * 4
+    assert len(calls) == 1
+
+
+def test_cancelled_leader_fails_followers_with_an_ordinary_error():
+    flight = SingleFlight()
+
+    async def slow():
+        await asyncio.sleep(10)
+
+    async def follower():
+        try:
+            await flight.do_async("key", slow)
+        except Exception as e:
+            return e
+
+    async def main():
+        leader = asyncio.ensure_future(asyncio.wait_for(flight.do_async("key", slow), 0.05))
+        await asyncio.sleep(0)
+        followers = [asyncio.ensure_future(follower()) for _ in range(2)]
+        with pytest.raises(asyncio.TimeoutError):
+            await leader
+        return await asyncio.gather(*followers)
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, asyncio.TimeoutError) for result in results)
+    assert not flight._async_calls
+
+
+def test_async_leader_error_reaches_followers():
+    flight = SingleFlight()
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise ValueError("bad reply")
+
+    async def main():
+        return await asyncio.gather(*(flight.do_async("key", failing) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert [type(result) for result in results] == [ValueError] * 3
@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+from structured_output import Field, RecordSchema, parse_json, read_records, repair_json
+
+SCHEMA = RecordSchema("skills", [
+    Field("name"),
+    Field("priority", kind=int),
+    Field("level", choices=("high", "medium", "low"), required=False),
+])
+
+
+def test_valid_json_is_not_marked_repaired():
+    assert parse_json('{"a": [1, 2]}') == ({"a": [1, 2]}, False)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("{'name': 'React', 'ok': True, 'score': None}", {"name": "React", "ok": True, "score": None}),
+    ('{name: "React", tags: ["a", "b",],}', {"name": "React", "tags": ["a", "b"]}),
+    ('{"note": "line one\nline two"} trailing prose', {"note": "line one\nline two"}),
+    ('{"a": 1, // comment\n "b": /* inline */ 2}', {"a": 1, "b": 2}),
+    ("{'quote': 'it\\'s \"fine\"'}", {"quote": "it's \"fine\""}),
+])
+def test_repair_json_fixes_near_json(text, expected):
+    assert json.loads(repair_json(text)) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('{"skills": [{"name": "React", "priority": 1}, {"name": "CS', {"skills": [{"name": "React", "priority": 1}, {"name": "CS"}]}),
+    ('{"skills": [{"name": "React", "pri', {"skills": [{"name": "React"}]}),
+    ('{"skills": [{"name": "React", "priority":', {"skills": [{"name": "React", "priority": None}]}),
+    ('[1, 2,', [1, 2]),
+])
+def test_repair_json_closes_truncated_replies(text, expected):
+    assert json.loads(repair_json(text)) == expected
+
+
+def test_parse_json_takes_the_json_out_of_fences_and_prose():
+    assert parse_json('Sure! Here it is:\n```json\n{"a": 1,}\n```\nAnything else?') == ({"a": 1}, True)
+    assert parse_json("The result is [1, 2] as requested.") == ([1, 2], True)
+    with pytest.raises(ValueError):
+        parse_json("I cannot help with that.")
+
+
+def test_read_records_coerces_and_reports_incomplete_records():
+    reply = read_records(SCHEMA, '{"skills": [{"name": " React ", "priority": "1", "level": "HIGH"}, '
+                                 '{"name": "CSS", "level": "urgent", "priority": 2}, {"name": "SQL"}]}')
+    assert reply.records == [{"name": "React", "priority": 1, "level": "high"}, {"name": "CSS", "priority": 2}]
+    assert reply.incomplete == [({"name": "SQL"}, ["priority"])]
+    assert reply.repaired is False
+
+
+@pytest.mark.parametrize("priority", ["1e999", "Infinity", "-Infinity", '"1e999"'])
+def test_infinite_numbers_make_a_record_incomplete(priority):
+    reply = read_records(SCHEMA, '[{"name": "Go", "priority": %s}, {"name": "SQL", "priority": 2}]' % priority)
+    assert reply.records == [{"name": "SQL", "priority": 2}]
+    assert reply.incomplete == [({"name": "Go"}, ["priority"])]
+
+
+def test_read_records_accepts_the_common_wrong_shapes():
+    bare_list = read_records(SCHEMA, '[{"name": "Go", "priority": 1}]')
+    other_key = read_records(SCHEMA, '{"items": [{"name": "Go", "priority": 1}]}')
+    single = read_records(SCHEMA, '{"name": "Go", "priority": 1}')
+    assert bare_list.records == other_key.records == single.records == [{"name": "Go", "priority": 1}]
+    assert read_records(SCHEMA, '["Go"]').incomplete == [({"name": "Go"}, ["priority"])]
+    with pytest.raises(ValueError):
+        read_records(SCHEMA, '{"a": [1], "b": [2]}')
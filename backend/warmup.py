@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Startup warm-up and import-cost report for the backend.
+
+Heavy dependencies (numpy/scipy, the OpenAI SDK with httpx and pydantic,
+tiktoken, Redis, spaCy) are imported on first use, so a cold process can
+serve its first request quickly. warm_up() pays those costs ahead of time
+instead, in two phases:
+
+    preload   imports, the compiled skill matcher, the tokenizer, any
+              spaCy model and the semantic index; run once in the gunicorn
+              master (preload_app) so forked workers share them
+              copy-on-write
+    connect   the OpenAI client pool, the Redis connection and the analysis
+              process pool; run in each worker after the fork, since
+              sockets and child processes must not cross a fork
+
+Every step is timed. startup_report() returns the timings, they are
+exported as the resume_startup_seconds metric, and `python warmup.py`
+prints them as JSON.
+
+Configuration (environment):
+    WARMUP_ENABLED   false skips warm-up (dependencies still load on first use)
+    SPACY_MODEL      spaCy model to preload, e.g. en_core_web_sm (optional)
+"""
+
+import importlib
+import json
+import os
+import sys
+import threading
+import time
+
+from instrumentation import STARTUP_SECONDS, logger
+from response_cache import env_flag
+
+# Imported in this order, so each module's cost excludes the ones before it
+PRELOAD_MODULES = ("numpy", "scipy.sparse", "relevance_scoring", "tiktoken", "redis", "openai_demo")
+# Only worth importing when openai_demo runs against the real API
+API_MODULES = ("httpx", "openai")
+
+_steps = {}
+_missing = []
+_spacy_models = {}
+_lock = threading.Lock()
+
+
+def _record(step, seconds):
+    _steps[step] = seconds
+    STARTUP_SECONDS.set(seconds, step=step)
+    logger.debug("Warm-up %s took %.1f ms", step, seconds * 1000)
+
+
+def _timed(step, fn):
+    started = time.perf_counter()
+    result = fn()
+    _record(step, time.perf_counter() - started)
+    return result
+
+
+def _import(name):
+    """Import a module and record its cost; optional modules may be missing."""
+    if name in sys.modules:
+        return sys.modules[name]
+    try:
+        return _timed("import " + name, lambda: importlib.import_module(name))
+    except ImportError:
+        _missing.append(name)
+        return None
+
+
+def get_spacy_model(name=None):
+    """Return a loaded spaCy pipeline (SPACY_MODEL by default), loading it once."""
+    name = name or os.environ.get("SPACY_MODEL")
+    if not name:
+        return None
+    with _lock:
+        if name not in _spacy_models:
+            spacy = _import("spacy")
+            _spacy_models[name] = spacy.load(name) if spacy is not None else None
+        return _spacy_models[name]
+
+
+def preload():
+    """Import heavy modules and build in-memory models (safe before a fork)."""
+    for name in PRELOAD_MODULES:
+        _import(name)
+
+    openai_demo = sys.modules.get("openai_demo")
+    if openai_demo is not None and not openai_demo.USE_DEMO_MODE:
+        for name in API_MODULES:
+            _import(name)
+
+    from prompt_builder import count_tokens
+    from skill_matcher import get_default_matcher
+    _timed("skill matcher", get_default_matcher)
+    _timed("tokenizer", lambda: count_tokens("warm up"))
+    if os.environ.get("SPACY_MODEL"):
+        _timed("spacy model", get_spacy_model)
+    if env_flag("SEMANTIC_MATCHING"):
+        from semantic_matching import get_semantic_matcher
+        _timed("semantic index", get_semantic_matcher)
+
+
+def connect():
+    """Open the OpenAI client pool, the shared cache connection and the executors (run after a fork)."""
+    from executors import get_io_pool, warm_cpu_pool
+    from response_cache import get_response_cache
+    from single_flight import get_single_flight
+    _timed("response cache", get_response_cache)
+    _timed("single flight", get_single_flight)
+    _timed("io pool", get_io_pool)
+    _timed("cpu pool", warm_cpu_pool)
+
+    openai_demo = _import("openai_demo")
+    if openai_demo is not None and not openai_demo.USE_DEMO_MODE:
+        _timed("openai client", lambda: openai_demo.client.client)
+
+
+def warm_up(preload_models=True, open_connections=True):
+    """Run the requested warm-up phases unless WARMUP_ENABLED is false."""
+    if not env_flag("WARMUP_ENABLED", True):
+        return
+    started = time.perf_counter()
+    if preload_models:
+        preload()
+    if open_connections:
+        connect()
+    logger.info("Warm-up finished in %.1f ms", (time.perf_counter() - started) * 1000)
+
+
+def startup_report():
+    """Return warm-up timings in milliseconds, slowest first, plus missing optional modules."""
+    steps = sorted(_steps.items(), key=lambda item: item[1], reverse=True)
+    return {
+        "steps_ms": {step: round(seconds * 1000, 2) for step, seconds in steps},
+        "total_ms": round(sum(_steps.values()) * 1000, 2),
+        "missing": list(_missing),
+    }
+
+
+if __name__ == "__main__":
+    warm_up()
+    print(json.dumps(startup_report(), indent=2))
@@ -3,84 +3,343 @@
 Check if the Resume Assistant servers are running.
 This script attempts to connect to the backend and frontend servers
 and reports their status.
+
+All endpoints are checked at the same time over one pooled keep-alive
+HTTP session. Besides the one-off check there are two more modes:
+
+    python check_servers.py --watch 5
+        sample every endpoint's latency every 5 seconds until Ctrl-C (or
+        --count samples), then print the latency distribution per endpoint;
+        samples reuse one keep-alive connection per server
+
+    python check_servers.py --load http://localhost:5000/status --rps 50 --duration 30
+        send requests to one URL at a fixed rate and report the achieved
+        rate, the latency distribution and the errors
+
+The load generator is open loop: requests are sent on schedule however
+slowly the server answers, and latency is measured from each request's
+scheduled time, so a saturated server shows up as growing latency instead
+of a quietly lower request rate.
 """
 
-import requests
+import argparse
+import json
+import socket
 import sys
+import threading
 import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlparse
-import socket
+
+import requests
+from requests.adapters import HTTPAdapter
+
+BACKEND_URL = "http://localhost:5000/status"
+FRONTEND_URL = "http://localhost:3000/"
+
+
+def make_session(pool_size=10):
+    """Return a requests session that keeps up to pool_size connections per host alive."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
 
 def check_port_open(host, port, timeout=2):
     """Check if a port is open on the host."""
     try:
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(timeout)
-        result = sock.connect_ex((host, port))
-        sock.close()
-        return result == 0
-    except:
+        with socket.create_connection((host, port), timeout=timeout):
+            return True
+    except OSError:
         return False
 
-def check_url(url, timeout=2):
-    """Check if a URL is accessible."""
+
+def check_url(session, url, timeout=2):
+    """Check if a URL is accessible; returns (is_up, status code or error, seconds)."""
+    started = time.perf_counter()
     try:
-        response = requests.get(url, timeout=timeout)
-        status = response.status_code
-        return status < 400, status
+        response = session.get(url, timeout=timeout)
+        # Read the body so the connection goes back to the pool
+        response.content
+        return response.status_code < 400, response.status_code, time.perf_counter() - started
     except requests.RequestException as e:
-        return False, str(e)
+        return False, str(e), time.perf_counter() - started
 
-def main():
-    """Check if the servers are running and display their status."""
-    backend_url = "http://localhost:5000/status"
-    frontend_port = 3000
-    
+
+def _host_port(url):
+    parsed = urlparse(url)
+    return parsed.hostname or "localhost", parsed.port or (443 if parsed.scheme == "https" else 80)
+
+
+def check_endpoint(session, name, url, timeout=2):
+    """Check one server: is its port open and does url answer?"""
+    host, port = _host_port(url)
+    result = {"name": name, "url": url, "port": port, "port_open": check_port_open(host, port, timeout)}
+    if result["port_open"]:
+        result["up"], result["status"], result["seconds"] = check_url(session, url, timeout)
+    else:
+        result["up"], result["status"], result["seconds"] = False, f"port {port} is closed", None
+    return result
+
+
+def check_all(session, endpoints, timeout=2):
+    """Check all endpoints concurrently; returns their results in the order given."""
+    with ThreadPoolExecutor(max_workers=len(endpoints)) as executor:
+        futures = [executor.submit(check_endpoint, session, name, url, timeout) for name, url in endpoints]
+        return [future.result() for future in futures]
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def latency_summary(latencies):
+    """Return min/mean/p50/p90/p95/p99/max in milliseconds for a list of seconds."""
+    latencies = sorted(latencies)
+    to_ms = lambda seconds: round(seconds * 1000, 2) if seconds is not None else None
+    return {
+        "min_ms": to_ms(latencies[0] if latencies else None),
+        "mean_ms": to_ms(sum(latencies) / len(latencies) if latencies else None),
+        "p50_ms": to_ms(percentile(latencies, 0.50)),
+        "p90_ms": to_ms(percentile(latencies, 0.90)),
+        "p95_ms": to_ms(percentile(latencies, 0.95)),
+        "p99_ms": to_ms(percentile(latencies, 0.99)),
+        "max_ms": to_ms(latencies[-1] if latencies else None),
+    }
+
+
+def print_status(backend, frontend):
+    """Print the one-off check in the familiar format."""
     print("Resume Assistant Server Status Check")
     print("===================================")
-    
-    # Check backend
+
     print("\nChecking Backend (Flask) server...")
-    
-    # First check if port is open
-    backend_port_open = check_port_open("localhost", 5000)
-    if not backend_port_open:
-        print("❌ Backend server is NOT running (port 5000 is closed)")
+    if not backend["port_open"]:
+        print(f"❌ Backend server is NOT running (port {backend['port']} is closed)")
     else:
-        print("✅ Backend server port is open (5000)")
-        
-        # Try to get a response from the API
-        is_up, status = check_url(backend_url)
-        if is_up:
-            print(f"✅ Backend API is responding (status {status})")
+        print(f"✅ Backend server port is open ({backend['port']})")
+        if backend["up"]:
+            print(f"✅ Backend API is responding (status {backend['status']}, {backend['seconds'] * 1000:.0f} ms)")
         else:
-            print(f"⚠️ Backend port is open but API is not responding properly: {status}")
-    
-    # Check frontend
+            print(f"⚠️ Backend port is open but API is not responding properly: {backend['status']}")
+
     print("\nChecking Frontend (React) server...")
-    frontend_port_open = check_port_open("localhost", frontend_port)
-    
-    if not frontend_port_open:
-        print("❌ Frontend server is NOT running (port 3000 is closed)")
+    if not frontend["port_open"]:
+        print(f"❌ Frontend server is NOT running (port {frontend['port']} is closed)")
     else:
-        print("✅ Frontend server is running (port 3000 is open)")
-    
-    # Summary
+        print(f"✅ Frontend server is running (port {frontend['port']} is open)")
+
     print("\nSummary:")
-    if backend_port_open and frontend_port_open:
+    if backend["port_open"] and frontend["port_open"]:
         print("✅ Both servers appear to be running correctly.")
-    elif backend_port_open:
+    elif backend["port_open"]:
         print("⚠️ Backend is running, but frontend is not available.")
         print("   Run 'run_frontend.bat' to start the frontend server.")
-    elif frontend_port_open:
+    elif frontend["port_open"]:
         print("⚠️ Frontend is running, but backend is not available.")
         print("   Run 'run_backend.bat' to start the backend server.")
     else:
         print("❌ Neither server is running.")
         print("   Run 'run_backend.bat' and 'run_frontend.bat' to start the servers.")
-    
+
     print("\nNote: If you've recently started the servers, they might still be initializing.")
     print("Wait a moment and run this check again.")
 
+
+def watch(session, endpoints, interval, count=None, timeout=2):
+    """Check all endpoints every interval seconds; returns the latency summary per endpoint.
+
+    Samples go through check_url only, so each server is measured over the
+    session's kept-alive connection instead of a new socket per sample.
+    """
+    samples = {name: [] for name, _ in endpoints}
+    failures = Counter()
+    taken = 0
+    print(f"Watching {len(endpoints)} endpoints every {interval:g}s (Ctrl-C to stop)")
+    executor = ThreadPoolExecutor(max_workers=len(endpoints))
+    try:
+        while count is None or taken < count:
+            started = time.monotonic()
+            futures = [(name, executor.submit(check_url, session, url, timeout)) for name, url in endpoints]
+            taken += 1
+            cells = []
+            for name, future in futures:
+                up, status, seconds = future.result()
+                if up:
+                    samples[name].append(seconds)
+                    cells.append(f"{name} {seconds * 1000:7.1f} ms")
+                else:
+                    failures[name] += 1
+                    cells.append(f"{name}    DOWN ({status})")
+            print(time.strftime("%H:%M:%S"), " | ".join(cells), flush=True)
+            if count is None or taken < count:
+                time.sleep(max(0.0, interval - (time.monotonic() - started)))
+    except KeyboardInterrupt:
+        print()
+    finally:
+        executor.shutdown(wait=False)
+
+    return {
+        name: dict(latency_summary(latencies), samples=len(latencies) + failures[name], failures=failures[name])
+        for name, latencies in samples.items()
+    }
+
+
+def load(url, rps, duration, concurrency=None, timeout=5, method="GET", body=None):
+    """Send requests to url at rps per second for duration seconds and summarize the results.
+
+    Each request is scheduled at start + i / rps and handed to a pool of
+    concurrency threads sharing one keep-alive session; latency runs from
+    the scheduled time, so time spent queued behind a slow server counts.
+    """
+    total = max(1, int(rps * duration))
+    concurrency = concurrency or max(1, min(256, int(rps)))
+    session = make_session(concurrency)
+    latencies = []
+    errors = Counter()
+    statuses = Counter()
+    lock = threading.Lock()
+
+    def fire(scheduled):
+        error = None
+        try:
+            response = session.request(method, url, data=body, timeout=timeout)
+            response.content
+            status = response.status_code
+            if status >= 400:
+                error = f"HTTP {status}"
+        except requests.Timeout:
+            status, error = None, "timeout"
+        except requests.ConnectionError:
+            status, error = None, "connection error"
+        except requests.RequestException as e:
+            status, error = None, type(e).__name__
+        elapsed = time.perf_counter() - scheduled
+        with lock:
+            if status is not None:
+                statuses[status] += 1
+            if error:
+                errors[error] += 1
+            else:
+                latencies.append(elapsed)
+
+    print(f"Sending {total} {method} requests to {url} at {rps:g}/s with up to {concurrency} in flight...",
+          file=sys.stderr)
+    started = time.perf_counter()
+    sent = 0
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    try:
+        for index in range(total):
+            scheduled = started + index / rps
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            executor.submit(fire, scheduled)
+            sent += 1
+        executor.shutdown(wait=True)
+    except KeyboardInterrupt:
+        print("Interrupted; waiting for requests in flight...", file=sys.stderr)
+        executor.shutdown(wait=True)
+    wall = time.perf_counter() - started
+
+    failed = sum(errors.values())
+    return dict(
+        {
+            "url": url,
+            "method": method,
+            "target_rps": rps,
+            "concurrency": concurrency,
+            "sent": sent,
+            "ok": len(latencies),
+            "failed": failed,
+            "error_rate": round(failed / sent, 4) if sent else 0.0,
+            "achieved_rps": round(sent / wall, 2) if wall else None,
+            "seconds": round(wall, 3),
+        },
+        **latency_summary(latencies),
+        statuses={str(status): number for status, number in sorted(statuses.items())},
+        errors=dict(errors.most_common()),
+    )
+
+
+def print_load_report(report):
+    print(f"\nLoad test: {report['method']} {report['url']}")
+    print(f"  requests   {report['sent']} sent, {report['ok']} ok, {report['failed']} failed "
+          f"({report['error_rate']:.2%} errors)")
+    print(f"  rate       {report['achieved_rps']}/s achieved of {report['target_rps']:g}/s target "
+          f"over {report['seconds']}s")
+    if report["ok"]:
+        print("  latency    " + "  ".join(
+            f"{name[:-3]} {report[name]:.1f}"
+            for name in ("min_ms", "p50_ms", "p90_ms", "p95_ms", "p99_ms", "max_ms")
+        ) + " (ms)")
+    if report["statuses"]:
+        print("  statuses   " + ", ".join(f"{status}: {number}" for status, number in report["statuses"].items()))
+    if report["errors"]:
+        print("  errors     " + ", ".join(f"{error}: {number}" for error, number in report["errors"].items()))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Check, watch or load-test the Resume Assistant servers")
+    parser.add_argument("--backend", default=BACKEND_URL, help="backend status URL")
+    parser.add_argument("--frontend", default=FRONTEND_URL, help="frontend URL")
+    parser.add_argument("--timeout", type=float, default=2.0, help="seconds per check or request")
+    parser.add_argument("--watch", type=float, metavar="SECONDS", help="sample latency at this interval")
+    parser.add_argument("--count", type=int, help="number of watch samples (default: until Ctrl-C)")
+    parser.add_argument("--load", metavar="URL", help="load-test this URL")
+    parser.add_argument("--rps", type=float, default=10.0, help="target requests per second for --load")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to run --load")
+    parser.add_argument("--concurrency", type=int, help="requests in flight for --load (default: rps, max 256)")
+    parser.add_argument("--method", default="GET", help="HTTP method for --load")
+    parser.add_argument("--data", help="request body for --load")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args(argv)
+    if args.rps <= 0 or args.duration <= 0:
+        parser.error("--rps and --duration must be positive")
+    if args.watch is not None and args.watch <= 0:
+        parser.error("--watch must be positive")
+    return args
+
+
+def main(argv=None):
+    """Check if the servers are running and display their status."""
+    args = parse_args(argv)
+    endpoints = [("backend", args.backend), ("frontend", args.frontend)]
+
+    if args.load:
+        report = load(args.load, args.rps, args.duration, args.concurrency, args.timeout, args.method.upper(),
+                      args.data)
+        if args.json:
+            print(json.dumps(report, indent=2))
+        else:
+            print_load_report(report)
+        return
+
+    session = make_session(len(endpoints))
+    if args.watch is not None:
+        summary = watch(session, endpoints, args.watch, args.count, args.timeout)
+        if args.json:
+            print(json.dumps(summary, indent=2))
+        else:
+            print("\nLatency over the watch (ms):")
+            for name, stats in summary.items():
+                print(f"  {name:<9} p50 {stats['p50_ms']}  p95 {stats['p95_ms']}  max {stats['max_ms']}  "
+                      f"({stats['failures']} of {stats['samples']} samples failed)")
+        return
+
+    backend, frontend = check_all(session, endpoints, args.timeout)
+    if args.json:
+        print(json.dumps([backend, frontend], indent=2))
+    else:
+        print_status(backend, frontend)
+
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()